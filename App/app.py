@@ -1,20 +1,48 @@
 import os
+import json
+import time
 import uuid
 import threading
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, stream_with_context
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from scheduler_voice_agent import SchedulerAgent
+from scheduler_voice_agent import SchedulerAgent, get_stream_stats
+from tools.google_auth import get_calendar_pool_metrics
+from SchedulerAgent import get_memory_writer
+from SchedulerAgent.embeddings import get_embedding_model
+from SchedulerAgent.memory import get_user_memory_shards
+from SchedulerAgent.recall import get_recall_planner
+from SchedulerAgent.checkpointer import get_checkpointer
+from SchedulerAgent.context_budget import get_context_budget
+from SchedulerAgent.tool_executor import get_tool_executor
+from SchedulerAgent.fast_path import get_fast_path_router
+from SchedulerAgent.prefetch import get_prefetch_stats
+from speech import VOSK_WARMUP, get_playback_stats, get_phrase_cache, get_vosk_registry, get_vad_stats, get_voice_pipeline_stats
 
 load_dotenv()
 
+# Set when running more than one worker (see App/gunicorn.conf.py), e.g. redis://localhost:6379/0,
+# so an emit from any worker reaches a client connected to another. Unset, emits stay in-process.
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE") or None
+# Eventlet/gevent would need every blocking call patched, but Vosk, FAISS, PyAudio and SQLite block
+# in C; threads handle that, and extra cores come from worker processes.
+SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)
-socketio = SocketIO(app, async_mode='threading')
+socketio = SocketIO(app, async_mode=SOCKETIO_ASYNC_MODE, message_queue=SOCKETIO_MESSAGE_QUEUE)
+
+if VOSK_WARMUP:
+    get_vosk_registry().warmup()
+# Decides now, not on the first conversation, whether this worker owns the memory shards.
+get_memory_writer()
+
+# 16 kHz PCM16 frames are ~128 ms (4 KB) from the bundled client; anything far larger is refused.
+MAX_AUDIO_FRAME_BYTES = 64 * 1024
 
 voice_clients = {}
 text_agent = SchedulerAgent(user_id="webapp_user_01", user_name="Debajyoti", use_tts=False)
@@ -42,6 +70,51 @@ def chat_handler():
         "session_id": session_id
     })
 
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+@app.route("/chat/stream", methods=['POST'])
+def chat_stream_handler():
+    data = request.get_json()
+    user_input = data.get("user_input")
+    session_id = data.get("session_id")
+    if not session_id:
+        session_id = f"web_session_{uuid.uuid4()}"
+
+    def generate():
+        yield _sse({"type": "session", "session_id": session_id})
+        for event in text_agent.stream_agent_response(session_id, user_input):
+            yield _sse(event)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/metrics", methods=['GET'])
+def metrics_handler():
+    return jsonify({
+        "calendar_client_pool": get_calendar_pool_metrics(),
+        "memory_writer": get_memory_writer().get_stats(),
+        "memory_shards": get_user_memory_shards().get_stats(),
+        "embedding_cache": get_embedding_model().get_stats(),
+        "recall": get_recall_planner().get_stats(),
+        "checkpointer": get_checkpointer().get_stats(),
+        "context_budget": get_context_budget().get_stats(),
+        "tool_executor": get_tool_executor().get_stats(),
+        "fast_path": get_fast_path_router().get_stats(),
+        "streaming": get_stream_stats(),
+        "tts_playback": get_playback_stats(),
+        "tts_phrase_cache": get_phrase_cache().get_stats(),
+        "vosk": get_vosk_registry().get_stats(),
+        "vad": get_vad_stats(),
+        "speculative_prefetch": get_prefetch_stats(),
+        "voice_pipeline_drops": get_voice_pipeline_stats(),
+        "voice_pipelines": {sid: agent.voice_pipeline.get_stats() for sid, (agent, _) in list(voice_clients.items())},
+        "process": {"pid": os.getpid(), "cpu_seconds": round(time.process_time(), 3), "voice_sessions": len(voice_clients)}
+    })
+
 def run_agent_loop(agent):
     try:
         agent.listen_and_respond()
@@ -52,42 +125,65 @@ def run_agent_loop(agent):
 def handle_connect():
     print(f"Client connected: {request.sid}")
 
+def stop_voice_client(sid) -> bool:
+    entry = voice_clients.pop(sid, None)
+    if entry is None:
+        return False
+    agent, thread = entry
+    agent.stop_listening()
+    if thread is not None:
+        thread.join()
+    return True
+
 @socketio.on('disconnect')
 def handle_disconnect():
     print(f"Client disconnected: {request.sid}")
-    if request.sid in voice_clients:
-        agent, thread = voice_clients[request.sid]
-        agent.stop_listening()
-        thread.join()
-        del voice_clients[request.sid]
+    if stop_voice_client(request.sid):
         print(f"Cleaned up voice agent for SID: {request.sid}")
 
 @socketio.on('start_voice')
-def handle_start_voice():
+def handle_start_voice(data=None):
+    """
+    source "browser": the client streams 16 kHz mono PCM16 as `audio_frame` events and speaks
+    replies itself. source "microphone" (the default, for older clients): the server listens on
+    its own microphone and speaks through its own speakers. "agent": false only transcribes,
+    which is what the load-test harness uses.
+    """
     sid = request.sid
     if sid in voice_clients:
         return
+    options = data or {}
+    source = options.get("source", "microphone")
     agent = SchedulerAgent(
         user_id=f"voice_user_{sid}", 
         user_name="Voice User", 
-        use_tts=True,
+        use_tts=(source == "microphone"),
         socketio=socketio, 
-        sid=sid
+        sid=sid,
+        respond=options.get("agent", True)
     )
-    thread = threading.Thread(target=run_agent_loop, args=(agent,))
+    if source == "browser":
+        thread = None
+        agent.start_browser_audio()
+    else:
+        thread = threading.Thread(target=run_agent_loop, args=(agent,))
+        thread.start()
     voice_clients[sid] = (agent, thread)
-    thread.start()
-    socketio.emit('voice_status', {'status': 'started'}, to=sid)
+    socketio.emit('voice_status', {'status': 'started', 'source': source}, to=sid)
+
+@socketio.on('audio_frame')
+def handle_audio_frame(frame):
+    entry = voice_clients.get(request.sid)
+    if entry is None or not isinstance(frame, (bytes, bytearray)) or len(frame) > MAX_AUDIO_FRAME_BYTES:
+        return
+    entry[0].submit_audio_frame(bytes(frame))
 
 @socketio.on('stop_voice')
 def handle_stop_voice():
     sid = request.sid
-    if sid in voice_clients:
-        agent, thread = voice_clients[sid]
-        agent.stop_listening()
-        thread.join()
-        del voice_clients[sid]
+    if stop_voice_client(sid):
         socketio.emit('voice_status', {'status': 'stopped'}, to=sid)
 
 if __name__ == "__main__":
-    socketio.run(app, port=8000, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    # Development server: one process. For production use `gunicorn -c App/gunicorn.conf.py`.
+    socketio.run(app, port=8000, debug=False, allow_unsafe_werkzeug=True)
@@ -0,0 +1,28 @@
+"""
+Production serving: several worker processes, each running App/app.py with a pool of threads.
+
+    gunicorn -c App/gunicorn.conf.py
+    WEB_WORKERS=4 SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0 gunicorn -c App/gunicorn.conf.py
+
+Conversation checkpoints, the embedding cache and user profiles are SQLite files and memories are
+FAISS shards on disk, so any worker can serve any `/chat` request. One worker owns the memory
+writer and the others spool their writes to it (SchedulerAgent/memory_writer.py). A Socket.IO
+connection stays on the worker that accepted it because the bundled client only uses the
+websocket transport, so no sticky sessions are needed in front of the workers.
+"""
+import os
+import multiprocessing
+
+# Relative data paths (auth/, faiss_index/) resolve against App/, as with `cd App && python app.py`.
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "app:app"
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_WORKERS", str(multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "32"))
+# Each worker loads its own models and opens its own SQLite connections after the fork.
+preload_app = False
+# Streamed replies and voice sessions hold a thread for as long as they last.
+timeout = int(os.getenv("WEB_TIMEOUT_SECONDS", "120"))
+graceful_timeout = 30
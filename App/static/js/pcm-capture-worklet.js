@@ -0,0 +1,38 @@
+// Runs on the audio rendering thread: downsamples the microphone to 16 kHz mono PCM16 and posts
+// fixed-size frames to the page, which forwards them to the server as `audio_frame` events.
+class PCMCaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        const { targetRate, frameSamples } = options.processorOptions;
+        this.ratio = sampleRate / targetRate;
+        this.frame = new Int16Array(frameSamples);
+        this.frameLength = 0;
+        this.sum = 0;
+        this.count = 0;
+        this.progress = 0;
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) return true;
+        for (let i = 0; i < channel.length; i++) {
+            // Averaging each window of `ratio` input samples doubles as a cheap low-pass filter.
+            this.sum += channel[i];
+            this.count++;
+            this.progress++;
+            if (this.progress < this.ratio) continue;
+            this.progress -= this.ratio;
+            const sample = Math.max(-1, Math.min(1, this.sum / this.count));
+            this.sum = 0;
+            this.count = 0;
+            this.frame[this.frameLength++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+            if (this.frameLength === this.frame.length) {
+                this.port.postMessage(this.frame.buffer.slice(0));
+                this.frameLength = 0;
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor('pcm-capture', PCMCaptureProcessor);
@@ -8,7 +8,14 @@ document.addEventListener('DOMContentLoaded', () => {
     let currentSessionId = null;
     let isVoiceMode = false;
     let thoughtBuffer = [];
-    const socket = io();
+    let voiceStreamRenderer = null;
+    let partialUserWrapper = null;
+    let browserCapture = null;
+    // Websocket only: a connection then stays on one server worker without sticky sessions.
+    const socket = io({ transports: ['websocket'] });
+
+    const AUDIO_SAMPLE_RATE = 16000;
+    const AUDIO_FRAME_SAMPLES = 2048;
 
     const createMessageElement = (role, content) => {
         const wrapper = document.createElement('div');
@@ -64,6 +71,45 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     };
 
+    const createStreamRenderer = (wrapper) => {
+        const bubble = wrapper.querySelector('.message-bubble');
+        let streamedText = '';
+        wrapper.classList.add('streaming');
+        return {
+            wrapper,
+            handle(event) {
+                if (event.type === 'token') {
+                    bubble.classList.remove('typing-indicator');
+                    streamedText += event.text;
+                    bubble.textContent = streamedText;
+                } else if (event.type === 'thought' || event.type === 'tool_call') {
+                    streamedText = '';
+                    bubble.classList.remove('typing-indicator');
+                    bubble.textContent = event.type === 'thought' ? 'Planning…' : `Using ${event.name}…`;
+                }
+                messageList.scrollTop = messageList.scrollHeight;
+            }
+        };
+    };
+
+    const readEventStream = async (response, onEvent) => {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '));
+                if (dataLine) onEvent(JSON.parse(dataLine.slice(6)));
+            }
+        }
+    };
+
     const updateUIForVoiceMode = (active) => {
         isVoiceMode = active;
         userInput.disabled = active;
@@ -77,9 +123,49 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
+    const startBrowserCapture = async () => {
+        const stream = await navigator.mediaDevices.getUserMedia({
+            audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+        });
+        const context = new AudioContext();
+        await context.audioWorklet.addModule('/static/js/pcm-capture-worklet.js');
+        const source = context.createMediaStreamSource(stream);
+        const capture = new AudioWorkletNode(context, 'pcm-capture', {
+            processorOptions: { targetRate: AUDIO_SAMPLE_RATE, frameSamples: AUDIO_FRAME_SAMPLES }
+        });
+        capture.port.onmessage = (event) => socket.emit('audio_frame', event.data);
+        source.connect(capture);
+        browserCapture = { stream, context };
+    };
+
+    const stopBrowserCapture = () => {
+        if (!browserCapture) return;
+        browserCapture.stream.getTracks().forEach(track => track.stop());
+        browserCapture.context.close();
+        browserCapture = null;
+    };
+
     socket.on('user_transcript', (data) => {
+        if (data.final === false) {
+            if (!partialUserWrapper) {
+                partialUserWrapper = createMessageElement('user', data.transcript);
+                partialUserWrapper.classList.add('partial');
+            } else {
+                partialUserWrapper.querySelector('.message-bubble').textContent = data.transcript;
+            }
+            return;
+        }
+        if (partialUserWrapper) {
+            partialUserWrapper.remove();
+            partialUserWrapper = null;
+        }
+        window.speechSynthesis.cancel();
         createMessageElement('user', data.transcript);
-        createMessageElement('assistant', '...');
+        voiceStreamRenderer = createStreamRenderer(createMessageElement('assistant', '...'));
+    });
+
+    socket.on('agent_stream', (event) => {
+        if (voiceStreamRenderer) voiceStreamRenderer.handle(event);
     });
     
     socket.on('agent_thoughts', (data) => {
@@ -87,25 +173,38 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     socket.on('agent_response', (data) => {
-        const typingIndicator = messageList.querySelector('.typing-indicator');
-        if (typingIndicator) {
-            typingIndicator.closest('.message-wrapper.assistant').remove();
+        if (voiceStreamRenderer) {
+            voiceStreamRenderer.wrapper.remove();
+            voiceStreamRenderer = null;
         }
         const assistantWrapper = createMessageElement('assistant', data.response);
         appendThoughts(assistantWrapper, thoughtBuffer);
         thoughtBuffer = [];
+        if (browserCapture) {
+            // Browser sessions are spoken here; the server has no speakers to use.
+            window.speechSynthesis.speak(new SpeechSynthesisUtterance(data.response.split('http')[0]));
+        }
     });
 
     socket.on('voice_status', (data) => {
         updateUIForVoiceMode(data.status === 'started');
+        if (data.status !== 'started') stopBrowserCapture();
     });
 
-    voiceToggle.addEventListener('change', () => {
-        if (voiceToggle.checked) {
-            window.speechSynthesis.cancel();
-            socket.emit('start_voice');
-        } else {
+    voiceToggle.addEventListener('change', async () => {
+        window.speechSynthesis.cancel();
+        if (!voiceToggle.checked) {
+            stopBrowserCapture();
             socket.emit('stop_voice');
+            return;
+        }
+        try {
+            await startBrowserCapture();
+            socket.emit('start_voice', { source: 'browser' });
+        } catch (error) {
+            console.error('Microphone capture failed:', error);
+            voiceToggle.checked = false;
+            createMessageElement('assistant', 'I could not access your microphone. Please allow microphone access and try again.');
         }
     });
 
@@ -120,17 +219,27 @@ document.addEventListener('DOMContentLoaded', () => {
         const typingIndicatorWrapper = createMessageElement('assistant', '...');
         try {
             const payload = { user_input: text, session_id: currentSessionId };
-            const response = await fetch('/chat', {
+            const response = await fetch('/chat/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(payload),
             });
+            if (!response.ok || !response.body) throw new Error('Network response was not ok');
+            const renderer = createStreamRenderer(typingIndicatorWrapper);
+            let finalEvent = null;
+            await readEventStream(response, (event) => {
+                if (event.type === 'session') {
+                    currentSessionId = event.session_id;
+                } else if (event.type === 'final') {
+                    finalEvent = event;
+                } else {
+                    renderer.handle(event);
+                }
+            });
             typingIndicatorWrapper.remove();
-            if (!response.ok) throw new Error('Network response was not ok');
-            const data = await response.json();
-            currentSessionId = data.session_id;
-            const assistantWrapper = createMessageElement('assistant', data.final_response);
-            appendThoughts(assistantWrapper, data.thoughts);
+            if (!finalEvent) throw new Error('Stream ended without a response');
+            const assistantWrapper = createMessageElement('assistant', finalEvent.response);
+            appendThoughts(assistantWrapper, finalEvent.thoughts);
         } catch (error) {
             typingIndicatorWrapper.remove();
             createMessageElement('assistant', 'Sorry, I am having trouble connecting to my brain right now.');
@@ -1,3 +1,4 @@
 from .node import add_conversation_to_memory,get_session_id_from_config,get_user_id_from_config
 from .graph import compile_agent_workflow
-__all__ = ["add_conversation_to_memory","get_session_id_from_config","get_user_id_from_config","compile_agent_workflow"]
+from .memory_writer import get_memory_writer
+__all__ = ["add_conversation_to_memory","get_session_id_from_config","get_user_id_from_config","compile_agent_workflow","get_memory_writer"]
\ No newline at end of file
@@ -0,0 +1,140 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import List
+from dotenv import load_dotenv
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+load_dotenv()
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "auth/checkpoints.db")
+CHECKPOINT_THREAD_TTL_SECONDS = float(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10"))
+CHECKPOINT_MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL_SECONDS", "300"))
+CHECKPOINT_VACUUM_FREE_RATIO = float(os.getenv("CHECKPOINT_VACUUM_FREE_RATIO", "0.25"))
+
+class BoundedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that keeps its database bounded. Each put keeps only the newest `max_per_thread`
+    checkpoints of that thread; periodic maintenance deletes threads idle for longer than `ttl`
+    and the least recently used threads beyond `max_threads`, then reclaims space with VACUUM
+    once enough pages are free.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        max_threads: int = CHECKPOINT_MAX_THREADS,
+        ttl: float = CHECKPOINT_THREAD_TTL_SECONDS,
+        max_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        maintenance_interval: float = CHECKPOINT_MAINTENANCE_INTERVAL_SECONDS,
+    ):
+        super().__init__(conn)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.max_per_thread = max_per_thread
+        self.maintenance_interval = maintenance_interval
+        self._last_maintenance = time.monotonic()
+        self._maintenance_lock = threading.Lock()
+        self.stats = {"puts": 0, "checkpoints_pruned": 0, "threads_evicted": 0, "vacuums": 0}
+        with self.cursor() as cur:
+            cur.execute("CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_used REAL NOT NULL)")
+            cur.execute("CREATE INDEX IF NOT EXISTS thread_activity_last_used ON thread_activity (last_used)")
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, last_used) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_used = excluded.last_used",
+                (thread_id, time.time())
+            )
+            # checkpoint_id is a time-ordered UUID, so ordering by it keeps the newest checkpoints.
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT ?)",
+                (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.max_per_thread)
+            )
+            pruned = cur.rowcount
+            if pruned > 0:
+                cur.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ("
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?)",
+                    (thread_id, checkpoint_ns, thread_id, checkpoint_ns)
+                )
+        self.stats["puts"] += 1
+        self.stats["checkpoints_pruned"] += max(pruned, 0)
+        if time.monotonic() - self._last_maintenance >= self.maintenance_interval:
+            self.maintain()
+        return next_config
+
+    def _delete_threads(self, cur: sqlite3.Cursor, thread_ids: List[str]):
+        for offset in range(0, len(thread_ids), 500):
+            chunk = thread_ids[offset:offset + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for table in ("checkpoints", "writes", "thread_activity"):
+                cur.execute(f"DELETE FROM {table} WHERE thread_id IN ({placeholders})", chunk)
+
+    def evict_idle_threads(self) -> int:
+        """Deletes threads idle past the TTL and the least recently used ones beyond `max_threads`."""
+        with self.cursor() as cur:
+            expired = [row[0] for row in cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_used < ?", (time.time() - self.ttl,)
+            ).fetchall()]
+            overflow = [row[0] for row in cur.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_used >= ? ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                (time.time() - self.ttl, self.max_threads)
+            ).fetchall()]
+            evicted = expired + overflow
+            self._delete_threads(cur, evicted)
+        self.stats["threads_evicted"] += len(evicted)
+        return len(evicted)
+
+    def compact(self, force: bool = False) -> bool:
+        """Runs VACUUM when at least CHECKPOINT_VACUUM_FREE_RATIO of the file is free pages (or when forced)."""
+        with self.cursor() as cur:
+            page_count = cur.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = cur.execute("PRAGMA freelist_count").fetchone()[0]
+            if not force and (page_count == 0 or free_pages / page_count < CHECKPOINT_VACUUM_FREE_RATIO):
+                return False
+            self.conn.commit()
+            cur.execute("VACUUM")
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.stats["vacuums"] += 1
+        return True
+
+    def maintain(self):
+        if not self._maintenance_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_maintenance = time.monotonic()
+            self.evict_idle_threads()
+            self.compact()
+        finally:
+            self._maintenance_lock.release()
+
+    def get_stats(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_activity").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        return {**self.stats, "threads": threads, "checkpoints": checkpoints}
+
+_checkpointer_instance = None
+_checkpointer_lock = threading.Lock()
+
+def get_checkpointer() -> BoundedSqliteSaver:
+    global _checkpointer_instance
+    with _checkpointer_lock:
+        if _checkpointer_instance is None:
+            os.makedirs(os.path.dirname(CHECKPOINT_DB_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Every worker process shares this file; wait out another worker's write instead of failing.
+            conn.execute("PRAGMA busy_timeout=5000")
+            _checkpointer_instance = BoundedSqliteSaver(conn)
+        return _checkpointer_instance
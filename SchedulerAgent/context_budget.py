@@ -0,0 +1,154 @@
+import os
+import json
+import threading
+from typing import List, Sequence, Tuple
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, ToolMessage
+
+load_dotenv()
+
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_TOOL_OUTPUT_MAX_CHARS = int(os.getenv("CONTEXT_TOOL_OUTPUT_MAX_CHARS", "600"))
+CONTEXT_SUMMARY_MAX_CHARS = int(os.getenv("CONTEXT_SUMMARY_MAX_CHARS", "2400"))
+SUMMARY_LINE_MAX_CHARS = 240
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def estimate_tokens(messages: Sequence[BaseMessage], summary: str = "") -> int:
+    """Rough prompt size (about four characters per token), good enough to enforce a budget."""
+    characters = len(summary)
+    for message in messages:
+        characters += len(_text(message))
+        if getattr(message, "tool_calls", None):
+            characters += len(json.dumps(message.tool_calls, ensure_ascii=False, default=str))
+    return characters // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages)
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Groups messages into turns, each starting at a HumanMessage, so tool calls stay with their results."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+def summarize_turn(turn: List[BaseMessage]) -> str:
+    user_text = next((_text(message) for message in turn if isinstance(message, HumanMessage)), "")
+    tool_names = sorted({message.name for message in turn if isinstance(message, ToolMessage) and message.name})
+    reply = next((_text(message) for message in reversed(turn) if isinstance(message, AIMessage) and not message.tool_calls), "")
+    parts = [f"User: {_clip(user_text, SUMMARY_LINE_MAX_CHARS)}"]
+    if tool_names:
+        parts.append(f"Tools: {', '.join(tool_names)}")
+    if reply:
+        parts.append(f"Agent: {_clip(reply, SUMMARY_LINE_MAX_CHARS)}")
+    return "- " + " | ".join(parts)
+
+def _extend_summary(summary: str, lines: List[str]) -> str:
+    summary = "\n".join(line for line in [summary, *lines] if line)
+    if len(summary) > CONTEXT_SUMMARY_MAX_CHARS:
+        # Oldest lines go first; the cut is moved to a line boundary.
+        summary = summary[-CONTEXT_SUMMARY_MAX_CHARS:]
+        summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+    return summary
+
+class ContextBudget:
+    """
+    Keeps the prompt bounded. The last `keep_turns` turns are sent verbatim (tool outputs of
+    finished turns clipped to `tool_output_max_chars`); older turns are folded into a one line per
+    turn running summary and removed from the thread. Further turns are folded while the estimated
+    size stays above `token_budget`; the current turn is always kept.
+    """
+
+    def __init__(self, keep_turns: int = CONTEXT_KEEP_TURNS, token_budget: int = CONTEXT_TOKEN_BUDGET, tool_output_max_chars: int = CONTEXT_TOOL_OUTPUT_MAX_CHARS):
+        self.keep_turns = max(keep_turns, 1)
+        self.token_budget = token_budget
+        self.tool_output_max_chars = tool_output_max_chars
+        self._lock = threading.Lock()
+        self.stats = {
+            "runs": 0,
+            "turns_summarized": 0,
+            "tool_outputs_clipped": 0,
+            "tokens_saved_total": 0,
+            "last_tokens_before": 0,
+            "last_tokens_after": 0,
+            "last_tokens_saved": 0,
+            "last_tokens_saved_vs_full_thread": 0,
+        }
+
+    def _clip_tool_outputs(self, turn: List[BaseMessage]) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """Returns the turn with long tool outputs clipped, and the replacement messages (same ids) for the state."""
+        clipped_turn, replacements = [], []
+        for message in turn:
+            if isinstance(message, ToolMessage) and len(_text(message)) > self.tool_output_max_chars:
+                message = ToolMessage(
+                    content=_clip(_text(message), self.tool_output_max_chars),
+                    name=message.name,
+                    tool_call_id=message.tool_call_id,
+                    id=message.id
+                )
+                replacements.append(message)
+            clipped_turn.append(message)
+        return clipped_turn, replacements
+
+    def apply(self, messages: Sequence[BaseMessage], summary: str, trimmed_tokens: int = 0) -> Tuple[List[BaseMessage], str, int]:
+        """
+        Returns the state updates (RemoveMessage / replaced ToolMessages), the new summary, and the
+        running total of tokens trimmed from this thread (what the untrimmed prompt would add back).
+        """
+        turns = split_turns(messages)
+        if not turns:
+            return [], summary, trimmed_tokens
+        tokens_before = estimate_tokens(messages, summary)
+        older, kept = turns[:-self.keep_turns], turns[-self.keep_turns:]
+
+        updates: List[BaseMessage] = []
+        clipped_kept = []
+        for turn in kept[:-1]:
+            clipped_turn, replacements = self._clip_tool_outputs(turn)
+            clipped_kept.append(clipped_turn)
+            updates.extend(replacements)
+        clipped_kept.append(kept[-1])
+        clipped_count = len(updates)
+
+        while len(clipped_kept) > 1 and estimate_tokens([m for turn in clipped_kept for m in turn], summary) > self.token_budget:
+            older.append(clipped_kept.pop(0))
+
+        if older:
+            replaced_ids = {message.id for turn in older for message in turn}
+            updates = [message for message in updates if message.id not in replaced_ids]
+            updates.extend(RemoveMessage(id=message.id) for turn in older for message in turn)
+            summary = _extend_summary(summary, [summarize_turn(turn) for turn in older])
+
+        tokens_after = estimate_tokens([m for turn in clipped_kept for m in turn], summary)
+        with self._lock:
+            self.stats["runs"] += 1
+            self.stats["turns_summarized"] += len(older)
+            self.stats["tool_outputs_clipped"] += clipped_count
+            self.stats["tokens_saved_total"] += tokens_before - tokens_after
+            self.stats["last_tokens_before"] = tokens_before
+            self.stats["last_tokens_after"] = tokens_after
+            self.stats["last_tokens_saved"] = tokens_before - tokens_after
+            self.stats["last_tokens_saved_vs_full_thread"] = trimmed_tokens + tokens_before - tokens_after
+        return updates, summary, trimmed_tokens + tokens_before - tokens_after
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+_context_budget_instance = None
+_context_budget_lock = threading.Lock()
+
+def get_context_budget() -> ContextBudget:
+    global _context_budget_instance
+    with _context_budget_lock:
+        if _context_budget_instance is None:
+            _context_budget_instance = ContextBudget()
+        return _context_budget_instance
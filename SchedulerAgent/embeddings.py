@@ -0,0 +1,144 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+# Google stays the default so existing shards keep their model; "local" re-embeds each shard once on first load.
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "google")
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+GOOGLE_EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "auth/embedding_cache.db")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Identifies which model produced a vector. Indexes saved before this was recorded used Google's model.
+LEGACY_EMBEDDING_MODEL_ID = f"google:{GOOGLE_EMBEDDING_MODEL}"
+
+class LocalSentenceTransformerEmbeddings(Embeddings):
+    """Embeds on the local CPU with sentence-transformers; the model is loaded on first use."""
+
+    def __init__(self, model_name: str = LOCAL_EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+                print(f"✅ Loaded local embedding model '{self.model_name}'")
+            return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self._get_model().encode(texts, batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class CachedEmbeddings(Embeddings):
+    """
+    Puts a content-addressed disk cache in front of another embedding provider. Vectors are keyed
+    by a hash of (model id, text), so repeated utterances and boilerplate agent replies are embedded
+    once, and only the misses of each call are sent to the provider, in batches of `batch_size`.
+    """
+
+    def __init__(self, provider: Embeddings, model_id: str, cache_path: str = EMBEDDING_CACHE_PATH, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.provider = provider
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        # Embedding calls come from request threads and the memory writer at the same time.
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "provider_calls": 0}
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset:offset + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchall()
+                found.update({key: np.frombuffer(vector, dtype=np.float32).tolist() for key, vector in rows})
+        return found
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = self._lookup(list(set(keys)))
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        with self._stats_lock:
+            self.stats["hits"] += len(texts) - sum(1 for key in keys if key in missing)
+            self.stats["misses"] += len(missing)
+
+        missing_keys = list(missing)
+        for offset in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[offset:offset + self.batch_size]
+            batch_vectors = self.provider.embed_documents([missing[key] for key in batch_keys])
+            with self._stats_lock:
+                self.stats["provider_calls"] += 1
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in zip(batch_keys, batch_vectors)]
+                )
+            vectors.update(zip(batch_keys, batch_vectors))
+        return [list(vectors[key]) for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+def get_embedding_model_id() -> str:
+    if EMBEDDING_PROVIDER == "google":
+        return LEGACY_EMBEDDING_MODEL_ID
+    return f"local:{LOCAL_EMBEDDING_MODEL}"
+
+def build_embedding_model(cache_path: str = EMBEDDING_CACHE_PATH) -> CachedEmbeddings:
+    """Builds the configured provider (`EMBEDDING_PROVIDER` = local | google) behind the disk cache at `cache_path`."""
+    if EMBEDDING_PROVIDER == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        provider = GoogleGenerativeAIEmbeddings(model=GOOGLE_EMBEDDING_MODEL)
+    elif EMBEDDING_PROVIDER == "local":
+        provider = LocalSentenceTransformerEmbeddings()
+    else:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER '{EMBEDDING_PROVIDER}'. Use 'local' or 'google'.")
+    return CachedEmbeddings(provider, get_embedding_model_id(), cache_path=cache_path)
+
+_embedding_model_instance = None
+_embedding_model_lock = threading.Lock()
+
+def get_embedding_model() -> CachedEmbeddings:
+    """
+    The process-wide cached embedding model, built on first embed or search rather than at import,
+    so importing the package needs no API key and creates no cache file.
+    """
+    global _embedding_model_instance
+    with _embedding_model_lock:
+        if _embedding_model_instance is None:
+            _embedding_model_instance = build_embedding_model()
+        return _embedding_model_instance
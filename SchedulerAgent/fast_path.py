@@ -0,0 +1,121 @@
+import os
+import re
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "1") == "1"
+# A trivial intent on the agent path costs an LLM call to pick the tool and another to phrase the answer.
+LLM_CALLS_PER_TRIVIAL_INTENT = 2
+
+_POLITE_PREFIX = r"(?:(?:hey|hi|ok|okay)[,\s]+)?(?:(?:agent|assistant)[,\s]+)?(?:(?:can|could)\s+you\s+(?:please\s+)?(?:tell\s+me\s+)?)?(?:please\s+)?"
+_POLITE_SUFFIX = r"(?:[,\s]+please)?[\s?.!]*$"
+
+INTENT_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("todays_date", re.compile(
+        rf"^{_POLITE_PREFIX}(?:what(?:'s|\s+is)\s+(?:the\s+)?(?:date\s+today|today'?s\s+date|date)|what\s+day\s+is\s+(?:it|today)(?:\s+today)?|today'?s\s+date){_POLITE_SUFFIX}"
+    )),
+    ("user_timezone", re.compile(
+        rf"^{_POLITE_PREFIX}(?:what(?:'s|\s+is)\s+my\s+(?:home\s+)?time\s?zone|which\s+time\s?zone\s+am\s+i\s+in|my\s+time\s?zone){_POLITE_SUFFIX}"
+    )),
+    ("greeting", re.compile(
+        r"^(?:hi|hello|hey|hiya|good\s+(?:morning|afternoon|evening))(?:[,\s]+(?:there|agent|assistant))?[\s!.,]*$"
+    )),
+]
+
+def classify_intent(text: str) -> Optional[str]:
+    """Returns the trivial intent `text` is, or None when it is anything else (or only looks similar)."""
+    normalized = " ".join(text.lower().replace("’", "'").split())
+    for intent, pattern in INTENT_PATTERNS:
+        if pattern.match(normalized):
+            return intent
+    return None
+
+class FastPathRouter:
+    """
+    Answers a few trivial intents (today's date, the user's timezone, greetings) straight from the
+    tools with a templated reply, before memory recall and the LLM. Anything that is not an exact
+    match for one of them goes to the agent as before.
+    """
+
+    def __init__(self, tools_by_name: Dict):
+        self.tools_by_name = tools_by_name
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Callable[[dict], str]] = {
+            "todays_date": self._answer_todays_date,
+            "user_timezone": self._answer_user_timezone,
+            "greeting": self._answer_greeting,
+        }
+        self.stats = {
+            "routed": 0,
+            "hits": 0,
+            "hits_by_intent": {intent: 0 for intent, _ in INTENT_PATTERNS},
+            "hit_seconds_total": 0.0,
+            "llm_calls": 0,
+            "llm_seconds_total": 0.0,
+        }
+
+    def _answer_todays_date(self, configurable: dict) -> str:
+        today = datetime.strptime(self.tools_by_name["get_todays_date"].invoke({}), "%Y-%m-%d")
+        return f"Today is {today.strftime('%A, %B')} {today.day}, {today.year}."
+
+    def _answer_user_timezone(self, configurable: dict) -> str:
+        result = self.tools_by_name["retrieve_user_timezone"].invoke({"user_id": configurable["user_id"]})
+        match = re.search(r" is (\S+)$", result)
+        if match:
+            return f"Your home timezone is {match.group(1)}."
+        return "I don't have a home timezone saved for you yet. Which timezone are you in?"
+
+    def _answer_greeting(self, configurable: dict) -> str:
+        user_name = configurable.get("user_name")
+        return f"Hello{', ' + user_name if user_name else ''}! How can I help with your calendar today?"
+
+    def answer(self, text: str, configurable: dict) -> Optional[Tuple[str, str]]:
+        """Returns (intent, reply) for a trivial intent, or None to let the agent handle the message."""
+        started = time.perf_counter()
+        intent = classify_intent(text) if FAST_PATH_ENABLED else None
+        reply = None
+        if intent:
+            try:
+                reply = self._handlers[intent](configurable)
+            except Exception as e:
+                print(f"⚠️ Fast path for '{intent}' failed, falling back to the agent: {e}")
+        with self._lock:
+            self.stats["routed"] += 1
+            if reply is not None:
+                self.stats["hits"] += 1
+                self.stats["hits_by_intent"][intent] += 1
+                self.stats["hit_seconds_total"] += time.perf_counter() - started
+        return (intent, reply) if reply is not None else None
+
+    def record_llm_call(self, seconds: float):
+        with self._lock:
+            self.stats["llm_calls"] += 1
+            self.stats["llm_seconds_total"] += seconds
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {**self.stats, "hits_by_intent": dict(self.stats["hits_by_intent"])}
+        hits = stats["hits"]
+        avg_llm_seconds = stats["llm_seconds_total"] / stats["llm_calls"] if stats["llm_calls"] else 0.0
+        avg_hit_seconds = stats["hit_seconds_total"] / hits if hits else 0.0
+        stats["hit_rate"] = round(hits / stats["routed"], 3) if stats["routed"] else 0.0
+        stats["avg_hit_ms"] = round(1000 * avg_hit_seconds, 3)
+        stats["estimated_seconds_saved"] = round(hits * max(LLM_CALLS_PER_TRIVIAL_INTENT * avg_llm_seconds - avg_hit_seconds, 0.0), 3)
+        return stats
+
+_fast_path_router_instance = None
+_fast_path_router_lock = threading.Lock()
+
+def get_fast_path_router(tools_by_name: Dict = None) -> FastPathRouter:
+    global _fast_path_router_instance
+    with _fast_path_router_lock:
+        if _fast_path_router_instance is None:
+            if tools_by_name is None:
+                from tools import tools_by_name
+            _fast_path_router_instance = FastPathRouter(tools_by_name)
+        return _fast_path_router_instance
@@ -1,29 +1,49 @@
 
 from langgraph.graph import START, StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from .node import (
     AgentState, 
+    fast_path_router,
+    route_after_fast_path,
     load_memories, 
+    manage_context,
     agent_node, 
     tool_node, 
     should_continue
 )
+from .checkpointer import get_checkpointer
+import threading
 
 compiled_scheduler_agent_graph = None
+_compile_lock = threading.Lock()
+
 def compile_agent_workflow():
+    with _compile_lock:
+        return _compile_agent_workflow()
+
+def _compile_agent_workflow():
     global compiled_scheduler_agent_graph
 
     if compiled_scheduler_agent_graph is not None:
-        print("Response agent workflow already compiled. Returning existing instance.")
         return compiled_scheduler_agent_graph
 
     builder = StateGraph(AgentState)
+    builder.add_node("fast_path_router", fast_path_router)
     builder.add_node("load_memories", load_memories)
+    builder.add_node("manage_context", manage_context)
     builder.add_node("Scheduler_Agent", agent_node)
     builder.add_node("Agent_Tools", tool_node)
 
-    builder.add_edge(START, "load_memories")
-    builder.add_edge("load_memories", "Scheduler_Agent")
+    builder.add_edge(START, "fast_path_router")
+    builder.add_conditional_edges(
+        "fast_path_router",
+        route_after_fast_path,
+        {
+            "answered": END,
+            "agent": "load_memories"
+        }
+    )
+    builder.add_edge("load_memories", "manage_context")
+    builder.add_edge("manage_context", "Scheduler_Agent")
     
     builder.add_conditional_edges(
         "Scheduler_Agent",
@@ -36,6 +56,6 @@ def compile_agent_workflow():
     
     builder.add_edge("Agent_Tools", "Scheduler_Agent")
 
-    memory = MemorySaver()
+    memory = get_checkpointer()
     compiled_scheduler_agent_graph = builder.compile(checkpointer=memory)
     return compiled_scheduler_agent_graph
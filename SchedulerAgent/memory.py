@@ -1,44 +1,339 @@
 import os
+import re
+import json
+import glob
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
+from .embeddings import get_embedding_model, get_embedding_model_id, LEGACY_EMBEDDING_MODEL_ID
 
 load_dotenv()
 
 FAISS_INDEX_PATH = os.getenv("VECTOR_STORE_PATH", "faiss_index")
-embedding_model = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+USER_SHARDS_PATH = os.path.join(FAISS_INDEX_PATH, "users")
+MEMORY_SHARD_CACHE_SIZE = int(os.getenv("MEMORY_SHARD_CACHE_SIZE", "32"))
+CHECKPOINT_POINTER_FILE = "CURRENT"
+MIGRATION_MARKER_FILE = "MIGRATED"
+EMBEDDING_MODEL_ID = get_embedding_model_id()
 
-_vector_store_instance = None
+def read_checkpoint_info(folder_path: str = FAISS_INDEX_PATH) -> dict:
+    """
+    Returns which index generation is current, the last memory WAL sequence number it contains and
+    the embedding model its vectors came from. Indexes saved before checkpoints were versioned are
+    reported as generation 0 named 'index'.
+    """
+    checkpoint = {"index_name": "index", "generation": 0, "wal_seq": 0, "embedding_model": LEGACY_EMBEDDING_MODEL_ID}
+    try:
+        with open(os.path.join(folder_path, CHECKPOINT_POINTER_FILE), "r") as f:
+            checkpoint.update(json.load(f))
+    except (FileNotFoundError, ValueError):
+        pass
+    return checkpoint
+
+def load_vector_store(folder_path: str) -> Optional[FAISS]:
+    checkpoint = read_checkpoint_info(folder_path)
+    if not os.path.exists(os.path.join(folder_path, f"{checkpoint['index_name']}.faiss")):
+        return None
+    return FAISS.load_local(
+        folder_path=folder_path,
+        embeddings=get_embedding_model(),
+        index_name=checkpoint["index_name"],
+        allow_dangerous_deserialization=True
+    )
+
+def save_vector_store(store_to_save: FAISS, wal_seq: int = None, folder_path: str = FAISS_INDEX_PATH, embedding_model_id: str = EMBEDDING_MODEL_ID):
+    """
+    Writes the index as a new generation next to the current one, then switches the CURRENT
+    pointer with a single atomic rename. A crash mid-save leaves the previous generation in use.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    previous = read_checkpoint_info(folder_path)
+    generation = previous["generation"] + 1
+    index_name = f"index.{generation:06d}"
+    store_to_save.save_local(folder_path, index_name=index_name)
+
+    pointer_path = os.path.join(folder_path, CHECKPOINT_POINTER_FILE)
+    with open(f"{pointer_path}.tmp", "w") as f:
+        json.dump({
+            "index_name": index_name,
+            "generation": generation,
+            "wal_seq": previous["wal_seq"] if wal_seq is None else wal_seq,
+            "embedding_model": embedding_model_id
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{pointer_path}.tmp", pointer_path)
+
+    # The previous generation stays until the next save, so a process that read the old pointer
+    # just before the rename can still load it.
+    keep = {index_name, previous["index_name"]}
+    for stale_path in glob.glob(os.path.join(folder_path, "index*.faiss")) + glob.glob(os.path.join(folder_path, "index*.pkl")):
+        if os.path.splitext(os.path.basename(stale_path))[0] not in keep:
+            os.remove(stale_path)
+
+def _shard_folder(user_id: str) -> str:
+    readable = re.sub(r"[^A-Za-z0-9_.-]", "_", user_id)[:48]
+    digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(USER_SHARDS_PATH, f"{readable}-{digest}")
+
+def _stored_documents(store: FAISS) -> List[Tuple[int, Document]]:
+    return [(position, store.docstore.search(docstore_id)) for position, docstore_id in sorted(store.index_to_docstore_id.items())]
+
+def _reembed(store: FAISS) -> FAISS:
+    documents = [document for _, document in _stored_documents(store)]
+    vectors = get_embedding_model().embed_documents([document.page_content for document in documents])
+    return FAISS.from_embeddings(
+        list(zip([document.page_content for document in documents], vectors)),
+        get_embedding_model(),
+        metadatas=[document.metadata for document in documents]
+    )
+
+class UserMemoryShard:
+    """One user's memories: a FAISS index (None until the first write), plus what is not yet saved."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.folder_path = _shard_folder(user_id)
+        self.lock = threading.RLock()
+        checkpoint = read_checkpoint_info(self.folder_path)
+        self.store: Optional[FAISS] = load_vector_store(self.folder_path)
+        self.generation = checkpoint["generation"]
+        self.saved_seq = checkpoint["wal_seq"]
+        self.applied_seq = self.saved_seq
+        self.reembedded = False
+        self.evicted = False
+        if self.store is not None and checkpoint["embedding_model"] != EMBEDDING_MODEL_ID:
+            # Vectors from another model are not comparable with today's queries; rebuild them from the stored texts.
+            print(f"♻️ Re-embedding memories of '{user_id}' from {checkpoint['embedding_model']} with {EMBEDDING_MODEL_ID}")
+            self.store = _reembed(self.store)
+            self.reembedded = True
+
+    @property
+    def dirty(self) -> bool:
+        return self.applied_seq > self.saved_seq or self.reembedded
+
+    def save(self):
+        with self.lock:
+            if self.store is not None and self.dirty:
+                save_vector_store(self.store, wal_seq=self.applied_seq, folder_path=self.folder_path)
+                self.generation = read_checkpoint_info(self.folder_path)["generation"]
+                self.saved_seq = self.applied_seq
+                self.reembedded = False
+
+    def reload_if_stale(self) -> bool:
+        """Picks up a generation another process saved since this shard was loaded. Call with `lock` held."""
+        checkpoint = read_checkpoint_info(self.folder_path)
+        if checkpoint["generation"] == self.generation:
+            return False
+        try:
+            self.store = load_vector_store(self.folder_path)
+        except Exception as e:
+            # The owner saved twice while we read the pointer; keep serving what we have and retry next time.
+            print(f"⚠️ Could not reload the memory shard of '{self.user_id}', using the loaded generation: {e}")
+            return False
+        self.generation = checkpoint["generation"]
+        self.saved_seq = self.applied_seq = checkpoint["wal_seq"]
+        return True
+
+class UserMemoryShards:
+    """
+    Conversation memory partitioned by user, so a recall only scans the caller's own history.
+    Shards are loaded on first use and the least recently used ones are saved and dropped from
+    memory once more than `capacity` are loaded.
+
+    In a process that does not own the memory writer (see `memory_writer.get_memory_writer`),
+    `follow_disk` is set: shards are never saved from here, and reads reload a shard whenever
+    the owning process has saved a newer generation of it.
+    """
+
+    def __init__(self, capacity: int = MEMORY_SHARD_CACHE_SIZE):
+        self.capacity = capacity
+        self.follow_disk = False
+        self._lock = threading.Lock()
+        self._shards: "OrderedDict[str, UserMemoryShard]" = OrderedDict()
+        self._pending: Dict[str, threading.Event] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "reloads": 0}
+        self._versions: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        _migrate_global_index()
+
+    def _get(self, user_id: str) -> UserMemoryShard:
+        # The registry lock only guards the dict. Loading a shard (a FAISS read, possibly a full
+        # re-embed) and saving evicted ones happen outside it, so a cold user never stalls the
+        # others; `_pending` makes concurrent callers for the same user wait for that work.
+        while True:
+            with self._lock:
+                shard = self._shards.get(user_id)
+                if shard is not None:
+                    self._shards.move_to_end(user_id)
+                    self.stats["hits"] += 1
+                    return shard
+                pending = self._pending.get(user_id)
+                if pending is None:
+                    pending = self._pending[user_id] = threading.Event()
+                    break
+            pending.wait()
 
-def get_vector_store() -> FAISS:
-    global _vector_store_instance
-    if _vector_store_instance is not None:
-        return _vector_store_instance
+        try:
+            shard = UserMemoryShard(user_id)
+        except BaseException:
+            with self._lock:
+                del self._pending[user_id]
+            pending.set()
+            raise
+        evicted = []
+        with self._lock:
+            self._shards[user_id] = shard
+            del self._pending[user_id]
+            self.stats["loads"] += 1
+            while len(self._shards) > self.capacity:
+                oldest_id, oldest = self._shards.popitem(last=False)
+                # Reloads of this user wait until it is saved, so they never read an older generation.
+                self._pending[oldest_id] = threading.Event()
+                evicted.append((oldest_id, oldest))
+        pending.set()
+        for oldest_id, oldest in evicted:
+            self._evict(oldest_id, oldest)
+        return shard
 
+    def _evict(self, user_id: str, shard: UserMemoryShard):
+        saved = False
+        try:
+            with shard.lock:
+                if not self.follow_disk:
+                    shard.save()
+                shard.evicted = True
+            saved = True
+        except Exception as e:
+            print(f"❌ Could not save the memory shard of '{user_id}' on eviction, keeping it loaded: {e}")
+        finally:
+            with self._lock:
+                if saved:
+                    self.stats["evictions"] += 1
+                else:
+                    self._shards[user_id] = shard
+                    self._shards.move_to_end(user_id, last=False)
+                self._pending.pop(user_id).set()
+
+    def _locked_shard(self, user_id: str) -> UserMemoryShard:
+        # A shard evicted between lookup and locking has already been saved; reload it.
+        while True:
+            shard = self._get(user_id)
+            shard.lock.acquire()
+            if not shard.evicted:
+                if self.follow_disk and shard.reload_if_stale():
+                    self._bump_version(user_id, reloaded=True)
+                return shard
+            shard.lock.release()
+
+    def applied_seq(self, user_id: str) -> int:
+        """The last WAL sequence number added to this user's shard, saved or not."""
+        shard = self._locked_shard(user_id)
+        try:
+            return shard.applied_seq
+        finally:
+            shard.lock.release()
+
+    def saved_seq(self, user_id: str) -> int:
+        return read_checkpoint_info(_shard_folder(user_id))["wal_seq"]
+
+    def add_embeddings(self, user_id: str, text_embeddings: List[Tuple[str, List[float]]], metadatas: List[dict], seq: int):
+        shard = self._locked_shard(user_id)
+        try:
+            if shard.store is None:
+                shard.store = FAISS.from_embeddings(text_embeddings, get_embedding_model(), metadatas=metadatas)
+            else:
+                shard.store.add_embeddings(text_embeddings=text_embeddings, metadatas=metadatas)
+            shard.applied_seq = seq
+        finally:
+            shard.lock.release()
+        # Bumped after the write, so a recall between the two only re-runs once it sees the new version.
+        self._bump_version(user_id)
+
+    def _bump_version(self, user_id: str, reloaded: bool = False):
+        # Its own lock, taken last and never held while taking another: callers may hold a shard lock.
+        with self._versions_lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            if reloaded:
+                self.stats["reloads"] += 1
+
+    def version(self, user_id: str) -> int:
+        """Counts writes to a user's memories in this process; recall results stay valid while it is unchanged."""
+        if self.follow_disk:
+            self._locked_shard(user_id).lock.release()
+        with self._versions_lock:
+            return self._versions.get(user_id, 0)
+
+    def search(self, user_id: str, query_vector: List[float], k: int, metadata_filter: Optional[dict] = None) -> List[Document]:
+        shard = self._locked_shard(user_id)
+        try:
+            if shard.store is None:
+                return []
+            # The shard only holds this user's history, so filtering over all of it is cheap and
+            # always yields k hits when k matching memories exist.
+            return shard.store.similarity_search_by_vector(
+                embedding=query_vector,
+                k=k,
+                filter=metadata_filter,
+                fetch_k=shard.store.index.ntotal
+            )
+        finally:
+            shard.lock.release()
+
+    def checkpoint(self) -> int:
+        """Saves every loaded shard with unsaved memories. Returns how many were written."""
+        with self._lock:
+            shards = list(self._shards.values())
+        saved = 0
+        for shard in shards:
+            if shard.dirty:
+                shard.save()
+                saved += 1
+        return saved
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self.stats, "loaded": len(self._shards)}
+
+def _migrate_global_index():
+    """Splits the pre-sharding global index into per-user shards once, reusing the stored vectors."""
+    marker_path = os.path.join(USER_SHARDS_PATH, MIGRATION_MARKER_FILE)
+    if os.path.exists(marker_path):
+        return
+    legacy_store = None
     try:
-        _vector_store_instance = FAISS.load_local(
-            folder_path=FAISS_INDEX_PATH,
-            embeddings=embedding_model,
-            allow_dangerous_deserialization=True
-        )
-        print(f"✅ Loaded FAISS index from '{FAISS_INDEX_PATH}'")
+        legacy_store = load_vector_store(FAISS_INDEX_PATH)
     except Exception as e:
-        print(f"⚠️ Could not load FAISS index: {e}. Initializing a new, empty index.")
-        dummy_documents = [
-            Document(
-                page_content="I am Debajyoti. Creator of Agent.",
-                metadata={"user_id": "owner", "user_name": "Debajyoti"}
-            )
-        ]
-        _vector_store_instance = FAISS.from_documents(
-            documents=dummy_documents,
-            embedding=embedding_model
-        )
-        save_vector_store(_vector_store_instance)
-
-    return _vector_store_instance
-
-def save_vector_store(store_to_save: FAISS):
-    store_to_save.save_local(FAISS_INDEX_PATH)
-    print(f"✅ FAISS index saved to '{FAISS_INDEX_PATH}'")
+        print(f"⚠️ Could not load the global FAISS index for migration: {e}")
+
+    if legacy_store is not None:
+        legacy_checkpoint = read_checkpoint_info(FAISS_INDEX_PATH)
+        vectors = legacy_store.index.reconstruct_n(0, legacy_store.index.ntotal)
+        by_user: Dict[str, Tuple[list, list]] = {}
+        for position, document in _stored_documents(legacy_store):
+            user_id = str(document.metadata.get("user_id", "unknown"))
+            text_embeddings, metadatas = by_user.setdefault(user_id, ([], []))
+            text_embeddings.append((document.page_content, list(vectors[position])))
+            metadatas.append(document.metadata)
+        for user_id, (text_embeddings, metadatas) in by_user.items():
+            shard_store = FAISS.from_embeddings(text_embeddings, get_embedding_model(), metadatas=metadatas)
+            save_vector_store(shard_store, wal_seq=legacy_checkpoint["wal_seq"], folder_path=_shard_folder(user_id), embedding_model_id=legacy_checkpoint["embedding_model"])
+        print(f"✅ Split the global FAISS index into {len(by_user)} per-user shards under '{USER_SHARDS_PATH}'")
+
+    os.makedirs(USER_SHARDS_PATH, exist_ok=True)
+    with open(marker_path, "w") as f:
+        f.write("1")
+
+_user_memory_shards_instance = None
+_user_memory_shards_lock = threading.Lock()
+
+def get_user_memory_shards() -> UserMemoryShards:
+    global _user_memory_shards_instance
+    with _user_memory_shards_lock:
+        if _user_memory_shards_instance is None:
+            _user_memory_shards_instance = UserMemoryShards()
+        return _user_memory_shards_instance
@@ -0,0 +1,459 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from typing import List, Optional
+try:
+    import fcntl
+except ImportError:
+    # No flock outside POSIX: every process is its own memory writer, which is only safe with one worker.
+    fcntl = None
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from .embeddings import get_embedding_model
+from .memory import FAISS_INDEX_PATH, get_user_memory_shards, read_checkpoint_info
+
+load_dotenv()
+
+MEMORY_WAL_PATH = os.getenv("MEMORY_WAL_PATH", os.path.join(FAISS_INDEX_PATH, "memory.wal"))
+MEMORY_WRITER_STATE_PATH = os.path.join(FAISS_INDEX_PATH, "memory_writer.json")
+MEMORY_WAL_FSYNC = os.getenv("MEMORY_WAL_FSYNC", "1") == "1"
+MEMORY_WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "64"))
+MEMORY_WRITE_BATCH_WINDOW_SECONDS = float(os.getenv("MEMORY_WRITE_BATCH_WINDOW_SECONDS", "0.25"))
+MEMORY_CHECKPOINT_EVERY_DOCUMENTS = int(os.getenv("MEMORY_CHECKPOINT_EVERY_DOCUMENTS", "200"))
+MEMORY_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("MEMORY_CHECKPOINT_INTERVAL_SECONDS", "60"))
+MEMORY_WRITE_RETRY_SECONDS = float(os.getenv("MEMORY_WRITE_RETRY_SECONDS", "2"))
+MEMORY_WRITER_LOCK_PATH = os.path.join(FAISS_INDEX_PATH, "memory_writer.lock")
+MEMORY_SPOOL_PATH = os.getenv("MEMORY_SPOOL_PATH", os.path.join(FAISS_INDEX_PATH, "spool"))
+MEMORY_SPOOL_POLL_SECONDS = float(os.getenv("MEMORY_SPOOL_POLL_SECONDS", "1.0"))
+
+_STOP = object()
+
+def _document_to_record(document: Document) -> dict:
+    return {"page_content": document.page_content, "metadata": document.metadata}
+
+def _read_checkpointed_seq() -> int:
+    try:
+        with open(MEMORY_WRITER_STATE_PATH, "r") as f:
+            return json.load(f)["wal_seq"]
+    except (FileNotFoundError, ValueError, KeyError):
+        # Before sharding, the global index pointer carried the checkpointed sequence number.
+        return read_checkpoint_info(FAISS_INDEX_PATH)["wal_seq"]
+
+def _write_checkpointed_seq(seq: int):
+    os.makedirs(os.path.dirname(MEMORY_WRITER_STATE_PATH) or ".", exist_ok=True)
+    with open(f"{MEMORY_WRITER_STATE_PATH}.tmp", "w") as f:
+        json.dump({"wal_seq": seq}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{MEMORY_WRITER_STATE_PATH}.tmp", MEMORY_WRITER_STATE_PATH)
+
+def _open_locked_for_append(path: str):
+    """Opens `path` for appending under an exclusive flock, reopening if it was renamed away while we waited."""
+    while True:
+        f = open(path, "a", encoding="utf-8")
+        if fcntl is None:
+            return f
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()
+
+class MemoryWriter:
+    """
+    Persists conversation memories off the request path.
+
+    `submit` appends the documents to an append-only WAL (if enabled) and queues them; a single
+    background thread embeds queued documents in batches, adds them to each user's memory shard,
+    and checkpoints the shards every `checkpoint_every` documents or `checkpoint_interval` seconds.
+    Every saved shard records the last WAL sequence number it contains, so after a crash only WAL
+    records that did not reach their shard's saved generation are replayed.
+
+    With several worker processes only one of them runs a MemoryWriter; the others append their
+    documents to the spool directory (see `SpoolingMemoryWriter`) and this thread moves spooled
+    documents into its own WAL and queue every `MEMORY_SPOOL_POLL_SECONDS`.
+    """
+
+    def __init__(
+        self,
+        wal_path: Optional[str] = MEMORY_WAL_PATH,
+        batch_size: int = MEMORY_WRITE_BATCH_SIZE,
+        batch_window: float = MEMORY_WRITE_BATCH_WINDOW_SECONDS,
+        checkpoint_every: int = MEMORY_CHECKPOINT_EVERY_DOCUMENTS,
+        checkpoint_interval: float = MEMORY_CHECKPOINT_INTERVAL_SECONDS,
+        spool_path: Optional[str] = None,
+    ):
+        self.wal_path = wal_path or None
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._queue = queue.Queue()
+        self._wal_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._stopping = False
+        self._dead = False
+        self._last_error = None
+        self._applied_seq = _read_checkpointed_seq()
+        self._checkpointed_seq = self._applied_seq
+        self._documents_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._next_seq = self._applied_seq
+        self.stats = {
+            "submitted": 0,
+            "replayed": 0,
+            "batches": 0,
+            "documents_embedded": 0,
+            "embed_failures": 0,
+            "apply_failures": 0,
+            "checkpoints": 0,
+            "checkpoint_failures": 0,
+            "spooled_ingested": 0,
+            "last_batch_seconds": 0.0,
+            "last_checkpoint_seconds": 0.0,
+        }
+
+        self._shards = get_user_memory_shards()
+        if self.wal_path:
+            os.makedirs(os.path.dirname(self.wal_path) or ".", exist_ok=True)
+            self._replay_wal()
+        if self.spool_path:
+            os.makedirs(self.spool_path, exist_ok=True)
+            self._ingest_spool()
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _read_wal(self) -> List[dict]:
+        records = []
+        try:
+            with open(self.wal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A torn final line from a crash mid-append; everything before it is intact.
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _replay_wal(self):
+        saved_seqs = {}
+        for record in self._read_wal():
+            self._next_seq = max(self._next_seq, record["seq"])
+            user_ids = {str(item["metadata"].get("user_id", "unknown")) for item in record["documents"]}
+            for user_id in user_ids - saved_seqs.keys():
+                saved_seqs[user_id] = self._shards.saved_seq(user_id)
+            if all(record["seq"] <= saved_seqs[user_id] for user_id in user_ids):
+                continue
+            documents = [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in record["documents"]]
+            with self._idle:
+                self._pending += 1
+            self._queue.put((record["seq"], documents))
+            self.stats["replayed"] += 1
+        if self.stats["replayed"]:
+            print(f"♻️ Replaying {self.stats['replayed']} unsaved memory writes from '{self.wal_path}'")
+
+    def submit(self, documents: List[Document]) -> int:
+        """Durably records `documents` (when the WAL is enabled) and queues them for indexing. Returns immediately."""
+        with self._wal_lock:
+            self._next_seq += 1
+            seq = self._next_seq
+            if self.wal_path:
+                with open(self.wal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"seq": seq, "documents": [_document_to_record(doc) for doc in documents]}, ensure_ascii=False) + "\n")
+                    f.flush()
+                    if MEMORY_WAL_FSYNC:
+                        os.fsync(f.fileno())
+            with self._idle:
+                self._pending += 1
+            self._queue.put((seq, documents))
+        self.stats["submitted"] += 1
+        return seq
+
+    def _ingest_spool(self):
+        # A spool file is renamed before it is read, so a worker appending to it afterwards starts a
+        # new one. Each record is in our WAL before the spool file is removed; a crash in between
+        # indexes that file's documents twice rather than losing them.
+        for name in sorted(os.listdir(self.spool_path)):
+            path = os.path.join(self.spool_path, name)
+            if name.endswith(".jsonl"):
+                ingesting = f"{path}.{os.getpid()}.ingesting"
+                try:
+                    os.replace(path, ingesting)
+                except FileNotFoundError:
+                    continue
+            elif name.endswith(".ingesting"):
+                ingesting = path
+            else:
+                continue
+            with open(ingesting, "r", encoding="utf-8") as f:
+                if fcntl is not None:
+                    # Waits out an append that opened the file just before the rename.
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.submit([Document(page_content=item["page_content"], metadata=item["metadata"]) for item in record["documents"]])
+                    self.stats["spooled_ingested"] += 1
+            os.remove(ingesting)
+
+    def _next_batch(self, first) -> list:
+        batch = [first]
+        document_count = len(first[1])
+        deadline = time.monotonic() + self.batch_window
+        while document_count < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+            document_count += len(item[1])
+        return batch
+
+    def _apply(self, batch: list) -> bool:
+        documents = [doc for _, docs in batch for doc in docs]
+        started = time.perf_counter()
+        try:
+            vectors = get_embedding_model().embed_documents([doc.page_content for doc in documents])
+        except Exception as e:
+            self.stats["embed_failures"] += 1
+            self._last_error = f"embed: {e}"
+            print(f"❌ Memory embedding failed, will retry: {e}")
+            return False
+
+        by_user = {}
+        vector_iter = iter(vectors)
+        for seq, docs in batch:
+            for doc in docs:
+                group = by_user.setdefault(str(doc.metadata.get("user_id", "unknown")), {"text_embeddings": [], "metadatas": []})
+                group["text_embeddings"].append((doc.page_content, next(vector_iter)))
+                group["metadatas"].append(doc.metadata)
+                group["seq"] = seq
+        with self._apply_lock:
+            try:
+                for user_id, group in by_user.items():
+                    # On a retry, users whose shard already took this batch are not added twice.
+                    if self._shards.applied_seq(user_id) >= group["seq"]:
+                        continue
+                    self._shards.add_embeddings(user_id, group["text_embeddings"], group["metadatas"], group["seq"])
+            except Exception as e:
+                self.stats["apply_failures"] += 1
+                self._last_error = f"apply: {e}"
+                print(f"❌ Adding memories to their shards failed, will retry: {e}")
+                return False
+            self._applied_seq = batch[-1][0]
+            self._documents_since_checkpoint += len(documents)
+        self.stats["batches"] += 1
+        self.stats["documents_embedded"] += len(documents)
+        self.stats["last_batch_seconds"] = time.perf_counter() - started
+        with self._idle:
+            self._pending -= len(batch)
+            self._idle.notify_all()
+        return True
+
+    def _checkpoint_due(self) -> bool:
+        if self._applied_seq <= self._checkpointed_seq:
+            return False
+        return (self._documents_since_checkpoint >= self.checkpoint_every
+                or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval)
+
+    def checkpoint(self):
+        """Saves every shard with unsaved memories and drops WAL records that are now on disk."""
+        with self._checkpoint_lock:
+            with self._apply_lock:
+                seq = self._applied_seq
+                if seq <= self._checkpointed_seq:
+                    return
+                started = time.perf_counter()
+                self._shards.checkpoint()
+                _write_checkpointed_seq(seq)
+                self._documents_since_checkpoint = 0
+            self._checkpointed_seq = seq
+            self._last_checkpoint = time.monotonic()
+            self.stats["checkpoints"] += 1
+            self.stats["last_checkpoint_seconds"] = time.perf_counter() - started
+            if self.wal_path:
+                with self._wal_lock:
+                    remaining = [record for record in self._read_wal() if record["seq"] > seq]
+                    with open(f"{self.wal_path}.tmp", "w", encoding="utf-8") as f:
+                        for record in remaining:
+                            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(f"{self.wal_path}.tmp", self.wal_path)
+
+    def _checkpoint_if_due(self, force: bool = False):
+        if not force and not self._checkpoint_due():
+            return
+        try:
+            self.checkpoint()
+        except Exception as e:
+            # The WAL still holds everything since the last good checkpoint; try again next interval.
+            self.stats["checkpoint_failures"] += 1
+            self._last_error = f"checkpoint: {e}"
+            self._last_checkpoint = time.monotonic()
+            print(f"❌ Memory checkpoint failed, will retry: {e}")
+
+    def _run(self):
+        poll_seconds = min(self.checkpoint_interval, MEMORY_SPOOL_POLL_SECONDS) if self.spool_path else self.checkpoint_interval
+        try:
+            while True:
+                if self.spool_path:
+                    try:
+                        self._ingest_spool()
+                    except Exception as e:
+                        self._last_error = f"spool: {e}"
+                        print(f"❌ Could not read spooled memory writes, will retry: {e}")
+                try:
+                    item = self._queue.get(timeout=poll_seconds)
+                except queue.Empty:
+                    self._checkpoint_if_due()
+                    continue
+                if item is _STOP:
+                    break
+                batch = self._next_batch(item)
+                while not self._apply(batch):
+                    if self._stopping:
+                        # Leave the batch in the WAL; it is replayed on the next start.
+                        return
+                    time.sleep(MEMORY_WRITE_RETRY_SECONDS)
+                self._checkpoint_if_due()
+            self._checkpoint_if_due(force=True)
+        except BaseException as e:
+            self._last_error = f"writer stopped: {e!r}"
+            print(f"❌ Memory writer stopped: {e!r}")
+            raise
+        finally:
+            with self._idle:
+                self._dead = True
+                self._idle.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until everything submitted so far is indexed and checkpointed. Returns False on
+        timeout, if the writer has stopped, or if the checkpoint fails.
+        """
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._pending == 0 or self._dead, timeout=timeout):
+                return False
+            if self._pending:
+                return False
+        try:
+            self.checkpoint()
+        except Exception as e:
+            self._last_error = f"checkpoint: {e}"
+            print(f"❌ Memory checkpoint failed: {e}")
+            return False
+        return True
+
+    def close(self, timeout: float = 30.0):
+        if self._stopping:
+            return
+        self._stopping = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+
+    def get_stats(self) -> dict:
+        with self._idle:
+            pending = self._pending
+        return {
+            **self.stats, "role": "owner", "alive": not self._dead, "last_error": self._last_error,
+            "pending": pending, "applied_seq": self._applied_seq, "checkpointed_seq": self._checkpointed_seq
+        }
+
+class SpoolingMemoryWriter:
+    """
+    The memory writer of a worker process that does not own the shards. `submit` appends the
+    documents to this process's file in the spool directory and returns; the owning process's
+    MemoryWriter embeds, indexes and checkpoints them. This process's shard registry follows the
+    owner's saved generations instead of writing its own.
+    """
+
+    def __init__(self, spool_path: str = MEMORY_SPOOL_PATH):
+        os.makedirs(spool_path, exist_ok=True)
+        self.spool_file = os.path.join(spool_path, f"{os.getpid()}.jsonl")
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self.stats = {"submitted": 0}
+        get_user_memory_shards().follow_disk = True
+
+    def submit(self, documents: List[Document]) -> int:
+        """Durably spools `documents` for the owning process. Returns immediately."""
+        with self._lock:
+            with _open_locked_for_append(self.spool_file) as f:
+                f.write(json.dumps({"documents": [_document_to_record(doc) for doc in documents]}, ensure_ascii=False) + "\n")
+                f.flush()
+                if MEMORY_WAL_FSYNC:
+                    os.fsync(f.fileno())
+            self._next_seq += 1
+            self.stats["submitted"] += 1
+            return self._next_seq
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the owning process has taken everything spooled here. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while os.path.exists(self.spool_file):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(MEMORY_SPOOL_POLL_SECONDS / 4)
+        return True
+
+    def close(self, timeout: float = 30.0):
+        pass
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self.stats, "role": "spool", "spool_file": self.spool_file}
+
+def _acquire_writer_ownership():
+    """Returns the held lock file if this process now owns the memory writer, or None if another process does."""
+    os.makedirs(os.path.dirname(MEMORY_WRITER_LOCK_PATH) or ".", exist_ok=True)
+    lock_file = open(MEMORY_WRITER_LOCK_PATH, "a")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+_memory_writer_instance = None
+_memory_writer_lock = threading.Lock()
+_memory_writer_ownership = None
+
+def get_memory_writer():
+    """
+    The process's memory writer. The first process to take the writer lock under VECTOR_STORE_PATH
+    owns the shards and gets a MemoryWriter; every other worker gets a SpoolingMemoryWriter. The
+    lock is released when the owner exits, and the next process to start takes it over.
+    """
+    global _memory_writer_instance, _memory_writer_ownership
+    with _memory_writer_lock:
+        if _memory_writer_instance is None:
+            if fcntl is None:
+                _memory_writer_instance = MemoryWriter()
+            else:
+                _memory_writer_ownership = _acquire_writer_ownership()
+                if _memory_writer_ownership is not None:
+                    _memory_writer_instance = MemoryWriter(spool_path=MEMORY_SPOOL_PATH)
+                else:
+                    _memory_writer_instance = SpoolingMemoryWriter()
+        return _memory_writer_instance
@@ -1,15 +1,17 @@
 import os
-import json
 from typing import Annotated, Sequence, TypedDict, List
 from dotenv import load_dotenv
 from langchain_cohere import ChatCohere
-from langchain_core.messages import BaseMessage, ToolMessage
-from langchain_core.messages.utils import get_buffer_string
+import time
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langgraph.graph.message import add_messages
 from langchain_core.documents import Document
 from .prompt import prompt
-from langchain_community.vectorstores import FAISS
-from .memory import get_vector_store, save_vector_store,embedding_model
+from .recall import get_recall_planner
+from .context_budget import get_context_budget
+from .memory_writer import get_memory_writer
+from .tool_executor import get_tool_executor
+from .fast_path import get_fast_path_router
 
 import sys
 import os
@@ -21,6 +23,8 @@ load_dotenv()
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     recall_memories: List[str]
+    conversation_summary: str
+    trimmed_tokens: int
 
 llm = ChatCohere(
     cohere_api_key=os.getenv("COHERE_API_KEY"),
@@ -43,7 +47,7 @@ def get_session_id_from_config(config):
     return session_id
 
 def add_conversation_to_memory(user_id: str, session_id: str, user_input: str, agent_response: str):
-    vector_store = get_vector_store()
+    """Queues the turn for the background memory writer; embedding and saving happen off the request path."""
     documents = [
         Document(
             page_content=user_input,
@@ -54,72 +58,60 @@ def add_conversation_to_memory(user_id: str, session_id: str, user_input: str, a
             metadata={"user_id": user_id, "session_id": session_id, "speaker": "agent"}
         )
     ]
-    
-    if vector_store is None:
-        new_store = FAISS.from_documents(documents, embedding_model)
+    get_memory_writer().submit(documents)
+
+
+def fast_path_router(state: AgentState, config) -> dict:
+    last_message = state["messages"][-1] if state["messages"] else None
+    if not isinstance(last_message, HumanMessage) or not isinstance(last_message.content, str):
+        return {}
+    answer = get_fast_path_router(tools_by_name).answer(last_message.content, config.get("configurable", {}))
+    if answer is None:
+        return {}
+    intent, reply = answer
+    return {"messages": [AIMessage(content=reply, response_metadata={"fast_path_intent": intent})]}
+
+def route_after_fast_path(state: AgentState):
+    if isinstance(state["messages"][-1], AIMessage):
+        return "answered"
     else:
-        vector_store.add_documents(documents)
-        new_store = vector_store
-
-    save_vector_store(new_store)
-
+        return "agent"
 
 def load_memories(state: AgentState, config) -> dict:
-    vector_store = get_vector_store()
-    if vector_store is None:
-        return {"recall_memories": []}
-        
     user_id = get_user_id_from_config(config)
     session_id = get_session_id_from_config(config)
 
     if not state["messages"]:
         return {"recall_memories": []}
-        
-    convo_str = get_buffer_string(state["messages"])
-    metadata_filter = {"user_id": user_id, "session_id": session_id}
-    
-    results = vector_store.similarity_search(
-        query=convo_str,
-        k=5,
-        filter=metadata_filter
-    )
-    recall_memories = [doc.page_content for doc in results]
+
+    recall_memories = get_recall_planner().recall(user_id, session_id, state["messages"])
     return {"recall_memories": recall_memories}
 
+def manage_context(state: AgentState, config) -> dict:
+    updates, summary, trimmed_tokens = get_context_budget().apply(
+        state["messages"],
+        state.get("conversation_summary", ""),
+        state.get("trimmed_tokens", 0)
+    )
+    return {"messages": updates, "conversation_summary": summary, "trimmed_tokens": trimmed_tokens}
+
 def agent_node(state: AgentState, config) -> dict:
     recall_str = "\n".join(state["recall_memories"])
-    final_prompt = prompt.format_messages(recall_memories=recall_str)
+    summary_str = state.get("conversation_summary") or "No earlier conversation."
+    final_prompt = prompt.format_messages(recall_memories=recall_str, conversation_summary=summary_str)
     all_messages = final_prompt + state["messages"]
+    started = time.perf_counter()
     prediction = llm.invoke(all_messages, config)
+    get_fast_path_router(tools_by_name).record_llm_call(time.perf_counter() - started)
     return {"messages": [prediction]}
 
 def tool_node(state: AgentState, config) -> dict:
-    outputs = []
     last_message = state["messages"][-1]
 
     if not hasattr(last_message, "tool_calls") or not last_message.tool_calls:
         return {"messages": []}
 
-    for tool_call in last_message.tool_calls:
-        tool_name = tool_call["name"]
-        if tool_name in tools_by_name:
-            tool_result = tools_by_name[tool_name].invoke(tool_call["args"])
-            outputs.append(
-                ToolMessage(
-                    content=json.dumps(tool_result, ensure_ascii=False),
-                    name=tool_name,
-                    tool_call_id=tool_call.get("id"),
-                )
-            )
-        else:
-            outputs.append(
-                ToolMessage(
-                    content=f"Error: Tool '{tool_name}' not found.",
-                    name=tool_name,
-                    tool_call_id=tool_call.get("id"),
-                )
-            )
-    return {"messages": outputs}
+    return {"messages": get_tool_executor(tools_by_name).run(last_message.tool_calls)}
 
 def should_continue(state: AgentState):
     last_message = state["messages"][-1]
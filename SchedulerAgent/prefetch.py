@@ -0,0 +1,113 @@
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+from dotenv import load_dotenv
+from .recall import get_recall_planner, normalize_query
+
+load_dotenv()
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_MIN_WORDS = int(os.getenv("PREFETCH_MIN_WORDS", "3"))
+PREFETCH_STABLE_SECONDS = float(os.getenv("PREFETCH_STABLE_SECONDS", "0.3"))
+PREFETCH_WAIT_SECONDS = float(os.getenv("PREFETCH_WAIT_SECONDS", "1.0"))
+PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "4"))
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="speculative-prefetch")
+_prefetch_stats_lock = threading.Lock()
+_prefetch_stats = {"started": 0, "reused": 0, "cancelled": 0, "superseded": 0, "failed": 0, "seconds_total": 0.0}
+
+def _count(key: str, amount=1):
+    with _prefetch_stats_lock:
+        _prefetch_stats[key] += amount
+
+def get_prefetch_stats() -> dict:
+    with _prefetch_stats_lock:
+        stats = dict(_prefetch_stats)
+    finished = stats["reused"] + stats["cancelled"] + stats["superseded"]
+    stats["reuse_rate"] = round(stats["reused"] / finished, 3) if finished else 0.0
+    return stats
+
+def _prefetch_turn(user_id: str, session_id: str, text: str):
+    """The cheap, side-effect-free parts of a turn: memory recall, the profile lookup, calendar credentials."""
+    from tools.user_profiles import get_user_profile_store
+    from tools.google_auth import warm_calendar_credentials
+
+    started = time.perf_counter()
+    try:
+        get_recall_planner().prefetch(user_id, session_id, text)
+        get_user_profile_store().get_timezone(user_id)
+        warm_calendar_credentials()
+    except Exception as e:
+        _count("failed")
+        print(f"⚠️ Speculative prefetch failed: {e}")
+    finally:
+        _count("seconds_total", time.perf_counter() - started)
+
+class SpeculativePrefetcher:
+    """
+    Starts the cheap parts of a voice turn while the user is still talking. Once the recognizer's
+    partial hypothesis has at least `min_words` words and has not changed for `stable_seconds`, it
+    is prefetched in the background. When the final transcript arrives the work is reused if the
+    text matches, and discarded otherwise; a newer stable partial supersedes an older one.
+    Partials and finals come from one recognizer thread; the agent thread only calls `wait_for`.
+    """
+
+    def __init__(self, user_id: str, session_id: str, min_words: int = PREFETCH_MIN_WORDS, stable_seconds: float = PREFETCH_STABLE_SECONDS):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.min_words = min_words
+        self.stable_seconds = stable_seconds
+        self._partial = None
+        self._partial_since = 0.0
+        self._speculation: Optional[tuple] = None
+        self._confirmed = {}
+        self._lock = threading.Lock()
+
+    def _discard(self, speculation: tuple, reason: str):
+        text, future = speculation
+        if not future.cancel():
+            future.add_done_callback(lambda _: get_recall_planner().discard_prefetch(self.session_id, text))
+        _count(reason)
+
+    def on_partial(self, partial: str):
+        if not PREFETCH_ENABLED:
+            return
+        text = normalize_query(partial)
+        now = time.monotonic()
+        if text != self._partial:
+            self._partial, self._partial_since = text, now
+            return
+        if len(text.split()) < self.min_words or now - self._partial_since < self.stable_seconds:
+            return
+        if self._speculation is not None:
+            if self._speculation[0] == text:
+                return
+            self._discard(self._speculation, "superseded")
+        self._speculation = (text, _prefetch_pool.submit(_prefetch_turn, self.user_id, self.session_id, text))
+        _count("started")
+
+    def on_final(self, transcript: str):
+        """Settles the current speculation against the final transcript."""
+        speculation, self._speculation, self._partial = self._speculation, None, None
+        if speculation is None:
+            return
+        if speculation[0] == normalize_query(transcript):
+            with self._lock:
+                self._confirmed = {speculation[0]: speculation[1]}
+            _count("reused")
+        else:
+            self._discard(speculation, "cancelled")
+
+    def wait_for(self, transcript: str, timeout: float = PREFETCH_WAIT_SECONDS) -> bool:
+        """Lets a still-running prefetch for this transcript finish before the turn needs it."""
+        with self._lock:
+            future: Optional[Future] = self._confirmed.pop(normalize_query(transcript), None)
+        if future is None:
+            return False
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            pass
+        return True
@@ -12,7 +12,7 @@ SYSTEM_PROMPT = """
     - First, analyze the conversation history and recall memories to see if the timezone is already known.
     - If not, your second step is to use the `retrieve_user_timezone` tool.
     - If that tool returns a "not found" message, your third and final step for this turn is to ASK the user for their timezone. Do not proceed further until you have it.
-    - Once the user provides a timezone, your next action should be to save it using `set_user_home_timezone` tool.
+    - Once the user provides a timezone, your next action should be to save it using `set_user_home_timezone` tool. If the user's calendar email is known, pass it as `calendar_id` so group scheduling can use their timezone.
 
 3.  **Advanced Conflict Resolution:**
     - Before creating an event, you MUST use the `check_availability` tool.
@@ -37,6 +37,12 @@ You have access to the following long-term memories relevant to this conversatio
 <recall_memories>
 {recall_memories}
 </recall_memories>
+
+**Earlier Conversation Summary:**
+Older turns of this conversation have been condensed to one line each. Treat them as part of the conversation history.
+<conversation_summary>
+{conversation_summary}
+</conversation_summary>
 """
 
 prompt = SystemMessagePromptTemplate.from_template(SYSTEM_PROMPT)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, HumanMessage
+from .embeddings import get_embedding_model
+from .memory import get_user_memory_shards
+
+load_dotenv()
+
+RECALL_TOP_K = int(os.getenv("RECALL_TOP_K", "5"))
+RECALL_SUMMARY_WEIGHT = float(os.getenv("RECALL_SUMMARY_WEIGHT", "0.0"))
+RECALL_SUMMARY_DECAY = float(os.getenv("RECALL_SUMMARY_DECAY", "0.7"))
+RECALL_MAX_TRACKED_SESSIONS = int(os.getenv("RECALL_MAX_TRACKED_SESSIONS", "1024"))
+RECALL_MAX_PREFETCHED = int(os.getenv("RECALL_MAX_PREFETCHED", "256"))
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _message_text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+class _SessionRecall:
+    __slots__ = ("key", "memories", "summary_vector")
+
+    def __init__(self):
+        self.key = None
+        self.memories: List[str] = []
+        self.summary_vector: Optional[np.ndarray] = None
+
+class RecallPlanner:
+    """
+    Decides what to search memory with on each turn. Only the newest user message is embedded, so
+    the cost of a recall does not grow with the length of the session. With `summary_weight` > 0 the
+    query is blended with a per-session rolling average of earlier user messages, updated one
+    message at a time. A recall is skipped, and the previous result reused, when neither the text of
+    the newest user message nor the user's memories have changed since it ran. `prefetch()` runs a recall
+    speculatively for text that is not a message yet (a stable voice partial); the turn whose
+    message matches it reuses the result.
+    """
+
+    def __init__(self, top_k: int = RECALL_TOP_K, summary_weight: float = RECALL_SUMMARY_WEIGHT, summary_decay: float = RECALL_SUMMARY_DECAY, max_sessions: int = RECALL_MAX_TRACKED_SESSIONS):
+        self.top_k = top_k
+        self.summary_weight = summary_weight
+        self.summary_decay = summary_decay
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _SessionRecall]" = OrderedDict()
+        self._prefetched: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.stats = {
+            "recalls": 0,
+            "skipped": 0,
+            "embed_seconds_total": 0.0,
+            "search_seconds_total": 0.0,
+            "last_recall_seconds": 0.0,
+            "max_recall_seconds": 0.0,
+            "prefetches": 0,
+            "prefetch_hits": 0,
+            "prefetches_discarded": 0,
+        }
+
+    def _session(self, session_id: str) -> _SessionRecall:
+        """Returns the session's recall state; the caller holds `_lock`."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _SessionRecall()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _query_vector(self, session: _SessionRecall, message_vector: np.ndarray) -> np.ndarray:
+        if self.summary_weight > 0 and session.summary_vector is not None:
+            return _unit((1 - self.summary_weight) * message_vector + self.summary_weight * session.summary_vector)
+        return message_vector
+
+    def _update_summary(self, session: _SessionRecall, message_vector: np.ndarray):
+        session.summary_vector = message_vector if session.summary_vector is None else _unit(
+            self.summary_decay * session.summary_vector + (1 - self.summary_decay) * message_vector
+        )
+
+    def prefetch(self, user_id: str, session_id: str, text: str):
+        """Embeds and searches for `text` ahead of its turn; the session's state is left untouched."""
+        shards = get_user_memory_shards()
+        version = shards.version(user_id)
+        message_vector = _unit(np.asarray(get_embedding_model().embed_query(text), dtype=np.float32))
+        with self._lock:
+            query_vector = self._query_vector(self._session(session_id), message_vector)
+        results = shards.search(user_id, query_vector.tolist(), k=self.top_k, metadata_filter={"session_id": session_id})
+        with self._lock:
+            self._prefetched[(session_id, normalize_query(text))] = (version, message_vector, [doc.page_content for doc in results])
+            while len(self._prefetched) > RECALL_MAX_PREFETCHED:
+                self._prefetched.popitem(last=False)
+            self.stats["prefetches"] += 1
+
+    def discard_prefetch(self, session_id: str, text: str):
+        with self._lock:
+            if self._prefetched.pop((session_id, normalize_query(text)), None) is not None:
+                self.stats["prefetches_discarded"] += 1
+
+    def recall(self, user_id: str, session_id: str, messages: Sequence[BaseMessage]) -> List[str]:
+        newest = next((message for message in reversed(messages) if isinstance(message, HumanMessage)), None)
+        if newest is None:
+            return []
+        text = _message_text(newest)
+        query = normalize_query(text)
+        shards = get_user_memory_shards()
+        # Every turn adds a new message with a new id, so the skip is keyed on what was asked, not on the message.
+        key = (query, shards.version(user_id))
+        with self._lock:
+            session = self._session(session_id)
+            if session.key == key:
+                self.stats["skipped"] += 1
+                return list(session.memories)
+            is_new_message = session.key is None or session.key[0] != query
+            prefetched = self._prefetched.pop((session_id, query), None)
+            if prefetched is not None and prefetched[0] == key[1]:
+                _, message_vector, memories = prefetched
+                if self.summary_weight > 0 and is_new_message:
+                    self._update_summary(session, message_vector)
+                session.key = key
+                session.memories = memories
+                self.stats["prefetch_hits"] += 1
+                return list(memories)
+
+        started = time.perf_counter()
+        message_vector = _unit(np.asarray(get_embedding_model().embed_query(text), dtype=np.float32))
+        with self._lock:
+            query_vector = self._query_vector(session, message_vector)
+            if self.summary_weight > 0 and is_new_message:
+                self._update_summary(session, message_vector)
+        embedded = time.perf_counter()
+
+        results = shards.search(user_id, query_vector.tolist(), k=self.top_k, metadata_filter={"session_id": session_id})
+        finished = time.perf_counter()
+
+        with self._lock:
+            session.key = key
+            session.memories = [doc.page_content for doc in results]
+            self.stats["recalls"] += 1
+            self.stats["embed_seconds_total"] += embedded - started
+            self.stats["search_seconds_total"] += finished - embedded
+            self.stats["last_recall_seconds"] = finished - started
+            self.stats["max_recall_seconds"] = max(self.stats["max_recall_seconds"], finished - started)
+            return list(session.memories)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        recalls = stats["recalls"]
+        stats["avg_embed_ms"] = round(1000 * stats["embed_seconds_total"] / recalls, 3) if recalls else 0.0
+        stats["avg_search_ms"] = round(1000 * stats["search_seconds_total"] / recalls, 3) if recalls else 0.0
+        return stats
+
+_recall_planner_instance = None
+_recall_planner_lock = threading.Lock()
+
+def get_recall_planner() -> RecallPlanner:
+    global _recall_planner_instance
+    with _recall_planner_lock:
+        if _recall_planner_instance is None:
+            _recall_planner_instance = RecallPlanner()
+        return _recall_planner_instance
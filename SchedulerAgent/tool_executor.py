@@ -0,0 +1,83 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List
+from dotenv import load_dotenv
+from langchain_core.messages import ToolMessage
+
+load_dotenv()
+
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+
+def tool_timeout(tool_name: str) -> float:
+    """Per-tool override via TOOL_TIMEOUT_SECONDS_<TOOL_NAME>, e.g. TOOL_TIMEOUT_SECONDS_FIND_GROUP_AVAILABILITY=60."""
+    return float(os.getenv(f"TOOL_TIMEOUT_SECONDS_{tool_name.upper()}", TOOL_TIMEOUT_SECONDS))
+
+class ToolExecutor:
+    """
+    Runs the tool calls of one LLM step concurrently on a bounded thread pool and returns their
+    ToolMessages in the order the calls were issued. A call that outruns its timeout, or raises,
+    becomes an error ToolMessage so the agent can react instead of the request stalling.
+    A timed-out call keeps its worker until the underlying request returns, which the HTTP timeout
+    on the calendar client bounds.
+    """
+
+    def __init__(self, tools_by_name: Dict, max_workers: int = TOOL_MAX_WORKERS):
+        self.tools_by_name = tools_by_name
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-tool")
+        self._lock = threading.Lock()
+        self.stats = {"steps": 0, "calls": 0, "parallel_steps": 0, "timeouts": 0, "errors": 0, "step_seconds_total": 0.0}
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def run(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        started = time.monotonic()
+        futures = []
+        for tool_call in tool_calls:
+            tool = self.tools_by_name.get(tool_call["name"])
+            futures.append(self._pool.submit(tool.invoke, tool_call["args"]) if tool else None)
+
+        outputs = []
+        for tool_call, future in zip(tool_calls, futures):
+            tool_name = tool_call["name"]
+            if future is None:
+                content = f"Error: Tool '{tool_name}' not found."
+            else:
+                timeout = tool_timeout(tool_name)
+                try:
+                    content = json.dumps(future.result(timeout=max(started + timeout - time.monotonic(), 0)), ensure_ascii=False)
+                except FutureTimeoutError:
+                    future.cancel()
+                    self._count("timeouts")
+                    content = f"Error: Tool '{tool_name}' timed out after {timeout:g} seconds."
+                except Exception as e:
+                    self._count("errors")
+                    content = f"Error: Tool '{tool_name}' failed: {e}"
+            outputs.append(ToolMessage(content=content, name=tool_name, tool_call_id=tool_call.get("id")))
+
+        self._count("steps")
+        self._count("calls", len(tool_calls))
+        self._count("parallel_steps", 1 if len(tool_calls) > 1 else 0)
+        self._count("step_seconds_total", time.monotonic() - started)
+        return outputs
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+_tool_executor_instance = None
+_tool_executor_lock = threading.Lock()
+
+def get_tool_executor(tools_by_name: Dict = None) -> ToolExecutor:
+    global _tool_executor_instance
+    with _tool_executor_lock:
+        if _tool_executor_instance is None:
+            if tools_by_name is None:
+                from tools import tools_by_name
+            _tool_executor_instance = ToolExecutor(tools_by_name)
+        return _tool_executor_instance
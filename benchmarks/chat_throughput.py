@@ -0,0 +1,123 @@
+"""
+`/chat` throughput against the number of server worker processes.
+
+For each worker count a gunicorn server (App/gunicorn.conf.py) is started on its own port, then
+`--clients` concurrent clients each send `--requests` chat turns, every client on its own session.
+Reported per worker count: requests/s, latency p50/p95 and errors. With `--url` the script
+measures an already running server once instead.
+
+The default message is answered by the fast path (no LLM round trip), so the numbers reflect the
+server's own CPU work: routing, checkpoints, memory writes. Pass `--message` to measure full agent
+turns, which need the LLM API keys in .env.
+
+    python benchmarks/chat_throughput.py                            # 1, 2 and 4 workers
+    python benchmarks/chat_throughput.py --workers 1 8 --clients 64
+    python benchmarks/chat_throughput.py --url http://127.0.0.1:8000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 180.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if requests.get(f"{url}/metrics", timeout=5).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become ready")
+
+def start_server(workers: int, port: int, threads: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_WORKERS": str(workers), "WEB_THREADS": str(threads), "WEB_BIND": f"127.0.0.1:{port}"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "App", "gunicorn.conf.py")],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def run_clients(url: str, clients: int, requests_per_client: int, message: str) -> dict:
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        session_id = f"bench_session_{uuid.uuid4()}"
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{url}/chat", json={"user_input": message, "session_id": session_id}, timeout=120)
+                ok = response.ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    wall_started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / wall,
+        "latency_ms_p50": 1000 * statistics.median(latencies) if latencies else float("nan"),
+        "latency_ms_p95": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else float("nan"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=32, help="threads per worker")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20, help="chat turns per client")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed chat turns per client before measuring")
+    parser.add_argument("--message", default="what is today's date")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--url", help="measure this running server instead of starting gunicorn")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'requests':>8} {'errors':>6} {'req/s':>8} {'speedup':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    baseline = None
+    for workers in ([None] if args.url else args.workers):
+        process = None
+        url = args.url
+        if url is None:
+            url = f"http://127.0.0.1:{args.port}"
+            process = start_server(workers, args.port, args.threads)
+        try:
+            if process is not None:
+                wait_until_ready(url, process)
+            if args.warmup:
+                run_clients(url, args.clients, args.warmup, args.message)
+            row = run_clients(url, args.clients, args.requests, args.message)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=60)
+        if baseline is None:
+            baseline = row["rps"]
+        label = "-" if workers is None else workers
+        speedup = row["rps"] / baseline if baseline else float("nan")
+        print(f"{label:>7} {row['requests']:>8} {row['errors']:>6} {row['rps']:>8.1f} {speedup:>6.2f}x {row['latency_ms_p50']:>8.0f} {row['latency_ms_p95']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Date parsing throughput: the parser before tools/date_parsing.py (regexes plus dateparser, then a
+second strptime pass for the time) against the single-pass parser, with and without its LRU cache.
+The expressions are the correctness corpus in tests/test_date_parsing.py.
+
+    python benchmarks/date_parsing_throughput.py
+"""
+import os
+import re
+import sys
+import time
+import calendar
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import dateparser
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.date_parsing import (
+    parse_natural_date, parse_datetime_expression, get_date_parser_stats, WEEKDAYS, _parse_cached, _split_expression
+)
+from tests.test_date_parsing import DATETIME_CORPUS, TIMEZONE
+
+PHRASES = [
+    "today", "tomorrow", "tomorrow at 3pm", "day after tomorrow", "in 3 days", "in two weeks",
+    "next Monday", "this Friday", "Friday at 4:30pm", "next Friday at 4pm", "last day of this month",
+    "first day of next month", "2025-06-30", "2025-06-30T14:00:00", "August 10, 2025", "Aug 10",
+    "10th of August", "on the 15th", "12/25", "next week", "in a month", "wednesday next week",
+]
+ROUNDS = 20
+
+def legacy_parse_natural_date(natural_str: str, reference_timezone: str = "UTC") -> str:
+    """The parser as it was before date_parsing.py, kept here as the benchmark baseline."""
+    natural_str_lower = natural_str.strip().lower()
+    today = datetime.now(ZoneInfo(reference_timezone))
+    if natural_str_lower == "today":
+        return today.date().isoformat()
+    if natural_str_lower == "tomorrow":
+        return (today + timedelta(days=1)).date().isoformat()
+    weekday_match = re.search(r"(this|next)?\s*(monday|tuesday|wednesday|thursday|friday|saturday|sunday)", natural_str_lower)
+    if weekday_match:
+        when, weekday_str = weekday_match.groups()
+        days_ahead = (WEEKDAYS[weekday_str] - today.weekday() + 7) % 7
+        if when == "next":
+            days_ahead += 7
+        elif when is None and days_ahead == 0:
+            days_ahead = 7
+        return (today + timedelta(days=days_ahead)).date().isoformat()
+    if "last day of this month" in natural_str_lower or "end of this month" in natural_str_lower:
+        return today.replace(day=calendar.monthrange(today.year, today.month)[1]).date().isoformat()
+    if "first day of next month" in natural_str_lower or "next month start" in natural_str_lower:
+        return (today.replace(day=1) + timedelta(days=32)).replace(day=1).date().isoformat()
+    parsed_dt = dateparser.parse(
+        natural_str,
+        languages=['en'],
+        settings={'TIMEZONE': reference_timezone, 'RETURN_AS_TIMEZONE_AWARE': True, 'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': today}
+    )
+    if not parsed_dt:
+        raise ValueError(f"Unable to parse a valid date from the input: '{natural_str}'.")
+    return parsed_dt.date().isoformat()
+
+def legacy_parse_datetime(start_time_str: str, event_timezone: str) -> datetime:
+    """What create_meeting did before parse_datetime_expression: a date parse plus a second regex/strptime pass."""
+    if "T" in start_time_str:
+        dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+        return dt.replace(tzinfo=ZoneInfo(event_timezone)) if dt.tzinfo is None else dt.astimezone(ZoneInfo(event_timezone))
+    date_obj = datetime.fromisoformat(legacy_parse_natural_date(start_time_str, event_timezone)).date()
+    time_str_match = re.search(r'\b(\d{1,2}(?::\d{2})?\s*(?:am|pm))\b', start_time_str, re.IGNORECASE) or re.search(r'\b(\d{1,2}:\d{2})\b', start_time_str)
+    if not time_str_match:
+        raise ValueError(f"Could not find a specific time in your request: '{start_time_str}'.")
+    for fmt in ('%I:%M%p', '%I%p', '%H:%M'):
+        try:
+            time_obj = datetime.strptime(time_str_match.group(1).replace(" ", "").upper(), fmt).time()
+            return datetime.combine(date_obj, time_obj).replace(tzinfo=ZoneInfo(event_timezone))
+        except ValueError:
+            continue
+    raise ValueError(f"Could not understand the time format of '{time_str_match.group(1)}'.")
+
+def legacy_failures() -> int:
+    failures = 0
+    for text, _ in DATETIME_CORPUS:
+        try:
+            legacy_parse_datetime(text, TIMEZONE)
+        except Exception:
+            failures += 1
+    return failures
+
+def run_benchmark(name, parse_fn, phrases=PHRASES, clear_cache=False):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        if clear_cache:
+            _parse_cached.cache_clear()
+            _split_expression.cache_clear()
+        for phrase in phrases:
+            try:
+                parse_fn(phrase, TIMEZONE)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - started
+    calls = ROUNDS * len(phrases)
+    print(f"⏱️  {name:<28} {calls / elapsed:>12,.0f} parses/s   ({elapsed / calls * 1e6:,.1f} µs/parse)")
+
+def main():
+    print(f"ℹ️  The previous create_meeting parsing rejects {legacy_failures()}/{len(DATETIME_CORPUS)} of the date+time corpus")
+
+    print(f"\n📊 Dates: {len(PHRASES)} phrases x {ROUNDS} rounds")
+    run_benchmark("before (legacy + dateparser)", legacy_parse_natural_date)
+    run_benchmark("after (fast rules, no cache)", parse_natural_date, clear_cache=True)
+    run_benchmark("after (fast rules + LRU)", parse_natural_date)
+
+    datetime_phrases = [text for text, _ in DATETIME_CORPUS]
+    print(f"\n📊 Date+time: {len(datetime_phrases)} expressions x {ROUNDS} rounds")
+    run_benchmark("before (two-pass legacy)", legacy_parse_datetime, datetime_phrases)
+    run_benchmark("after (single pass, no cache)", parse_datetime_expression, datetime_phrases, clear_cache=True)
+    run_benchmark("after (single pass + LRU)", parse_datetime_expression, datetime_phrases)
+    print(f"📈 Parser stats: {get_date_parser_stats()}")
+    mismatches = [(phrase, legacy_parse_natural_date(phrase, TIMEZONE), parse_natural_date(phrase, TIMEZONE)) for phrase in PHRASES
+                  if legacy_parse_natural_date(phrase, TIMEZONE) != parse_natural_date(phrase, TIMEZONE)]
+    for phrase, before, after in mismatches:
+        print(f"🔸 '{phrase}': before={before} after={after}")
+
+if __name__ == "__main__":
+    main()
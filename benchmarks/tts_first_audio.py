@@ -0,0 +1,54 @@
+"""
+Time-to-first-audio: buffered playback (download the whole utterance, then play) versus
+streaming playback through the ring buffer.
+
+    python benchmarks/tts_first_audio.py                      # offline, LocalToneTTS + null output
+    python benchmarks/tts_first_audio.py --engine elevenlabs  # real API (needs ELEVENLABS_API_KEY)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from speech import StreamingSpeaker, build_tts_engine
+
+SENTENCES = [
+    "Your meeting with Priya is booked for Tuesday at three in the afternoon.",
+    "I checked everyone's calendars and the earliest slot that works for all four of you is Thursday morning at nine thirty, Eastern time.",
+    "Done. I moved the design review to Friday and sent the updated invitation to the whole team.",
+]
+
+def run(speaker: StreamingSpeaker, text: str, buffered: bool) -> float:
+    if buffered:
+        speaker.play(lambda: [b"".join(speaker.engine.stream(text))])
+    else:
+        speaker.speak(text)
+    speaker.wait()
+    return speaker.last_first_audio_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", default="local", choices=["local", "elevenlabs"])
+    parser.add_argument("--output", default="null", choices=["null", "pyaudio"])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    speaker = StreamingSpeaker(build_tts_engine(args.engine), output=args.output)
+    print(f"Engine: {type(speaker.engine).__name__}, output: {args.output}, {args.runs} run(s) per sentence\n")
+    results = {"buffered": [], "streaming": []}
+    for text in SENTENCES:
+        for _ in range(args.runs):
+            for mode in results:
+                results[mode].append(run(speaker, text, buffered=(mode == "buffered")))
+    speaker.close()
+
+    print(f"{'mode':<10} {'median ms':>10} {'p90 ms':>8} {'max ms':>8}")
+    for mode, timings in results.items():
+        timings_ms = sorted(1000 * t for t in timings)
+        p90 = timings_ms[min(len(timings_ms) - 1, int(0.9 * len(timings_ms)))]
+        print(f"{mode:<10} {statistics.median(timings_ms):>10.0f} {p90:>8.0f} {timings_ms[-1]:>8.0f}")
+
+if __name__ == "__main__":
+    main()
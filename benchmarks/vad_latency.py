@@ -0,0 +1,120 @@
+"""
+VAD front end versus feeding every chunk to Kaldi, on recorded WAV fixtures (16 kHz mono PCM16):
+
+  * CPU per idle session: CPU seconds spent per second of non-speech audio (a fraction of a core).
+  * End-of-speech to transcript: audio time from the end of the last word to the moment a final
+    transcript is produced, plus the wall time spent processing that chunk.
+
+    python benchmarks/vad_latency.py path/to/utterance.wav [more.wav ...]
+    python benchmarks/vad_latency.py --idle-seconds 30           # idle cost only, synthetic room noise
+
+Audio is fed in the listen loop's 2048-sample chunks as fast as it can be processed. Without a
+Vosk model only the VAD side is measured. Speech end is taken as the last frame above
+VAD_ENERGY_THRESHOLD, so fixtures should be recorded with a quiet tail of a second or more.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from speech.vad import VAD_ENERGY_THRESHOLD, VoiceActivityDetector, frame_features
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 2048
+
+def read_wav(path: str) -> bytes:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return wav.readframes(wav.getnframes())
+
+def room_noise(seconds: float, level: float = 60.0) -> bytes:
+    rng = np.random.default_rng(0)
+    return np.clip(rng.normal(0, level, int(seconds * SAMPLE_RATE)), -32768, 32767).astype(np.int16).tobytes()
+
+def speech_end_seconds(audio: bytes) -> float:
+    frame_bytes = int(SAMPLE_RATE * 0.03) * 2
+    last = 0
+    for offset in range(0, len(audio) - frame_bytes + 1, frame_bytes):
+        if frame_features(audio[offset:offset + frame_bytes])[0] >= VAD_ENERGY_THRESHOLD:
+            last = offset + frame_bytes
+    return last / 2 / SAMPLE_RATE
+
+def make_recognizer():
+    try:
+        from speech import get_vosk_registry
+        registry = get_vosk_registry()
+        registry.get_model()
+        return registry.new_recognizer
+    except Exception as e:
+        print(f"⚠️ Recognizer unavailable ({e}); measuring the VAD only.\n")
+        return None
+
+def run(audio: bytes, new_recognizer, use_vad: bool) -> dict:
+    recognizer = new_recognizer() if new_recognizer else None
+    vad = VoiceActivityDetector() if use_vad else None
+    chunk_bytes = CHUNK_SAMPLES * 2
+    cpu_started = time.process_time()
+    transcript_at, transcript, vad_end_at, last_chunk_wall = None, "", None, 0.0
+    for offset in range(0, len(audio), chunk_bytes):
+        chunk = audio[offset:offset + chunk_bytes]
+        position = (offset + len(chunk)) / 2 / SAMPLE_RATE
+        wall_started = time.perf_counter()
+        speech, ended = vad.process(chunk) if vad else (chunk, False)
+        text = ""
+        if recognizer is not None:
+            if speech and recognizer.AcceptWaveform(speech):
+                text = json.loads(recognizer.Result()).get("text", "")
+            elif ended:
+                text = json.loads(recognizer.FinalResult()).get("text", "")
+        if ended and vad_end_at is None:
+            vad_end_at = position
+        if text and transcript_at is None:
+            transcript_at, transcript, last_chunk_wall = position, text, time.perf_counter() - wall_started
+    if recognizer is not None and transcript_at is None:
+        transcript = json.loads(recognizer.FinalResult()).get("text", "")
+    audio_seconds = len(audio) / 2 / SAMPLE_RATE
+    return {
+        "cpu_per_audio_second": (time.process_time() - cpu_started) / audio_seconds,
+        "transcript_at": transcript_at,
+        "processing_ms": 1000 * last_chunk_wall,
+        "transcript": transcript,
+        "vad_end_at": vad_end_at,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="*")
+    parser.add_argument("--idle-seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    new_recognizer = make_recognizer()
+    modes = [("kaldi-only", False), ("vad", True)] if new_recognizer else [("vad", True)]
+
+    idle = room_noise(args.idle_seconds)
+    print(f"Idle session ({args.idle_seconds:g}s of room noise)")
+    for name, use_vad in modes:
+        result = run(idle, new_recognizer, use_vad)
+        print(f"  {name:<11} CPU {100 * result['cpu_per_audio_second']:.2f}% of one core")
+
+    for path in args.wavs:
+        audio = read_wav(path)
+        speech_end = speech_end_seconds(audio)
+        print(f"\n{os.path.basename(path)} (speech ends at {speech_end:.2f}s)")
+        for name, use_vad in modes:
+            result = run(audio, new_recognizer, use_vad)
+            line = f"  {name:<11} CPU {100 * result['cpu_per_audio_second']:.2f}%"
+            if result["vad_end_at"] is not None:
+                line += f"  VAD end +{1000 * (result['vad_end_at'] - speech_end):.0f} ms"
+            if result["transcript_at"] is not None:
+                latency_ms = 1000 * (result["transcript_at"] - speech_end) + result["processing_ms"]
+                line += f"  transcript +{latency_ms:.0f} ms: \"{result['transcript']}\""
+            elif new_recognizer:
+                line += f"  no endpoint before end of file (final: \"{result['transcript']}\")"
+            print(line)
+
+if __name__ == "__main__":
+    main()
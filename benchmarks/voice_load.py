@@ -0,0 +1,110 @@
+"""
+Load test for browser-mode voice sessions: N simulated clients each open a SocketIO connection,
+start a transcribe-only voice session, and stream WAV files (16 kHz mono PCM16) as `audio_frame`
+events in real time, followed by silence so the server's VAD can close each utterance.
+
+Reported per run:
+  * recognition latency: end of speech in the WAV -> final `user_transcript` at the client
+  * CPU per stream: server process CPU (from /metrics) divided by wall time and client count
+
+Needs the SocketIO client extras: pip install "python-socketio[client]"
+
+    python App/app.py &
+    python benchmarks/voice_load.py utterance.wav [more.wav ...] --clients 1 10 25
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import requests
+import socketio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from vad_latency import read_wav, speech_end_seconds
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 2048
+TRAILING_SILENCE_SECONDS = 1.5
+
+def server_cpu_seconds(url: str) -> float:
+    return requests.get(f"{url}/metrics", timeout=10).json()["process"]["cpu_seconds"]
+
+class SimulatedClient:
+    def __init__(self, url: str, utterances):
+        self.url = url
+        self.utterances = utterances
+        self.latencies = []
+        self.missed = 0
+        self._final = threading.Event()
+        self._started = threading.Event()
+        self.client = socketio.Client(reconnection=False)
+        self.client.on("user_transcript", self._on_transcript)
+        self.client.on("voice_status", lambda data: self._started.set() if data.get("status") == "started" else None)
+
+    def _on_transcript(self, data):
+        if data.get("final", True):
+            self._final.set()
+
+    def run(self):
+        self.client.connect(self.url, transports=["websocket"])
+        try:
+            self.client.emit("start_voice", {"source": "browser", "agent": False})
+            if not self._started.wait(30):
+                raise RuntimeError("voice session did not start")
+            frame_bytes = FRAME_SAMPLES * 2
+            frame_seconds = FRAME_SAMPLES / SAMPLE_RATE
+            for audio, speech_end in self.utterances:
+                audio += b"\0" * int(TRAILING_SILENCE_SECONDS * SAMPLE_RATE) * 2
+                self._final.clear()
+                started = time.perf_counter()
+                for index, offset in enumerate(range(0, len(audio), frame_bytes)):
+                    # Pace frames like a live microphone would deliver them.
+                    delay = started + index * frame_seconds - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    self.client.emit("audio_frame", audio[offset:offset + frame_bytes])
+                if self._final.wait(5):
+                    self.latencies.append(time.perf_counter() - started - speech_end)
+                else:
+                    self.missed += 1
+            self.client.emit("stop_voice")
+        finally:
+            self.client.disconnect()
+
+def run_load(url: str, utterances, clients: int) -> dict:
+    simulated = [SimulatedClient(url, utterances) for _ in range(clients)]
+    threads = [threading.Thread(target=client.run, daemon=True) for client in simulated]
+    cpu_before, wall_started = server_cpu_seconds(url), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_started
+    cpu = server_cpu_seconds(url) - cpu_before
+    latencies = sorted(latency for client in simulated for latency in client.latencies)
+    return {
+        "clients": clients,
+        "transcripts": len(latencies),
+        "missed": sum(client.missed for client in simulated),
+        "latency_ms_p50": 1000 * statistics.median(latencies) if latencies else float("nan"),
+        "latency_ms_p95": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else float("nan"),
+        "cpu_percent_per_stream": 100 * cpu / wall / clients,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+
+    utterances = [(audio, speech_end_seconds(audio)) for audio in map(read_wav, args.wavs)]
+    print(f"{'clients':>7} {'transcripts':>11} {'missed':>6} {'latency p50 ms':>15} {'latency p95 ms':>15} {'CPU %/stream':>13}")
+    for clients in args.clients:
+        row = run_load(args.url, utterances, clients)
+        print(f"{row['clients']:>7} {row['transcripts']:>11} {row['missed']:>6} {row['latency_ms_p50']:>15.0f} {row['latency_ms_p95']:>15.0f} {row['cpu_percent_per_stream']:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Connect-to-listening latency and resident memory for N concurrent voice sessions, with the shared
+Vosk model registry versus loading a model per session (the old behaviour).
+
+Each (mode, N) runs in a fresh process so RSS is not polluted by the previous run. A session
+counts as "listening" once its recognizer has accepted its first buffer of audio.
+
+    python benchmarks/voice_sessions.py                          # 1, 10, 50 sessions, both modes
+    python benchmarks/voice_sessions.py --sessions 1 10 --modes shared
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FIRST_BUFFER = b"\0" * 2048 * 2
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+def child(mode: str, sessions: int, warm: bool):
+    import vosk
+    from speech import get_vosk_registry
+    from speech.recognition import VOSK_MODEL_PATH, VOSK_SAMPLE_RATE
+
+    baseline_mb = rss_mb()
+    registry = get_vosk_registry()
+    if mode == "shared" and warm:
+        registry.warmup()
+
+    recognizers, connect_seconds = [], []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        if mode == "shared":
+            recognizer = registry.new_recognizer()
+        else:
+            recognizer = vosk.KaldiRecognizer(vosk.Model(VOSK_MODEL_PATH), VOSK_SAMPLE_RATE)
+        recognizer.AcceptWaveform(FIRST_BUFFER)
+        connect_seconds.append(time.perf_counter() - started)
+        recognizers.append(recognizer)
+
+    print(json.dumps({
+        "connect_ms_median": 1000 * statistics.median(connect_seconds),
+        "connect_ms_max": 1000 * max(connect_seconds),
+        "rss_mb": rss_mb(),
+        "rss_mb_per_session": (rss_mb() - baseline_mb) / sessions,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--modes", nargs="+", default=["shared", "per-session"], choices=["shared", "per-session"])
+    parser.add_argument("--no-warmup", action="store_true", help="shared mode: let the first session load the model")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SESSIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), warm=not args.no_warmup)
+        return
+
+    print(f"{'mode':<12} {'sessions':>8} {'connect p50 ms':>15} {'connect max ms':>15} {'RSS MB':>8} {'MB/session':>11}")
+    for mode in args.modes:
+        for sessions in args.sessions:
+            command = [sys.executable, __file__, "--child", mode, str(sessions)] + (["--no-warmup"] if args.no_warmup else [])
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{mode:<12} {sessions:>8} failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+                continue
+            row = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:<12} {sessions:>8} {row['connect_ms_median']:>15.1f} {row['connect_ms_max']:>15.1f} {row['rss_mb']:>8.0f} {row['rss_mb_per_session']:>11.1f}")
+
+if __name__ == "__main__":
+    main()
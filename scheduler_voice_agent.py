@@ -1,136 +1,232 @@
-import pygame
 import threading
 import time
-import os
 import pyaudio
-import io
 import json
-import vosk
 from dotenv import load_dotenv
-from elevenlabs.client import ElevenLabs
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 from SchedulerAgent import (
     add_conversation_to_memory,
-    compile_agent_workflow
+    compile_agent_workflow,
+    get_memory_writer
 )
+from SchedulerAgent.prefetch import SpeculativePrefetcher
+from speech import StreamingSpeaker, SpeechPipeline, VoiceActivityDetector, VoicePipeline, TTS_CACHE_WARM, VAD_ENABLED, get_tts_engine, get_vosk_registry
 
 load_dotenv()
 
+_stream_stats_lock = threading.Lock()
+_stream_stats = {"responses": 0, "first_token_seconds_total": 0.0, "responses_with_tokens": 0, "total_seconds_total": 0.0}
+
+def _record_stream_timing(first_token_seconds, total_seconds):
+    with _stream_stats_lock:
+        _stream_stats["responses"] += 1
+        _stream_stats["total_seconds_total"] += total_seconds
+        if first_token_seconds is not None:
+            _stream_stats["responses_with_tokens"] += 1
+            _stream_stats["first_token_seconds_total"] += first_token_seconds
+
+def get_stream_stats() -> dict:
+    with _stream_stats_lock:
+        stats = dict(_stream_stats)
+    stats["avg_time_to_first_token_ms"] = round(1000 * stats["first_token_seconds_total"] / stats["responses_with_tokens"], 1) if stats["responses_with_tokens"] else 0.0
+    stats["avg_total_ms"] = round(1000 * stats["total_seconds_total"] / stats["responses"], 1) if stats["responses"] else 0.0
+    return stats
+
 class SchedulerAgent:
-    def __init__(self, user_id: str, user_name: str, use_tts: bool = True, socketio=None, sid=None):
+    def __init__(self, user_id: str, user_name: str, use_tts: bool = True, socketio=None, sid=None, respond: bool = True):
         print("▶️  Initializing SchedulerAgent...")
         self.user_id = user_id
         self.user_name = user_name
         self.use_tts = use_tts
         self.socketio = socketio
         self.sid = sid
+        self.respond = respond
         self.scheduler_agent = compile_agent_workflow()
+        self.memory_writer = get_memory_writer()
         self.current_session_id = f"voice_session_{user_id}"
+        self.prefetcher = SpeculativePrefetcher(user_id, self.current_session_id)
         self.stop_listening_event = threading.Event()
-        self.speak_thread = None
+        self.speaker = StreamingSpeaker(get_tts_engine())
+        self.speech = SpeechPipeline(self.speaker)
+        if self.use_tts and TTS_CACHE_WARM:
+            self.speech.warm()
+        print(f"🔊 Streaming TTS ready ({type(self.speaker.engine).__name__}, {self.speaker.output} output).")
 
-        try:
-            pygame.mixer.init()
-            print("🔊 Pygame mixer initialized.")
-        except Exception as e:
-            print(f"❌ Could not initialize pygame mixer: {e}. Audio playback will be disabled.")
-            self.use_tts = False
-
-        self.elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
-        if not self.elevenlabs_api_key:
-            raise ValueError("❌ ELEVENLABS_API_KEY not found in environment variables.")
-        self.eleven_client = ElevenLabs(api_key=self.elevenlabs_api_key)
-        self.voice_id = 'Rm2gUL5RDvWycN1zoSM4'
-        
-        print("➡️  Loading offline speech recognition model...")
-        model_path = os.getenv("VSOK_MODEL_PATH")
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"❌ Vosk model not found at path: {model_path}.")
-        
-        try:
-            self.vosk_model = vosk.Model(model_path)
-            self.recognizer = vosk.KaldiRecognizer(self.vosk_model, 16000)
-            self.recognizer.SetWords(False)
-            print("✔️  Offline model loaded successfully.")
-        except Exception as e:
-            raise RuntimeError(f"❌ Failed to load Vosk model: {e}")
+        # The acoustic model is loaded once per process; each session only gets its own recognizer.
+        self.recognizer = get_vosk_registry().new_recognizer()
+        self.vad = VoiceActivityDetector() if VAD_ENABLED else None
+        self._last_partial = ""
+        self.audio_source = None
+        self.voice_pipeline = VoicePipeline(
+            transcribe=self._transcribe,
+            respond=self._handle_final_transcript,
+            on_transcript=self._on_transcript,
+            on_audio_gap=self._on_audio_gap
+        )
 
         self.pyaudio_instance = None
         self.pyaudio_stream = None
         print("✅ Agent initialized successfully.")
 
+    def _on_transcript(self, transcript: str):
+        """Runs on the recognizer thread the moment a transcript is final, before the agent turn is queued."""
+        self._last_partial = ""
+        self.prefetcher.on_final(transcript)
+        self.stop_speaking()
+        if self.socketio:
+            self.socketio.emit('user_transcript', {'transcript': transcript, 'final': True}, to=self.sid)
+
+    def _emit_partial(self, partial: str):
+        if partial and partial != self._last_partial:
+            self._last_partial = partial
+            if self.socketio:
+                self.socketio.emit('user_transcript', {'transcript': partial, 'final': False}, to=self.sid)
+
     def _handle_final_transcript(self, transcript: str):
         print(f"👤 YOU: {transcript}")
-        if self.socketio:
-            self.socketio.emit('user_transcript', {'transcript': transcript}, to=self.sid)
+        if not self.respond:
+            return
         self.stop_speaking()
+        self.prefetcher.wait_for(transcript)
         print("🧠 Thinking...")
-        thoughts, final_response = self.get_agent_response(self.current_session_id, transcript)
+        utterance = self.speech.start() if self.use_tts else None
+        thoughts, final_response = [], ""
+        for event in self.stream_agent_response(self.current_session_id, transcript):
+            if event["type"] == "final":
+                thoughts, final_response = event["thoughts"], event["response"]
+                continue
+            # Only reply text is spoken; a step's tool plan arrives as a 'thought' and stays silent.
+            if utterance and event["type"] == "token":
+                utterance.feed(event["text"])
+            if self.socketio:
+                self.socketio.emit('agent_stream', event, to=self.sid)
         for idx, thought in enumerate(thoughts, 1):
             print(f"🤔 Thought {idx}: {thought.strip()}")
         print(f"🤖 AGENT: {final_response}")
         if self.socketio:
             self.socketio.emit('agent_thoughts', {'thoughts': thoughts}, to=self.sid)
             self.socketio.emit('agent_response', {'response': final_response}, to=self.sid)
-        if self.use_tts:
-            self.speak(final_response)
+        if utterance:
+            # Replies that were not streamed token by token (fast path, errors) are spoken whole.
+            utterance.finish(None if utterance.fed else final_response)
 
-    def get_agent_response(self, session_id: str, user_text: str):
-        config = RunnableConfig(configurable={"user_id": self.user_id, "thread_id": session_id})
+    def stream_agent_response(self, session_id: str, user_text: str):
+        """
+        Runs the agent and yields events as they are produced: 'token' (reply text, chunk by chunk
+        as the LLM writes it), 'thought' (the plan the LLM wrote before calling tools), 'tool_call'
+        and 'tool_result', then a single 'final' event with the response and this turn's thoughts.
+
+        A chunk that carries tool call chunks belongs to a tool-calling step, so it and the rest of
+        that step's message are plan text: it is reported once as a 'thought' when the step ends
+        instead of being streamed as reply tokens.
+        """
+        config = RunnableConfig(configurable={"user_id": self.user_id, "user_name": self.user_name, "thread_id": session_id})
+        started = time.perf_counter()
+        first_token_at = None
+        thoughts, final_response = [], None
+        tool_steps = set()
         try:
-            response = self.scheduler_agent.invoke(
+            for mode, chunk in self.scheduler_agent.stream(
                 input={"messages": [HumanMessage(content=user_text)]},
-                config=config, stream_mode="values"
-            )
+                config=config, stream_mode=["messages", "updates"]
+            ):
+                if mode == "messages":
+                    message_chunk, metadata = chunk
+                    if metadata.get("langgraph_node") != "Scheduler_Agent":
+                        continue
+                    step = message_chunk.id or metadata.get("langgraph_step")
+                    if getattr(message_chunk, "tool_call_chunks", None):
+                        tool_steps.add(step)
+                    if step not in tool_steps and isinstance(message_chunk.content, str) and message_chunk.content:
+                        first_token_at = first_token_at or time.perf_counter()
+                        yield {"type": "token", "text": message_chunk.content}
+                    continue
+                for node_name, update in chunk.items():
+                    for message in (update or {}).get("messages", []):
+                        if node_name == "Agent_Tools":
+                            thoughts.append(message.content)
+                            yield {"type": "tool_result", "name": message.name, "content": message.content}
+                        elif node_name in ("Scheduler_Agent", "fast_path_router"):
+                            if getattr(message, "tool_calls", None):
+                                if isinstance(message.content, str) and message.content:
+                                    thoughts.append(message.content)
+                                    yield {"type": "thought", "text": message.content}
+                                for tool_call in message.tool_calls:
+                                    yield {"type": "tool_call", "name": tool_call["name"], "args": tool_call["args"]}
+                            else:
+                                final_response = message.content
         except Exception as e:
             print(f"❌ Agent invocation failed: {e}")
-            return ["Agent failed to respond."], "Sorry, there was an error."
-        messages = response.get("messages", [])
-        thoughts = [msg.content for msg in messages[:-1]] if len(messages) > 1 else []
-        final_response = messages[-1].content if messages else "No response from agent."
+            yield {"type": "final", "response": "Sorry, there was an error.", "thoughts": ["Agent failed to respond."]}
+            return
+        final_response = final_response or "No response from agent."
+        _record_stream_timing(first_token_at - started if first_token_at else None, time.perf_counter() - started)
         add_conversation_to_memory(
             user_id=self.user_id, session_id=session_id,
             user_input=user_text, agent_response=final_response
         )
-        return thoughts, final_response
+        yield {"type": "final", "response": final_response, "thoughts": thoughts}
+
+    def get_agent_response(self, session_id: str, user_text: str):
+        for event in self.stream_agent_response(session_id, user_text):
+            if event["type"] == "final":
+                return event["thoughts"], event["response"]
 
     def speak(self, text: str):
         print(f"🗣️  Attempting to speak...")
-        self.stop_speaking()
-        def run_audio_playback():
-            if not pygame.mixer.get_init(): return
-            try:
-                clean_text = text.split("http")[0] if "http" in text else text
-                audio_generator = self.eleven_client.text_to_speech.convert(
-                    voice_id=self.voice_id, text=clean_text,
-                    model_id="eleven_multilingual_v2", output_format="mp3_44100_128"
-                )
-                audio_bytes = b"".join(audio_generator)
-                audio_data = io.BytesIO(audio_bytes)
-                pygame.mixer.music.load(audio_data)
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy(): time.sleep(0.1)
-            except Exception as e:
-                print(f"❌ An error occurred during audio playback: {e}")
-        self.speak_thread = threading.Thread(target=run_audio_playback)
-        self.speak_thread.start()
+        self.speech.speak(text)
 
     def stop_speaking(self):
-        if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
+        if self.speech.stop():
             print("⏹️  Interrupting speech.")
-            pygame.mixer.music.stop()
-            pygame.mixer.music.unload()
-        if self.speak_thread and self.speak_thread.is_alive():
-            self.speak_thread.join(timeout=0.5)
+
+    def _on_audio_gap(self):
+        """The recognizer fell behind and queued audio was dropped; start the next utterance from a clean decoder."""
+        print("⚠️ Recognizer fell behind; dropped the queued audio and restarted recognition.")
+        self.recognizer.Reset()
+        if self.vad:
+            self.vad.reset()
+        self._last_partial = ""
 
     def stop_listening(self):
         print("🛑 Stopping agent...")
         self.stop_listening_event.set()
         self.stop_speaking()
+        if self.audio_source == "browser":
+            self.voice_pipeline.stop()
+
+    def start_browser_audio(self):
+        """
+        Browser mode: 16 kHz PCM16 frames arrive over SocketIO through submit_audio_frame() and go
+        straight into the pipeline, so no sound hardware is needed on the server.
+        """
+        self.audio_source = "browser"
+        self.voice_pipeline.start()
+        print("🌐 Listening to audio streamed from the browser.")
+
+    def submit_audio_frame(self, frame: bytes):
+        if not self.stop_listening_event.is_set():
+            self.voice_pipeline.submit_audio(frame)
+
+    def _transcribe(self, data: bytes) -> str:
+        """Feeds captured audio through the VAD gate into the recognizer; returns a final transcript or ''."""
+        speech, ended = self.vad.process(data) if self.vad else (data, False)
+        if speech:
+            if self.recognizer.AcceptWaveform(speech):
+                return json.loads(self.recognizer.Result()).get("text", "")
+            if not ended:
+                partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+                self.prefetcher.on_partial(partial)
+                self._emit_partial(partial)
+        if ended:
+            # The VAD heard the end of speech; finalize now instead of waiting for Kaldi's endpointer.
+            return json.loads(self.recognizer.FinalResult()).get("text", "")
+        return ""
 
     def listen_and_respond(self):
         print("🎙️  Starting listening loop with offline model...")
+        self.audio_source = "microphone"
         self.pyaudio_instance = pyaudio.PyAudio()
         self.pyaudio_stream = self.pyaudio_instance.open(
             format=pyaudio.paInt16, channels=1, rate=16000,
@@ -138,17 +234,14 @@ class SchedulerAgent:
         )
         self.pyaudio_stream.start_stream()
         print("🎤 Microphone is now open and listening!")
-        
+        # This thread only captures; recognition and agent turns run on the pipeline's workers.
+        self.voice_pipeline.start()
+
         try:
             while not self.stop_listening_event.is_set():
+                started = time.perf_counter()
                 data = self.pyaudio_stream.read(2048, exception_on_overflow=False)
-                
-                if self.recognizer.AcceptWaveform(data):
-                    result_json = self.recognizer.Result()
-                    result_dict = json.loads(result_json)
-                    transcript = result_dict.get("text", "")
-                    if transcript:
-                        self._handle_final_transcript(transcript)
+                self.voice_pipeline.submit_audio(data, time.perf_counter() - started)
 
         except KeyboardInterrupt:
             self.stop_listening()
@@ -156,9 +249,12 @@ class SchedulerAgent:
             print(f"❌ An error occurred in listen loop: {e}")
         finally:
             print("🧹 Cleaning up resources...")
+            self.voice_pipeline.stop()
             if self.pyaudio_stream and self.pyaudio_stream.is_active():
                 self.pyaudio_stream.stop_stream()
                 self.pyaudio_stream.close()
             if self.pyaudio_instance:
                 self.pyaudio_instance.terminate()
+            self.speech.close()
+            self.speaker.close()
             print("✅ Cleanup complete.")
\ No newline at end of file
@@ -0,0 +1,7 @@
+from .tts import ElevenLabsTTS, LocalToneTTS, build_tts_engine, get_tts_engine
+from .playback import PCMRingBuffer, StreamingSpeaker, get_playback_stats
+from .pipeline import SentenceChunker, PhraseAudioCache, SpeechPipeline, TTS_CACHE_WARM, get_phrase_cache
+from .recognition import VoskModelRegistry, VOSK_WARMUP, get_vosk_registry
+from .vad import VoiceActivityDetector, VAD_ENABLED, get_vad_stats
+from .voice_pipeline import StageQueue, VoicePipeline, get_voice_pipeline_stats
+__all__ = ["ElevenLabsTTS","LocalToneTTS","build_tts_engine","get_tts_engine","PCMRingBuffer","StreamingSpeaker","get_playback_stats","SentenceChunker","PhraseAudioCache","SpeechPipeline","TTS_CACHE_WARM","get_phrase_cache","VoskModelRegistry","VOSK_WARMUP","get_vosk_registry","VoiceActivityDetector","VAD_ENABLED","get_vad_stats","StageQueue","VoicePipeline","get_voice_pipeline_stats"]
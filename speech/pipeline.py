@@ -0,0 +1,280 @@
+import os
+import re
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TTS_SYNTHESIS_WORKERS = int(os.getenv("TTS_SYNTHESIS_WORKERS", "2"))
+TTS_MIN_SENTENCE_CHARS = int(os.getenv("TTS_MIN_SENTENCE_CHARS", "12"))
+TTS_PIPELINE_IDLE_SECONDS = float(os.getenv("TTS_PIPELINE_IDLE_SECONDS", "60"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+TTS_CACHE_MAX_PHRASE_CHARS = int(os.getenv("TTS_CACHE_MAX_PHRASE_CHARS", "80"))
+TTS_CACHE_WARM = os.getenv("TTS_CACHE_WARM", "1") == "1"
+# Phrases synthesized once at startup so they play from memory; "|"-separated to override.
+TTS_CACHE_PHRASES = [phrase for phrase in os.getenv("TTS_CACHE_PHRASES", "|".join([
+    "Sorry, there was an error.",
+    "No response from agent.",
+    "Done.",
+    "Your meeting has been scheduled.",
+    "The event has been deleted.",
+    "The event has been rescheduled.",
+])).split("|") if phrase.strip()]
+
+# A sentence ends at . ! ? or … followed by whitespace (closing quotes/brackets stay with it), or at a newline.
+SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+|\n+")
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.lower().split())
+
+class SentenceChunker:
+    """
+    Cuts streamed text into sentences as soon as each one is complete. Fragments shorter than
+    `min_chars` ("Dr.", "Done.") are joined to what follows so synthesis gets natural units.
+    Like the old one-shot speak(), nothing from a link ("http...") onwards is spoken.
+    """
+
+    def __init__(self, min_chars: int = TTS_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.muted = False
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        if self.muted:
+            return []
+        self._buffer += text
+        link = self._buffer.find("http")
+        if link != -1:
+            self._buffer = self._buffer[:link]
+            self.muted = True
+            return self.flush()
+        sentences, start = [], 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+class PhraseAudioCache:
+    """LRU of synthesized PCM for short phrases, bounded by total bytes and shared by every session."""
+
+    def __init__(self, max_bytes: int = TTS_CACHE_MAX_BYTES, max_phrase_chars: int = TTS_CACHE_MAX_PHRASE_CHARS):
+        self.max_bytes = max_bytes
+        self.max_phrase_chars = max_phrase_chars
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.warmed_namespaces = set()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def claim_warmup(self, namespace: str) -> bool:
+        """True the first time it is called for `namespace`, so each voice is warmed once per process."""
+        with self._lock:
+            if namespace in self.warmed_namespaces:
+                return False
+            self.warmed_namespaces.add(namespace)
+            return True
+
+    def cacheable(self, text: str) -> bool:
+        return len(text) <= self.max_phrase_chars
+
+    def get(self, namespace: str, text: str) -> Optional[bytes]:
+        key = (namespace, normalize_phrase(text))
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return audio
+
+    def put(self, namespace: str, text: str, audio: bytes):
+        if not self.cacheable(text) or len(audio) > self.max_bytes:
+            return
+        key = (namespace, normalize_phrase(text))
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = audio
+            self._bytes += len(audio)
+            self.stats["stores"] += 1
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+class _Synthesis:
+    """One sentence's audio, filled by a synthesis worker (or the cache) and drained in order by playback."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.chunks = queue.Queue()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.chunks.put(None)
+
+class SpeechUtterance:
+    """
+    A reply being spoken while it is still being generated. `feed()` takes streamed text, and each
+    completed sentence starts synthesizing right away; playback starts with the first sentence and
+    continues through the rest in order. `finish()` marks the end of the reply.
+    """
+
+    def __init__(self, pipeline: "SpeechPipeline"):
+        self.pipeline = pipeline
+        self.fed = False
+        self._chunker = SentenceChunker()
+        self._sentences = queue.Queue()
+        self._submitted = []
+        self._playing = False
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def feed(self, text: str):
+        self.fed = True
+        for sentence in self._chunker.feed(text):
+            self._submit(sentence)
+
+    def finish(self, text: str = None):
+        if text:
+            self.feed(text)
+        for sentence in self._chunker.flush():
+            self._submit(sentence)
+        self._sentences.put(None)
+
+    def _submit(self, sentence: str):
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            synthesis = self.pipeline.synthesize(sentence)
+            self._submitted.append(synthesis)
+            self._sentences.put(synthesis)
+            start_playback, self._playing = not self._playing, True
+        if start_playback:
+            self.pipeline.speaker.play(self._audio)
+
+    def _audio(self) -> Iterator[bytes]:
+        """Runs on the speaker's feeder thread; the ring buffer's backpressure paces it."""
+        try:
+            while True:
+                synthesis = self._sentences.get(timeout=TTS_PIPELINE_IDLE_SECONDS)
+                if synthesis is None:
+                    return
+                while True:
+                    chunk = synthesis.chunks.get(timeout=TTS_PIPELINE_IDLE_SECONDS)
+                    if chunk is None:
+                        break
+                    yield chunk
+        except queue.Empty:
+            print("⚠️ Speech pipeline timed out waiting for text; ending the utterance.")
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            submitted, self._submitted = self._submitted, []
+        for synthesis in submitted:
+            synthesis.cancel()
+        self._sentences.put(None)
+
+class SpeechPipeline:
+    """
+    Sentence-level TTS for a StreamingSpeaker: up to `workers` sentences synthesize concurrently
+    while earlier ones play, and short phrases come from a shared PhraseAudioCache when possible.
+    """
+
+    def __init__(self, speaker, cache: PhraseAudioCache = None, workers: int = TTS_SYNTHESIS_WORKERS):
+        self.speaker = speaker
+        self.engine = speaker.engine
+        self.cache = cache or get_phrase_cache()
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="tts-synthesis")
+        self._current = None
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str) -> _Synthesis:
+        synthesis = _Synthesis(text)
+        audio = self.cache.get(self.engine.cache_namespace, text) if self.cache.cacheable(text) else None
+        if audio is not None:
+            synthesis.chunks.put(audio)
+            synthesis.chunks.put(None)
+        else:
+            self._pool.submit(self._run_synthesis, synthesis)
+        return synthesis
+
+    def _run_synthesis(self, synthesis: _Synthesis):
+        parts = []
+        try:
+            if synthesis.cancelled.is_set():
+                return
+            for chunk in self.engine.stream(synthesis.text):
+                if synthesis.cancelled.is_set():
+                    return
+                synthesis.chunks.put(chunk)
+                parts.append(chunk)
+            self.cache.put(self.engine.cache_namespace, synthesis.text, b"".join(parts))
+        except Exception as e:
+            print(f"❌ Speech synthesis failed for '{synthesis.text[:40]}': {e}")
+        finally:
+            synthesis.chunks.put(None)
+
+    def start(self) -> SpeechUtterance:
+        """Begins a new utterance, interrupting the current one."""
+        self.stop()
+        utterance = SpeechUtterance(self)
+        with self._lock:
+            self._current = utterance
+        return utterance
+
+    def speak(self, text: str):
+        self.start().finish(text)
+
+    def stop(self) -> bool:
+        with self._lock:
+            utterance, self._current = self._current, None
+        if utterance is not None:
+            utterance.cancel()
+        return self.speaker.stop()
+
+    def warm(self, phrases: List[str] = None):
+        """Synthesizes fixed phrases into the cache in the background, once per engine voice."""
+        if not self.cache.claim_warmup(self.engine.cache_namespace):
+            return
+        for phrase in TTS_CACHE_PHRASES if phrases is None else phrases:
+            self._pool.submit(self._run_synthesis, _Synthesis(phrase))
+
+    def close(self):
+        self.stop()
+        self._pool.shutdown(wait=False)
+
+_phrase_cache_instance = None
+_phrase_cache_lock = threading.Lock()
+
+def get_phrase_cache() -> PhraseAudioCache:
+    global _phrase_cache_instance
+    with _phrase_cache_lock:
+        if _phrase_cache_instance is None:
+            _phrase_cache_instance = PhraseAudioCache()
+        return _phrase_cache_instance
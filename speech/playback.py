@@ -0,0 +1,250 @@
+import os
+import time
+import threading
+from typing import Callable, Iterable, Optional
+from dotenv import load_dotenv
+from .tts import SAMPLE_WIDTH
+
+load_dotenv()
+
+# "pyaudio" plays through the default output device; "null" drains in real time without one
+# (headless servers, benchmarks).
+TTS_OUTPUT = os.getenv("TTS_OUTPUT", "pyaudio")
+TTS_RING_BUFFER_SECONDS = float(os.getenv("TTS_RING_BUFFER_SECONDS", "2"))
+TTS_FRAMES_PER_BUFFER = int(os.getenv("TTS_FRAMES_PER_BUFFER", "1024"))
+RING_WAIT_SECONDS = 0.05
+
+_playback_stats_lock = threading.Lock()
+_playback_stats = {
+    "utterances": 0,
+    "interrupted": 0,
+    "failed": 0,
+    "underruns": 0,
+    "first_audio_seconds_total": 0.0,
+    "utterances_with_audio": 0,
+}
+
+def _record_playback(first_audio_seconds: Optional[float], underruns: int, interrupted: bool, failed: bool):
+    with _playback_stats_lock:
+        _playback_stats["utterances"] += 1
+        _playback_stats["underruns"] += underruns
+        _playback_stats["interrupted"] += 1 if interrupted else 0
+        _playback_stats["failed"] += 1 if failed else 0
+        if first_audio_seconds is not None:
+            _playback_stats["utterances_with_audio"] += 1
+            _playback_stats["first_audio_seconds_total"] += first_audio_seconds
+
+def get_playback_stats() -> dict:
+    with _playback_stats_lock:
+        stats = dict(_playback_stats)
+    stats["avg_time_to_first_audio_ms"] = round(1000 * stats["first_audio_seconds_total"] / stats["utterances_with_audio"], 1) if stats["utterances_with_audio"] else 0.0
+    return stats
+
+class PCMRingBuffer:
+    """
+    Fixed-size byte ring between the TTS download and the audio device. Writers block while it is
+    full, which paces the download to playback; reads never block and only hand out whole frames.
+    """
+
+    def __init__(self, capacity: int, frame_bytes: int = SAMPLE_WIDTH):
+        self.capacity = capacity - capacity % frame_bytes
+        self.frame_bytes = frame_bytes
+        self._buffer = bytearray(self.capacity)
+        self._start = 0
+        self._size = 0
+        self._finished = False
+        self._cond = threading.Condition()
+
+    def write(self, data: bytes, cancelled: threading.Event) -> bool:
+        """Copies all of `data` in, waiting for room; returns False if cancelled first."""
+        view = memoryview(data)
+        while view:
+            with self._cond:
+                while self._size == self.capacity:
+                    if cancelled.is_set():
+                        return False
+                    self._cond.wait(RING_WAIT_SECONDS)
+                end = (self._start + self._size) % self.capacity
+                count = min(len(view), self.capacity - self._size, self.capacity - end)
+                self._buffer[end:end + count] = view[:count]
+                self._size += count
+                view = view[count:]
+        return not cancelled.is_set()
+
+    def read(self, max_bytes: int) -> bytes:
+        with self._cond:
+            count = min(max_bytes, self._size)
+            count -= count % self.frame_bytes
+            first = min(count, self.capacity - self._start)
+            data = bytes(self._buffer[self._start:self._start + first]) + bytes(self._buffer[:count - first])
+            self._start = (self._start + count) % self.capacity
+            self._size -= count
+            self._cond.notify_all()
+            return data
+
+    def finish(self):
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._start = self._size = 0
+            self._cond.notify_all()
+
+    @property
+    def drained(self) -> bool:
+        with self._cond:
+            return self._finished and self._size < self.frame_bytes
+
+class _PyAudioOutput:
+    """Callback-mode output stream: the device thread pulls each buffer straight from the ring."""
+
+    def __init__(self, pyaudio_instance, pull: Callable[[int], bytes], sample_rate: int, frames_per_buffer: int):
+        import pyaudio
+
+        def callback(in_data, frame_count, time_info, status):
+            return pull(frame_count * SAMPLE_WIDTH), pyaudio.paContinue
+
+        self._stream = pyaudio_instance.open(
+            format=pyaudio.paInt16, channels=1, rate=sample_rate,
+            output=True, frames_per_buffer=frames_per_buffer, stream_callback=callback
+        )
+        self._stream.start_stream()
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+
+class _NullOutput:
+    """Consumes audio at the real-time rate without a device, so timings match real playback."""
+
+    def __init__(self, pull: Callable[[int], bytes], sample_rate: int, frames_per_buffer: int):
+        self._closed = threading.Event()
+        buffer_seconds = frames_per_buffer / sample_rate
+
+        def run():
+            while not self._closed.wait(buffer_seconds):
+                pull(frames_per_buffer * SAMPLE_WIDTH)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._closed.set()
+        self._thread.join(timeout=1)
+
+class StreamingSpeaker:
+    """
+    Plays a TTS engine's PCM stream while it is still being synthesized. One utterance plays at a
+    time: a feeder thread copies engine chunks into a ring buffer and the output device drains it,
+    so audio starts with the first chunk rather than after the whole download. `stop()` (barge-in)
+    silences the device at once and abandons the rest of the stream.
+    """
+
+    def __init__(self, engine, output: str = TTS_OUTPUT, ring_buffer_seconds: float = TTS_RING_BUFFER_SECONDS, frames_per_buffer: int = TTS_FRAMES_PER_BUFFER):
+        if output not in ("pyaudio", "null"):
+            raise ValueError(f"❌ Unknown TTS_OUTPUT '{output}'. Use 'pyaudio' or 'null'.")
+        self.engine = engine
+        self.sample_rate = engine.sample_rate
+        self.output = output
+        self.ring_capacity = int(ring_buffer_seconds * self.sample_rate) * SAMPLE_WIDTH
+        self.frames_per_buffer = frames_per_buffer
+        self._pyaudio = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cancelled = None
+        self.last_first_audio_seconds = None
+
+    def _open_output(self, pull: Callable[[int], bytes]):
+        if self.output == "null":
+            return _NullOutput(pull, self.sample_rate, self.frames_per_buffer)
+        if self._pyaudio is None:
+            import pyaudio
+            self._pyaudio = pyaudio.PyAudio()
+        return _PyAudioOutput(self._pyaudio, pull, self.sample_rate, self.frames_per_buffer)
+
+    def speak(self, text: str):
+        self.play(lambda: self.engine.stream(text))
+
+    def play(self, make_chunks: Callable[[], Iterable[bytes]]):
+        """Starts playing the chunks `make_chunks()` yields, interrupting whatever is playing."""
+        self.stop()
+        cancelled = threading.Event()
+        thread = threading.Thread(target=self._play, args=(make_chunks, cancelled), daemon=True)
+        with self._lock:
+            self._thread, self._cancelled = thread, cancelled
+        thread.start()
+
+    def _play(self, make_chunks: Callable[[], Iterable[bytes]], cancelled: threading.Event):
+        ring = PCMRingBuffer(self.ring_capacity)
+        started = time.perf_counter()
+        first_audio_at = None
+        underruns = 0
+        failed = False
+
+        def pull(max_bytes: int) -> bytes:
+            nonlocal first_audio_at, underruns
+            if cancelled.is_set():
+                return b"\0" * max_bytes
+            data = ring.read(max_bytes)
+            if data and first_audio_at is None:
+                first_audio_at = time.perf_counter()
+            if len(data) < max_bytes and first_audio_at is not None and not ring.drained:
+                underruns += 1
+            return data + b"\0" * (max_bytes - len(data))
+
+        output = None
+        chunks = None
+        try:
+            output = self._open_output(pull)
+            chunks = make_chunks()
+            for chunk in chunks:
+                if not ring.write(chunk, cancelled):
+                    break
+            ring.finish()
+            while not cancelled.is_set() and not ring.drained:
+                time.sleep(RING_WAIT_SECONDS)
+            # Let the device play out the last buffer it pulled.
+            cancelled.wait(self.frames_per_buffer / self.sample_rate)
+        except Exception as e:
+            failed = True
+            print(f"❌ An error occurred during audio playback: {e}")
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            if output is not None:
+                output.close()
+        self.last_first_audio_seconds = first_audio_at - started if first_audio_at else None
+        _record_playback(self.last_first_audio_seconds, underruns, cancelled.is_set(), failed)
+
+    @property
+    def is_speaking(self) -> bool:
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until the current utterance has finished playing; returns False on timeout."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def stop(self) -> bool:
+        """Interrupts the current utterance; returns True if something was playing."""
+        with self._lock:
+            thread, cancelled = self._thread, self._cancelled
+            self._thread = self._cancelled = None
+        if thread is None or not thread.is_alive():
+            return False
+        cancelled.set()
+        thread.join(timeout=0.5)
+        return True
+
+    def close(self):
+        self.stop()
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
@@ -0,0 +1,78 @@
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# VSOK_MODEL_PATH is the name the project has always used; VOSK_MODEL_PATH is accepted too.
+VOSK_MODEL_PATH = os.getenv("VSOK_MODEL_PATH") or os.getenv("VOSK_MODEL_PATH") or "model"
+VOSK_SAMPLE_RATE = 16000
+VOSK_WARMUP = os.getenv("VOSK_WARMUP", "1") == "1"
+WARMUP_SECONDS = 0.5
+
+class VoskModelRegistry:
+    """
+    Loads each Vosk acoustic model once per process and hands out a cheap KaldiRecognizer per
+    voice session. The model is read-only after loading and Vosk allows recognizers on several
+    threads to share it; only the recognizer holds per-utterance decoding state.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self.stats = {"models_loaded": 0, "model_load_seconds_total": 0.0, "recognizers_created": 0, "warmups": 0}
+
+    def get_model(self, model_path: str = VOSK_MODEL_PATH):
+        import vosk
+
+        with self._lock:
+            model = self._models.get(model_path)
+            if model is not None:
+                return model
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"❌ Vosk model not found at path: {model_path}.")
+            print(f"➡️  Loading offline speech recognition model from {model_path}...")
+            started = time.perf_counter()
+            try:
+                model = vosk.Model(model_path)
+            except Exception as e:
+                raise RuntimeError(f"❌ Failed to load Vosk model: {e}")
+            self._models[model_path] = model
+            self.stats["models_loaded"] += 1
+            self.stats["model_load_seconds_total"] += time.perf_counter() - started
+            print(f"✔️  Offline model loaded in {time.perf_counter() - started:.1f}s.")
+            return model
+
+    def new_recognizer(self, sample_rate: int = VOSK_SAMPLE_RATE, model_path: str = VOSK_MODEL_PATH):
+        import vosk
+
+        recognizer = vosk.KaldiRecognizer(self.get_model(model_path), sample_rate)
+        recognizer.SetWords(False)
+        with self._lock:
+            self.stats["recognizers_created"] += 1
+        return recognizer
+
+    def warmup(self, model_path: str = VOSK_MODEL_PATH):
+        """Loads the model and decodes a short stretch of silence so the first session pays nothing."""
+        recognizer = self.new_recognizer(model_path=model_path)
+        recognizer.AcceptWaveform(b"\0" * int(WARMUP_SECONDS * VOSK_SAMPLE_RATE) * 2)
+        recognizer.FinalResult()
+        with self._lock:
+            self.stats["warmups"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["models"] = list(self._models)
+        return stats
+
+_vosk_registry_instance = None
+_vosk_registry_lock = threading.Lock()
+
+def get_vosk_registry() -> VoskModelRegistry:
+    global _vosk_registry_instance
+    with _vosk_registry_lock:
+        if _vosk_registry_instance is None:
+            _vosk_registry_instance = VoskModelRegistry()
+        return _vosk_registry_instance
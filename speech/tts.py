@@ -0,0 +1,100 @@
+import os
+import math
+import time
+import zlib
+import threading
+from array import array
+from typing import Iterator
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TTS_ENGINE = os.getenv("TTS_ENGINE", "elevenlabs")
+TTS_SAMPLE_RATE = int(os.getenv("TTS_SAMPLE_RATE", "22050"))
+ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "Rm2gUL5RDvWycN1zoSM4")
+ELEVENLABS_TTS_MODEL = os.getenv("ELEVENLABS_TTS_MODEL", "eleven_multilingual_v2")
+# PCM sample rates the ElevenLabs API can stream (output_format="pcm_<rate>").
+ELEVENLABS_PCM_RATES = (16000, 22050, 24000, 44100)
+LOCAL_TTS_FIRST_CHUNK_SECONDS = float(os.getenv("LOCAL_TTS_FIRST_CHUNK_SECONDS", "0.15"))
+LOCAL_TTS_REALTIME_FACTOR = float(os.getenv("LOCAL_TTS_REALTIME_FACTOR", "0.2"))
+SAMPLE_WIDTH = 2
+
+class ElevenLabsTTS:
+    """Streams raw 16-bit mono PCM from ElevenLabs, chunk by chunk as the API produces it."""
+
+    def __init__(self, api_key: str = None, voice_id: str = ELEVENLABS_VOICE_ID, model_id: str = ELEVENLABS_TTS_MODEL, sample_rate: int = TTS_SAMPLE_RATE):
+        from elevenlabs.client import ElevenLabs
+
+        api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
+            raise ValueError("❌ ELEVENLABS_API_KEY not found in environment variables.")
+        if sample_rate not in ELEVENLABS_PCM_RATES:
+            raise ValueError(f"❌ TTS_SAMPLE_RATE must be one of {ELEVENLABS_PCM_RATES} for ElevenLabs, got {sample_rate}.")
+        self.client = ElevenLabs(api_key=api_key)
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.sample_rate = sample_rate
+        self.cache_namespace = f"elevenlabs:{voice_id}:{model_id}:{sample_rate}"
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        text_to_speech = self.client.text_to_speech
+        # `stream` in current SDKs, `convert_as_stream` in 1.x; both hit the streaming endpoint.
+        stream = getattr(text_to_speech, "stream", None) or text_to_speech.convert_as_stream
+        for chunk in stream(voice_id=self.voice_id, text=text, model_id=self.model_id, output_format=f"pcm_{self.sample_rate}"):
+            if chunk:
+                yield chunk
+
+class LocalToneTTS:
+    """
+    Offline stand-in engine for benchmarks and development without an API key. It "speaks" each
+    word as a short tone, waits `first_chunk_seconds` before the first chunk like a network round
+    trip would, then produces audio `realtime_factor` times faster than it plays.
+    """
+
+    WORD_SECONDS = 0.22
+    GAP_SECONDS = 0.06
+    CHUNK_SECONDS = 0.1
+
+    def __init__(self, sample_rate: int = TTS_SAMPLE_RATE, first_chunk_seconds: float = LOCAL_TTS_FIRST_CHUNK_SECONDS, realtime_factor: float = LOCAL_TTS_REALTIME_FACTOR):
+        self.sample_rate = sample_rate
+        self.first_chunk_seconds = first_chunk_seconds
+        self.realtime_factor = realtime_factor
+        self.cache_namespace = f"local:{sample_rate}"
+
+    def _render(self, text: str) -> bytes:
+        samples = array("h")
+        word_samples = int(self.WORD_SECONDS * self.sample_rate)
+        gap = array("h", [0]) * int(self.GAP_SECONDS * self.sample_rate)
+        for word in text.split():
+            frequency = 180 + zlib.crc32(word.lower().encode()) % 220
+            step = 2 * math.pi * frequency / self.sample_rate
+            samples.extend(int(6000 * math.sin(step * i)) for i in range(word_samples))
+            samples.extend(gap)
+        return samples.tobytes()
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        audio = self._render(text)
+        chunk_bytes = int(self.CHUNK_SECONDS * self.sample_rate) * SAMPLE_WIDTH
+        time.sleep(self.first_chunk_seconds)
+        for offset in range(0, len(audio), chunk_bytes):
+            yield audio[offset:offset + chunk_bytes]
+            time.sleep(self.CHUNK_SECONDS * self.realtime_factor)
+
+def build_tts_engine(engine: str = TTS_ENGINE):
+    """Builds the engine selected by TTS_ENGINE: "elevenlabs" (default) or "local"."""
+    if engine == "local":
+        return LocalToneTTS()
+    if engine == "elevenlabs":
+        return ElevenLabsTTS()
+    raise ValueError(f"❌ Unknown TTS_ENGINE '{engine}'. Use 'elevenlabs' or 'local'.")
+
+_tts_engine_instance = None
+_tts_engine_lock = threading.Lock()
+
+def get_tts_engine():
+    """Process-wide engine (one ElevenLabs client) shared by every voice session."""
+    global _tts_engine_instance
+    with _tts_engine_lock:
+        if _tts_engine_instance is None:
+            _tts_engine_instance = build_tts_engine()
+        return _tts_engine_instance
@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import deque
+from typing import Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+# Same scale as mic_test.py's VOLUME_THRESHOLD (RMS of 16-bit samples).
+VAD_ENERGY_THRESHOLD = float(os.getenv("VAD_ENERGY_THRESHOLD", "300"))
+VAD_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))
+VAD_UNVOICED_ZCR = float(os.getenv("VAD_UNVOICED_ZCR", "0.25"))
+VAD_MAX_ZCR = float(os.getenv("VAD_MAX_ZCR", "0.6"))
+VAD_START_FRAMES = int(os.getenv("VAD_START_FRAMES", "3"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "400"))
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "300"))
+NOISE_FLOOR_ADAPTATION = 0.05
+SAMPLE_WIDTH = 2
+
+_vad_stats_lock = threading.Lock()
+_vad_stats = {"frames": 0, "speech_frames": 0, "frames_forwarded": 0, "segments": 0}
+
+def get_vad_stats() -> dict:
+    with _vad_stats_lock:
+        stats = dict(_vad_stats)
+    stats["forwarded_ratio"] = round(stats["frames_forwarded"] / stats["frames"], 3) if stats["frames"] else 0.0
+    return stats
+
+def frame_features(frame: bytes) -> Tuple[float, float]:
+    """RMS energy and zero-crossing rate (crossings per sample) of one 16-bit mono frame."""
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    if samples.size == 0:
+        return 0.0, 0.0
+    rms = float(np.sqrt(np.mean(samples * samples)))
+    signs = np.signbit(samples)
+    zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / samples.size
+    return rms, zcr
+
+class VoiceActivityDetector:
+    """
+    Energy plus zero-crossing VAD that gates audio before it reaches the recognizer.
+
+    A frame is speech when it is loud enough (above the fixed threshold and `noise_ratio` times
+    the tracked noise floor) without being hiss-like, or is a quieter high-ZCR frame (fricatives
+    such as "s" and "f"). A segment opens after `start_frames` speech frames in a row, and the
+    `preroll_ms` of audio before it is forwarded too so word onsets are not clipped. It closes
+    after `hangover_ms` of non-speech, which is reported as the end of the utterance.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = VAD_FRAME_MS,
+        energy_threshold: float = VAD_ENERGY_THRESHOLD,
+        noise_ratio: float = VAD_NOISE_RATIO,
+        start_frames: int = VAD_START_FRAMES,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        preroll_ms: int = VAD_PREROLL_MS
+    ):
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * SAMPLE_WIDTH
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.start_frames = max(start_frames, 1)
+        self.hangover_frames = max(hangover_ms // frame_ms, 1)
+        self.noise_floor = energy_threshold / noise_ratio
+        self.in_speech = False
+        self._pending = b""
+        self._preroll = deque(maxlen=max(preroll_ms // frame_ms, self.start_frames))
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def is_speech(self, frame: bytes) -> bool:
+        rms, zcr = frame_features(frame)
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        speech = zcr <= VAD_MAX_ZCR and (rms >= threshold or (rms >= threshold / 2 and zcr >= VAD_UNVOICED_ZCR))
+        if not speech and not self.in_speech:
+            self.noise_floor += NOISE_FLOOR_ADAPTATION * (rms - self.noise_floor)
+        return speech
+
+    def process(self, chunk: bytes) -> Tuple[bytes, bool]:
+        """
+        Takes any amount of captured audio; returns the audio to pass to the recognizer (empty
+        while nobody is speaking) and whether a speech segment ended within this chunk.
+        """
+        data = self._pending + chunk
+        whole = len(data) - len(data) % self.frame_bytes
+        self._pending = data[whole:]
+        forwarded, ended = [], False
+        frames = speech_frames = 0
+        for offset in range(0, whole, self.frame_bytes):
+            frame = data[offset:offset + self.frame_bytes]
+            speech = self.is_speech(frame)
+            frames += 1
+            speech_frames += 1 if speech else 0
+            if self.in_speech:
+                forwarded.append(frame)
+                self._silence_run = 0 if speech else self._silence_run + 1
+                if self._silence_run >= self.hangover_frames:
+                    self.in_speech, ended = False, True
+                    self._speech_run = self._silence_run = 0
+                continue
+            self._preroll.append(frame)
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.start_frames:
+                self.in_speech = True
+                forwarded.extend(self._preroll)
+                self._preroll.clear()
+                self._silence_run = 0
+        with _vad_stats_lock:
+            _vad_stats["frames"] += frames
+            _vad_stats["speech_frames"] += speech_frames
+            _vad_stats["frames_forwarded"] += len(forwarded)
+            _vad_stats["segments"] += 1 if ended else 0
+        return b"".join(forwarded), ended
+
+    def reset(self):
+        self.in_speech = False
+        self._pending = b""
+        self._preroll.clear()
+        self._speech_run = self._silence_run = 0
@@ -0,0 +1,237 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 64 chunks of 2048 samples is about 8 s of 16 kHz audio.
+VOICE_AUDIO_QUEUE_CHUNKS = int(os.getenv("VOICE_AUDIO_QUEUE_CHUNKS", "64"))
+VOICE_TRANSCRIPT_QUEUE_SIZE = int(os.getenv("VOICE_TRANSCRIPT_QUEUE_SIZE", "4"))
+# How long the capture side may wait for room in the audio queue before the backlog is dropped.
+VOICE_AUDIO_PUT_TIMEOUT_SECONDS = float(os.getenv("VOICE_AUDIO_PUT_TIMEOUT_SECONDS", "0.5"))
+STAGE_POLL_SECONDS = 0.2
+
+DROP_OLDEST = "drop_oldest"
+DROP_SEGMENT = "drop_segment"
+
+# Queued in place of a dropped audio backlog so the recognizer restarts instead of decoding spliced audio.
+AUDIO_GAP = object()
+
+_drop_totals_lock = threading.Lock()
+_drop_totals = {"items_dropped": 0, "segments_dropped": 0, "backpressure_waits": 0}
+
+def get_voice_pipeline_stats() -> dict:
+    """Process-wide drop counters; they outlive the sessions whose per-queue stats disappear on disconnect."""
+    with _drop_totals_lock:
+        return dict(_drop_totals)
+
+class StageQueue:
+    """
+    Bounded hand-off between two pipeline stages. When the queue is full the producer first waits
+    up to `put_timeout` seconds for the consumer to catch up. If it is still full, the overflow
+    policy decides: DROP_OLDEST discards the oldest item (a superseded transcript is worth less
+    than the newest), DROP_SEGMENT discards the whole backlog and queues AUDIO_GAP in its place,
+    so a recognizer never sees one utterance with a hole cut out of it. Tracks depth, drops,
+    backpressure waits, and how long items wait.
+    """
+
+    def __init__(self, name: str, maxsize: int, put_timeout: float = 0.0, overflow: str = DROP_OLDEST):
+        self.name = name
+        self.maxsize = max(maxsize, 1)
+        self.put_timeout = put_timeout
+        self.overflow = overflow
+        self._items = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            "put": 0, "taken": 0, "dropped": 0, "segments_dropped": 0, "backpressure_waits": 0,
+            "backpressure_seconds_total": 0.0, "max_depth": 0, "wait_seconds_total": 0.0
+        }
+
+    def _full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    def put(self, item) -> bool:
+        """Enqueues `item`, waiting at most `put_timeout` for room; returns False if items had to be dropped."""
+        with self._cond:
+            if self._full() and self.put_timeout > 0 and not self._closed:
+                started = time.monotonic()
+                self.stats["backpressure_waits"] += 1
+                self._cond.wait_for(lambda: not self._full() or self._closed, self.put_timeout)
+                self.stats["backpressure_seconds_total"] += time.monotonic() - started
+                waited = True
+            else:
+                waited = False
+            dropped = 0
+            if self._full():
+                if self.overflow == DROP_SEGMENT:
+                    dropped = sum(1 for queued, _ in self._items if queued is not AUDIO_GAP)
+                    self._items.clear()
+                    self._items.append((AUDIO_GAP, time.monotonic()))
+                    self.stats["segments_dropped"] += 1
+                else:
+                    self._items.popleft()
+                    dropped = 1
+                self.stats["dropped"] += dropped
+            self._items.append((item, time.monotonic()))
+            self.stats["put"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self._items))
+            self._cond.notify_all()
+        if waited or dropped:
+            with _drop_totals_lock:
+                _drop_totals["backpressure_waits"] += 1 if waited else 0
+                _drop_totals["items_dropped"] += dropped
+                _drop_totals["segments_dropped"] += 1 if dropped and self.overflow == DROP_SEGMENT else 0
+        return not dropped
+
+    def get(self, timeout: float = STAGE_POLL_SECONDS):
+        """Returns the next item, or None on timeout or once the queue is closed and empty."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item, enqueued_at = self._items.popleft()
+            self._cond.notify_all()
+            self.stats["taken"] += 1
+            self.stats["wait_seconds_total"] += time.monotonic() - enqueued_at
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            stats = dict(self.stats)
+            stats["depth"] = len(self._items)
+        stats["avg_wait_ms"] = round(1000 * stats["wait_seconds_total"] / stats["taken"], 2) if stats["taken"] else 0.0
+        return stats
+
+class _Stage:
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = {"processed": 0, "errors": 0, "busy_seconds_total": 0.0, "max_busy_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.stats["processed"] += 1
+            self.stats["errors"] += 1 if failed else 0
+            self.stats["busy_seconds_total"] += seconds
+            self.stats["max_busy_seconds"] = max(self.stats["max_busy_seconds"], seconds)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["avg_busy_ms"] = round(1000 * stats["busy_seconds_total"] / stats["processed"], 2) if stats["processed"] else 0.0
+        return stats
+
+class VoicePipeline:
+    """
+    Capture -> recognition -> agent, each stage on its own thread, joined by bounded StageQueues.
+
+    The capture side only calls `submit_audio()`, so a long LLM round trip never stops audio from
+    being read. If the recognizer falls behind, `submit_audio()` waits briefly for it and then
+    drops the queued backlog as one segment; `on_audio_gap()` runs on the recognizer thread so
+    it can reset its decoder before the next chunk. The recognizer keeps transcribing while the
+    agent works, and each new transcript is passed to `on_transcript()` on the recognizer thread
+    right away (barge-in, showing it in the UI) before it is queued for the agent.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[bytes], str],
+        respond: Callable[[str], None],
+        on_transcript: Optional[Callable[[str], None]] = None,
+        on_audio_gap: Optional[Callable[[], None]] = None,
+        audio_queue_chunks: int = VOICE_AUDIO_QUEUE_CHUNKS,
+        transcript_queue_size: int = VOICE_TRANSCRIPT_QUEUE_SIZE,
+        audio_put_timeout: float = VOICE_AUDIO_PUT_TIMEOUT_SECONDS
+    ):
+        self.transcribe = transcribe
+        self.respond = respond
+        self.on_transcript = on_transcript
+        self.on_audio_gap = on_audio_gap
+        self.audio_queue = StageQueue("audio", audio_queue_chunks, put_timeout=audio_put_timeout, overflow=DROP_SEGMENT)
+        self.transcript_queue = StageQueue("transcripts", transcript_queue_size)
+        self.capture_stage = _Stage("capture")
+        self.recognizer_stage = _Stage("recognizer")
+        self.agent_stage = _Stage("agent")
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._recognizer_loop, name="voice-recognizer", daemon=True),
+            threading.Thread(target=self._agent_loop, name="voice-agent", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit_audio(self, chunk: bytes, captured_seconds: float = 0.0):
+        """Called by the capture side for every chunk; blocks for at most the audio queue's put timeout."""
+        self.audio_queue.put(chunk)
+        self.capture_stage.record(captured_seconds)
+
+    def _recognizer_loop(self):
+        while True:
+            chunk = self.audio_queue.get()
+            if self._stopping.is_set():
+                return
+            if chunk is None:
+                continue
+            if chunk is AUDIO_GAP:
+                if self.on_audio_gap:
+                    try:
+                        self.on_audio_gap()
+                    except Exception as e:
+                        print(f"❌ Recognizer stage failed to reset after dropped audio: {e}")
+                continue
+            started, failed, transcript = time.perf_counter(), False, ""
+            try:
+                transcript = self.transcribe(chunk)
+            except Exception as e:
+                failed = True
+                print(f"❌ Recognizer stage failed on a chunk: {e}")
+            self.recognizer_stage.record(time.perf_counter() - started, failed)
+            if transcript:
+                if self.on_transcript:
+                    try:
+                        self.on_transcript(transcript)
+                    except Exception as e:
+                        print(f"❌ Recognizer stage failed to hand off a transcript: {e}")
+                self.transcript_queue.put(transcript)
+
+    def _agent_loop(self):
+        while True:
+            transcript = self.transcript_queue.get()
+            if self._stopping.is_set():
+                return
+            if transcript is None:
+                continue
+            started, failed = time.perf_counter(), False
+            try:
+                self.respond(transcript)
+            except Exception as e:
+                failed = True
+                print(f"❌ Agent stage failed: {e}")
+            self.agent_stage.record(time.perf_counter() - started, failed)
+
+    def stop(self, timeout: float = 5.0):
+        """Stops both workers, discarding queued audio and transcripts; a turn in progress gets `timeout` to finish."""
+        self._stopping.set()
+        self.audio_queue.close()
+        self.transcript_queue.close()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            "queues": {queue.name: queue.get_stats() for queue in (self.audio_queue, self.transcript_queue)},
+            "stages": {stage.name: stage.get_stats() for stage in (self.capture_stage, self.recognizer_stage, self.agent_stage)},
+        }
@@ -0,0 +1,113 @@
+import threading
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+import scheduler_voice_agent
+from scheduler_voice_agent import SchedulerAgent
+from speech import PhraseAudioCache, SpeechPipeline, StreamingSpeaker
+
+class FakeGraph:
+    """Replays a scripted `stream()`; callables in the script run in between, like a slow LLM."""
+
+    def __init__(self, script):
+        self.script = script
+
+    def stream(self, input, config, stream_mode):
+        for item in self.script:
+            if callable(item):
+                item()
+            else:
+                yield item
+
+def _token(text, message_id="reply", **kwargs):
+    return ("messages", (AIMessageChunk(content=text, id=message_id, **kwargs), {"langgraph_node": "Scheduler_Agent"}))
+
+def _step(message):
+    return ("updates", {"Scheduler_Agent": {"messages": [message]}})
+
+def _agent(script) -> SchedulerAgent:
+    agent = SchedulerAgent.__new__(SchedulerAgent)
+    agent.user_id, agent.user_name = "user", "User"
+    agent.scheduler_agent = FakeGraph(script)
+    return agent
+
+class StreamAgentResponseTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(scheduler_voice_agent, "add_conversation_to_memory")
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_reply_tokens_are_yielded_while_the_step_is_still_running(self):
+        progress = []
+        agent = _agent([
+            _token("Your meeting "),
+            lambda: progress.append("second chunk generated"),
+            _token("is at 4 PM."),
+            _step(AIMessage(content="Your meeting is at 4 PM.", id="reply")),
+        ])
+        events = agent.stream_agent_response("session", "when is my meeting")
+        first = next(events)
+        self.assertEqual(first, {"type": "token", "text": "Your meeting "})
+        self.assertEqual(progress, [])
+        rest = list(events)
+        self.assertEqual(rest[0], {"type": "token", "text": "is at 4 PM."})
+        self.assertEqual(rest[-1]["response"], "Your meeting is at 4 PM.")
+
+    def test_tool_plan_chunks_are_reported_as_a_thought(self):
+        tool_call = {"name": "get_todays_date", "args": {}, "id": "call-1"}
+        agent = _agent([
+            _token("Let me check the date.", message_id="plan", tool_call_chunks=[{"name": "get_todays_date", "args": "{}", "id": "call-1", "index": 0}]),
+            _token(" One moment.", message_id="plan"),
+            _step(AIMessage(content="Let me check the date. One moment.", id="plan", tool_calls=[tool_call])),
+            _token("It is Sunday."),
+            _step(AIMessage(content="It is Sunday.", id="reply")),
+        ])
+        events = list(agent.stream_agent_response("session", "what day is it"))
+        self.assertEqual([event["type"] for event in events], ["thought", "tool_call", "token", "final"])
+        self.assertEqual(events[0]["text"], "Let me check the date. One moment.")
+        self.assertEqual(events[2]["text"], "It is Sunday.")
+        self.assertEqual(events[3]["response"], "It is Sunday.")
+
+class RecordingTTS:
+    sample_rate = 16000
+    cache_namespace = "recording"
+
+    def __init__(self):
+        self.synthesized = []
+        self.first_sentence = threading.Event()
+
+    def stream(self, text):
+        self.synthesized.append(text)
+        self.first_sentence.set()
+        yield b"\0\0" * 160
+
+class VoiceReplyTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(scheduler_voice_agent, "add_conversation_to_memory")
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_first_sentence_is_synthesized_before_the_reply_is_finished(self):
+        engine = RecordingTTS()
+        synthesized_mid_stream = []
+        agent = _agent([
+            _token("Your meeting is booked for Friday. "),
+            lambda: synthesized_mid_stream.append(engine.first_sentence.wait(5)),
+            _token("See you then, have a good day."),
+            _step(AIMessage(content="Your meeting is booked for Friday. See you then, have a good day.", id="reply")),
+        ])
+        agent.respond, agent.use_tts, agent.socketio = True, True, None
+        agent.current_session_id = "voice_session_user"
+        agent.prefetcher = mock.Mock()
+        agent.speaker = StreamingSpeaker(engine, output="null")
+        agent.speech = SpeechPipeline(agent.speaker, cache=PhraseAudioCache())
+        self.addCleanup(agent.speech.close)
+
+        agent._handle_final_transcript("book my meeting")
+
+        self.assertEqual(synthesized_mid_stream, [True])
+        self.assertEqual(engine.synthesized[0], "Your meeting is booked for Friday.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tools import calendar_tools, event_cache
+from tools.event_cache import EventCache
+from tools.fake_calendar import FakeCalendarService
+from tools.user_profiles import UserProfileStore
+
+CALENDAR_ID = "me@example.com"
+
+class CalendarToolsTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.service = FakeCalendarService()
+        self.profiles = UserProfileStore(db_path=os.path.join(self.folder, "user_profiles.db"), legacy_pickle_path=None)
+        patches = [
+            mock.patch.object(calendar_tools, "GOOGLE_CALENDAR_ID", CALENDAR_ID),
+            mock.patch.object(calendar_tools, "get_calendar_service", lambda: self.service),
+            mock.patch.object(calendar_tools, "get_user_profile_store", lambda: self.profiles),
+            mock.patch.object(event_cache, "_event_cache_instance", EventCache(CALENDAR_ID, snapshot_path=None)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def check_availability(self, start_time, end_time):
+        return calendar_tools.check_availability.invoke({
+            "search_date": "tomorrow", "start_time": start_time, "end_time": end_time,
+            "duration_minutes": 30, "timezone": "America/New_York"
+        })
+
+    def test_clock_times_without_meridiem_are_taken_as_written(self):
+        result = self.check_availability("7:00", "10:00")
+        self.assertTrue(result.startswith("Available slots found"), result)
+        self.assertIn("07:00 AM", result)
+
+    def test_inverted_window_is_an_error(self):
+        result = self.check_availability("5pm", "9am")
+        self.assertTrue(result.startswith("Error: the end time"), result)
+
+    def test_group_availability_finds_participant_timezones_by_calendar_id(self):
+        self.profiles.update("alice", timezone="Asia/Kolkata", calendar_id="alice@example.com")
+        self.profiles.update("bob@example.com", timezone="Europe/Berlin")
+        with mock.patch.object(calendar_tools, "find_group_slots", return_value=[]) as find_group_slots:
+            calendar_tools.find_group_availability.invoke({
+                "participant_ids": ["alice@example.com", "bob@example.com", "carol@example.com"],
+                "search_date": "tomorrow", "duration_minutes": 30, "timezone": "America/New_York"
+            })
+        self.assertEqual(find_group_slots.call_args.kwargs["participant_timezones"], {
+            CALENDAR_ID: "America/New_York",
+            "alice@example.com": "Asia/Kolkata",
+            "bob@example.com": "Europe/Berlin",
+            "carol@example.com": "America/New_York",
+        })
+
+if __name__ == "__main__":
+    unittest.main()
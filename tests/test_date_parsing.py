@@ -0,0 +1,137 @@
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from tools.date_parsing import get_date_parser_stats, parse_datetime_expression, parse_datetime_range, parse_natural_date, parse_time_of_day
+
+TIMEZONE = "America/New_York"
+# Sunday 2026-10-18 13:00 in TIMEZONE; every expected value below is relative to it.
+REFERENCE = datetime(2026, 10, 18, 13, 0, tzinfo=ZoneInfo(TIMEZONE))
+
+DATETIME_CORPUS = [
+    ("today at 3pm", "2026-10-18T15:00:00-04:00"),
+    ("today 5:30 pm", "2026-10-18T17:30:00-04:00"),
+    ("tonight at 8", "2026-10-18T20:00:00-04:00"),
+    ("this afternoon at 2", "2026-10-18T14:00:00-04:00"),
+    ("tomorrow at 9am", "2026-10-19T09:00:00-04:00"),
+    ("tomorrow 9:30AM", "2026-10-19T09:30:00-04:00"),
+    ("Tomorrow at noon", "2026-10-19T12:00:00-04:00"),
+    ("tomorrow at midnight", "2026-10-19T00:00:00-04:00"),
+    ("tmrw 10am", "2026-10-19T10:00:00-04:00"),
+    ("day after tomorrow at 11:15am", "2026-10-20T11:15:00-04:00"),
+    ("in 2 days at 4pm", "2026-10-20T16:00:00-04:00"),
+    ("in two weeks at 10:00", "2026-11-01T10:00:00-05:00"),
+    ("in a week at 9am", "2026-10-25T09:00:00-04:00"),
+    ("3 days from now at 1pm", "2026-10-21T13:00:00-04:00"),
+    ("next monday at 9am", "2026-10-26T09:00:00-04:00"),
+    ("next Monday 09:00", "2026-10-26T09:00:00-04:00"),
+    ("this friday at 4:30 pm", "2026-10-23T16:30:00-04:00"),
+    ("friday at 4pm", "2026-10-23T16:00:00-04:00"),
+    ("Friday 16:00", "2026-10-23T16:00:00-04:00"),
+    ("fri at 2pm", "2026-10-23T14:00:00-04:00"),
+    ("sat at 10am", "2026-10-24T10:00:00-04:00"),
+    ("last friday at 5pm", "2026-10-16T17:00:00-04:00"),
+    ("wednesday next week at 3pm", "2026-10-21T15:00:00-04:00"),
+    ("next week thursday 11am", "2026-10-22T11:00:00-04:00"),
+    ("on Monday at 10", "2026-10-19T10:00:00-04:00"),
+    ("coming tuesday at 2 p.m.", "2026-10-20T14:00:00-04:00"),
+    ("thursday morning at 9", "2026-10-22T09:00:00-04:00"),
+    ("friday evening at 7", "2026-10-23T19:00:00-04:00"),
+    ("sunday at 6am", "2026-10-25T06:00:00-04:00"),
+    ("next sunday at 6pm", "2026-10-25T18:00:00-04:00"),
+    ("August 10, 2025 at 2pm", "2025-08-10T14:00:00-04:00"),
+    ("Aug 10 at 9:15 pm", "2027-08-10T21:15:00-04:00"),
+    ("10 August 2027 14:00", "2027-08-10T14:00:00-04:00"),
+    ("10th of august at 3pm", "2027-08-10T15:00:00-04:00"),
+    ("Sept 3rd at 11am", "2027-09-03T11:00:00-04:00"),
+    ("dec 31st, 2026 at 11:59pm", "2026-12-31T23:59:00-05:00"),
+    ("jan 2 at 8am", "2027-01-02T08:00:00-05:00"),
+    ("on the 15th at 3 p.m.", "2026-11-15T15:00:00-05:00"),
+    ("the 5th at 10am", "2026-11-05T10:00:00-05:00"),
+    ("3rd at 4pm", "2026-11-03T16:00:00-05:00"),
+    ("12/25 at 11:00", "2026-12-25T11:00:00-05:00"),
+    ("6/30/2027 at 2pm", "2027-06-30T14:00:00-04:00"),
+    ("2025-06-30 14:00", "2025-06-30T14:00:00-04:00"),
+    ("2025/07/01 at 9am", "2025-07-01T09:00:00-04:00"),
+    ("2025-06-30T14:00:00", "2025-06-30T14:00:00-04:00"),
+    ("2025-06-30T14:00:00Z", "2025-06-30T10:00:00-04:00"),
+    ("2025-06-30T14:00:00+05:30", "2025-06-30T04:30:00-04:00"),
+    ("2026-12-01t09:30", "2026-12-01T09:30:00-05:00"),
+    ("last day of this month at 5pm", "2026-10-31T17:00:00-04:00"),
+    ("end of next month at 10am", "2026-11-30T10:00:00-05:00"),
+    ("first day of next month at 9am", "2026-11-01T09:00:00-05:00"),
+    ("next month start at 10:30", "2026-11-01T10:30:00-05:00"),
+    ("last weekday of this month at 3pm", "2026-10-30T15:00:00-04:00"),
+    ("9am", "2026-10-19T09:00:00-04:00"),
+    ("10:30", "2026-10-19T10:30:00-04:00"),
+    ("2pm", "2026-10-18T14:00:00-04:00"),
+    ("noon", "2026-10-19T12:00:00-04:00"),
+    ("at 4", "2026-10-18T16:00:00-04:00"),
+    ("at 11", "2026-10-19T11:00:00-04:00"),
+    ("at 4:30", "2026-10-18T16:30:00-04:00"),
+    ("tomorrow at 4:30", "2026-10-19T16:30:00-04:00"),
+    ("tomorrow at 04:30", "2026-10-19T04:30:00-04:00"),
+    ("midnight", "2026-10-19T00:00:00-04:00"),
+]
+RANGE_CORPUS = [
+    ("tomorrow 9am-5pm", "2026-10-19T09:00:00-04:00", "2026-10-19T17:00:00-04:00"),
+    ("friday from 2:00 to 3:30pm", "2026-10-23T14:00:00-04:00", "2026-10-23T15:30:00-04:00"),
+    ("next monday 11-1pm", "2026-10-26T11:00:00-04:00", "2026-10-26T13:00:00-04:00"),
+    ("9 to 11am", "2026-10-18T09:00:00-04:00", "2026-10-18T11:00:00-04:00"),
+    ("tomorrow between 10am and 2pm", "2026-10-19T10:00:00-04:00", "2026-10-19T14:00:00-04:00"),
+    ("dec 1 14:00-15:30", "2026-12-01T14:00:00-05:00", "2026-12-01T15:30:00-05:00"),
+    ("today 8pm-1am", "2026-10-18T20:00:00-04:00", "2026-10-19T01:00:00-04:00"),
+    ("tomorrow 11:00-1:00", "2026-10-19T11:00:00-04:00", "2026-10-19T13:00:00-04:00"),
+    ("tomorrow 2:00-3:30", "2026-10-19T14:00:00-04:00", "2026-10-19T15:30:00-04:00"),
+    ("tomorrow 7:00-10:00", "2026-10-19T07:00:00-04:00", "2026-10-19T10:00:00-04:00"),
+]
+TIME_CORPUS = [
+    ("9:00AM", "09:00:00"),
+    ("9 am", "09:00:00"),
+    ("9AM", "09:00:00"),
+    ("9:00 PM", "21:00:00"),
+    ("14:30", "14:30:00"),
+    ("17:00", "17:00:00"),
+    ("5pm", "17:00:00"),
+    ("12pm", "12:00:00"),
+    ("12am", "00:00:00"),
+    ("noon", "12:00:00"),
+    ("midnight", "00:00:00"),
+    ("12:15 a.m.", "00:15:00"),
+    ("7:45p.m.", "19:45:00"),
+    ("4:30", "04:30:00"),
+    ("7:00", "07:00:00"),
+    ("07:45", "07:45:00"),
+]
+
+class DateParsingCorpusTest(unittest.TestCase):
+    def test_datetime_expressions(self):
+        for text, expected in DATETIME_CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(parse_datetime_expression(text, TIMEZONE, reference=REFERENCE).isoformat(), expected)
+
+    def test_datetime_ranges(self):
+        for text, expected_start, expected_end in RANGE_CORPUS:
+            with self.subTest(text=text):
+                start, end = parse_datetime_range(text, TIMEZONE, reference=REFERENCE)
+                self.assertEqual((start.isoformat(), end.isoformat()), (expected_start, expected_end))
+
+    def test_times_of_day(self):
+        for text, expected in TIME_CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(parse_time_of_day(text).isoformat(), expected)
+
+class DateParsingCacheTest(unittest.TestCase):
+    def test_callers_on_different_days_share_the_cache(self):
+        # UTC+14 and UTC-11 are always on different calendar days.
+        timezones = ("Pacific/Kiritimati", "Pacific/Pago_Pago")
+        for timezone in timezones:
+            parse_natural_date("in three weeks", timezone)
+        hits = get_date_parser_stats()["cache_hits"]
+        for _ in range(3):
+            for timezone in timezones:
+                parse_natural_date("in three weeks", timezone)
+        self.assertEqual(get_date_parser_stats()["cache_hits"] - hits, 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from SchedulerAgent import embeddings, memory
+from SchedulerAgent.embeddings import CachedEmbeddings
+from SchedulerAgent.memory import UserMemoryShards
+
+def _vector(i: int):
+    return [float(i), 1.0, 2.0, 3.0]
+
+class UserMemoryShardsConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self._paths = (memory.FAISS_INDEX_PATH, memory.USER_SHARDS_PATH)
+        memory.FAISS_INDEX_PATH = self.folder
+        memory.USER_SHARDS_PATH = os.path.join(self.folder, "users")
+        fake_model = CachedEmbeddings(DeterministicFakeEmbedding(size=4), "fake:4", cache_path=os.path.join(self.folder, "embedding_cache.db"))
+        patch = mock.patch.object(embeddings, "_embedding_model_instance", fake_model)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        memory.FAISS_INDEX_PATH, memory.USER_SHARDS_PATH = self._paths
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_eviction_with_concurrent_writes_does_not_deadlock(self):
+        # With capacity 1 nearly every call evicts the shard another thread is writing to.
+        shards = UserMemoryShards(capacity=1)
+        writes_per_user = 100
+        errors = []
+
+        def write(user_id):
+            try:
+                for i in range(writes_per_user):
+                    shards.add_embeddings(user_id, [(f"{user_id} memory {i}", _vector(i))], [{"user_id": user_id, "session_id": "s"}], i + 1)
+            except Exception as e:
+                errors.append(e)
+
+        def read(user_id):
+            try:
+                for i in range(writes_per_user):
+                    shards.version(user_id)
+                    shards.search(user_id, _vector(i), k=2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(user_id,), daemon=True) for user_id in ("a", "b", "c")]
+        threads += [threading.Thread(target=read, args=(user_id,), daemon=True) for user_id in ("a", "b", "c", "d")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads), "memory shard threads deadlocked")
+        self.assertEqual(errors, [])
+        self.assertGreater(shards.get_stats()["evictions"], 0)
+
+        shards.checkpoint()
+        reloaded = UserMemoryShards(capacity=4)
+        for user_id in ("a", "b", "c"):
+            self.assertEqual(len(reloaded.search(user_id, _vector(0), k=writes_per_user * 2)), writes_per_user)
+            self.assertGreater(shards.version(user_id), 0)
+
+if __name__ == "__main__":
+    unittest.main()
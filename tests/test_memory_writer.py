@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from SchedulerAgent import embeddings, memory, memory_writer
+from SchedulerAgent.embeddings import CachedEmbeddings, get_embedding_model
+from SchedulerAgent.memory_writer import MemoryWriter
+
+class MemoryWriterFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        patches = [
+            mock.patch.object(memory, "FAISS_INDEX_PATH", self.folder),
+            mock.patch.object(memory, "USER_SHARDS_PATH", os.path.join(self.folder, "users")),
+            mock.patch.object(memory_writer, "MEMORY_WRITER_STATE_PATH", os.path.join(self.folder, "memory_writer.json")),
+            mock.patch.object(memory_writer, "MEMORY_WRITE_RETRY_SECONDS", 0.05),
+            # A deterministic local model keeps the test offline and independent of any cache on disk.
+            mock.patch.object(embeddings, "_embedding_model_instance", CachedEmbeddings(DeterministicFakeEmbedding(size=8), "fake:8", cache_path=os.path.join(self.folder, "embedding_cache.db"))),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(shutil.rmtree, self.folder, True)
+
+    def test_shard_and_checkpoint_failures_are_retried(self):
+        writer = MemoryWriter(wal_path=os.path.join(self.folder, "memory.wal"), checkpoint_every=1)
+        self.addCleanup(writer.close)
+        shards = writer._shards
+        add_embeddings, checkpoint = shards.add_embeddings, shards.checkpoint
+        failures = {"add": 2, "checkpoint": 1}
+
+        def failing_add(user_id, *args):
+            if user_id == "b" and failures["add"]:
+                failures["add"] -= 1
+                raise OSError("disk full")
+            return add_embeddings(user_id, *args)
+
+        def failing_checkpoint():
+            if failures["checkpoint"]:
+                failures["checkpoint"] -= 1
+                raise OSError("disk full")
+            return checkpoint()
+
+        with mock.patch.object(shards, "add_embeddings", failing_add), mock.patch.object(shards, "checkpoint", failing_checkpoint):
+            writer.submit([Document(page_content="memory of a", metadata={"user_id": "a"}), Document(page_content="memory of b", metadata={"user_id": "b"})])
+            self.assertTrue(writer.flush(timeout=10))
+
+        stats = writer.get_stats()
+        self.assertTrue(stats["alive"])
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["apply_failures"], 2)
+        self.assertGreaterEqual(stats["checkpoint_failures"], 1)
+        self.assertEqual(stats["checkpointed_seq"], 1)
+        # User "a" was applied before "b" failed; the retries must not add it again.
+        self.assertEqual(shards.applied_seq("a"), 1)
+        query = get_embedding_model().embed_query("memory of a")
+        self.assertEqual(len(shards.search("a", query, k=10)), 1)
+        self.assertEqual(len(shards.search("b", query, k=10)), 1)
+
+    def test_flush_reports_a_stopped_writer(self):
+        writer = MemoryWriter(wal_path=None)
+        with mock.patch.object(writer, "_apply", side_effect=SystemExit("killed")):
+            writer.submit([Document(page_content="lost", metadata={"user_id": "a"})])
+            self.assertFalse(writer.flush(timeout=10))
+        stats = writer.get_stats()
+        self.assertFalse(stats["alive"])
+        self.assertIn("killed", stats["last_error"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import threading
+import unittest
+from unittest import mock
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import AIMessage, HumanMessage
+from SchedulerAgent import recall
+from SchedulerAgent.recall import RecallPlanner
+
+class FakeShards:
+    def __init__(self):
+        self.versions = {}
+        self.searches = 0
+        self._lock = threading.Lock()
+
+    def version(self, user_id):
+        return self.versions.get(user_id, 0)
+
+    def search(self, user_id, query_vector, k, metadata_filter=None):
+        with self._lock:
+            self.searches += 1
+        return [Document(page_content=f"memory of {user_id}")]
+
+class RecallPlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.shards = FakeShards()
+        patches = [
+            mock.patch.object(recall, "get_user_memory_shards", lambda: self.shards),
+            mock.patch.object(recall, "get_embedding_model", lambda: DeterministicFakeEmbedding(size=4)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_second_turn_with_the_same_question_skips_the_recall(self):
+        planner = RecallPlanner()
+        first_turn = [HumanMessage(content="What's on my calendar?", id="turn-1")]
+        self.assertEqual(planner.recall("u", "s", first_turn), ["memory of u"])
+
+        # The next graph invocation carries a new message with its own id.
+        second_turn = first_turn + [AIMessage(content="You have lunch at noon."), HumanMessage(content="what's on my  calendar?", id="turn-2")]
+        self.assertEqual(planner.recall("u", "s", second_turn), ["memory of u"])
+        self.assertEqual(self.shards.searches, 1)
+        self.assertEqual(planner.get_stats()["skipped"], 1)
+
+        self.shards.versions["u"] = 1
+        planner.recall("u", "s", second_turn)
+        self.assertEqual(self.shards.searches, 2)
+        self.assertEqual(planner.get_stats()["recalls"], 2)
+
+    def test_concurrent_recalls_are_all_counted(self):
+        planner = RecallPlanner(max_sessions=8)
+        rounds, sessions = 50, 16
+
+        def turn(session_id):
+            for i in range(rounds):
+                planner.recall("u", session_id, [HumanMessage(content=f"question {i % 3}", id=f"{session_id}-{i}")])
+
+        threads = [threading.Thread(target=turn, args=(f"s{n}",)) for n in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = planner.get_stats()
+        self.assertEqual(stats["recalls"] + stats["skipped"], rounds * sessions)
+        self.assertEqual(stats["recalls"], self.shards.searches)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from tools.user_profiles import UserProfileStore
+
+class UserProfileStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.db_path = os.path.join(self.folder, "user_profiles.db")
+
+    def test_store_without_calendar_ids_is_upgraded(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE user_profiles (user_id TEXT PRIMARY KEY, timezone TEXT, work_start_hour INTEGER, "
+            "work_end_hour INTEGER, default_duration_minutes INTEGER, updated_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO user_profiles (user_id, timezone, updated_at) VALUES ('alice', 'Asia/Kolkata', 0)")
+        conn.commit()
+        conn.close()
+
+        profiles = UserProfileStore(db_path=self.db_path, legacy_pickle_path=None)
+        self.assertIsNone(profiles.get_timezone_for_calendar("alice@example.com"))
+        profiles.update("alice", calendar_id="alice@example.com")
+        self.assertEqual(profiles.get_timezone_for_calendar("alice@example.com"), "Asia/Kolkata")
+        self.assertEqual(profiles.get_timezone("alice"), "Asia/Kolkata")
+
+if __name__ == "__main__":
+    unittest.main()
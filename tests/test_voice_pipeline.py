@@ -0,0 +1,31 @@
+import threading
+import unittest
+
+from speech.voice_pipeline import VoicePipeline
+
+class VoicePipelineTest(unittest.TestCase):
+    def test_failing_transcript_callback_does_not_stop_recognition(self):
+        responded = []
+        done = threading.Event()
+
+        def respond(transcript):
+            responded.append(transcript)
+            if len(responded) == 2:
+                done.set()
+
+        def on_transcript(transcript):
+            if transcript == "first":
+                raise RuntimeError("socket closed")
+
+        pipeline = VoicePipeline(transcribe=lambda chunk: chunk.decode(), respond=respond, on_transcript=on_transcript)
+        pipeline.start()
+        self.addCleanup(pipeline.stop)
+        pipeline.submit_audio(b"first")
+        pipeline.submit_audio(b"second")
+
+        self.assertTrue(done.wait(5), "recognizer stopped after the callback failed")
+        self.assertEqual(responded, ["first", "second"])
+        self.assertTrue(all(thread.is_alive() for thread in pipeline._threads))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,14 +2,15 @@ from .calendar_tools import (
     get_todays_date,
     create_meeting,
     check_availability,
+    find_group_availability,
     reschedule_calendar_event,
     set_user_home_timezone,
     delete_calendar_event,
     retrieve_user_timezone
 )
 tools=[
-    get_todays_date, set_user_home_timezone, check_availability,
+    get_todays_date, set_user_home_timezone, check_availability, find_group_availability,
     delete_calendar_event, reschedule_calendar_event, create_meeting, retrieve_user_timezone
 ]
 tools_by_name = {tool.name: tool for tool in tools}
-__all__ = ["get_todays_date","create_meeting","check_availability","reschedule_calendar_event","set_user_home_timezone","delete_calendar_event","retrieve_user_timezone","tools","tools_by_name"]
\ No newline at end of file
+__all__ = ["get_todays_date","create_meeting","check_availability","find_group_availability","reschedule_calendar_event","set_user_home_timezone","delete_calendar_event","retrieve_user_timezone","tools","tools_by_name"]
\ No newline at end of file
@@ -1,85 +1,78 @@
 import os
-import re
-import calendar
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from typing import Optional,Dict,Optional
-import dateparser
+from typing import Optional,Dict,List
 from dotenv import load_dotenv
 from langchain_core.tools import tool
-import pickle
 import json
 from tools.google_auth import get_calendar_service
+from tools.date_parsing import parse_natural_date, parse_time_of_day, parse_datetime_expression
+from tools.event_cache import get_synced_event_cache, get_event_cache, event_bounds, is_busy_event
+from tools.freebusy import FreeBusyEngine
+from tools.group_slots import find_group_slots
+from tools.user_profiles import get_user_profile_store
 
 load_dotenv()
 
 GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
 
-WEEKDAYS = {
-    "monday": 0, "tuesday": 1, "wednesday": 2,
-    "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6
-}
-
-def retrieve_timezones() -> Dict[str, str]:
-    """Loads user timezones from the pickle file, handling errors gracefully."""
-    path = os.getenv("USERS_TIMEZONES_PATH")
+AVAILABILITY_SEARCH_DAYS = int(os.getenv("AVAILABILITY_SEARCH_DAYS", "7"))
+WORKDAY_START_HOUR = int(os.getenv("WORKDAY_START_HOUR", "8"))
+WORKDAY_END_HOUR = int(os.getenv("WORKDAY_END_HOUR", "20"))
+GROUP_SLOT_GRANULARITY_MINUTES = int(os.getenv("GROUP_SLOT_GRANULARITY_MINUTES", "5"))
+PREFERRED_WORK_START_HOUR = int(os.getenv("PREFERRED_WORK_START_HOUR", "9"))
+PREFERRED_WORK_END_HOUR = int(os.getenv("PREFERRED_WORK_END_HOUR", "17"))
+
+def _query_freebusy_intervals(service, calendar_ids: List[str], time_min: datetime, time_max: datetime) -> Dict[str, list]:
+    """Fetches busy (start, end) UTC intervals for several calendars with a single FreeBusy request."""
+    freebusy_result = service.freebusy().query(body={
+        "timeMin": time_min.astimezone(ZoneInfo("UTC")).isoformat(),
+        "timeMax": time_max.astimezone(ZoneInfo("UTC")).isoformat(),
+        "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+    }).execute()
+    busy_by_calendar = {}
+    for calendar_id in calendar_ids:
+        calendar_busy = freebusy_result.get("calendars", {}).get(calendar_id, {})
+        if calendar_busy.get("errors"):
+            raise RuntimeError(f"FreeBusy query failed for '{calendar_id}': {calendar_busy['errors']}")
+        busy_by_calendar[calendar_id] = [
+            (datetime.fromisoformat(period["start"].replace("Z", "+00:00")), datetime.fromisoformat(period["end"].replace("Z", "+00:00")))
+            for period in calendar_busy.get("busy", [])
+        ]
+    return busy_by_calendar
+
+def _query_busy_intervals(service, time_min: datetime, time_max: datetime):
+    """Busy intervals of GOOGLE_CALENDAR_ID, answered from the local event cache."""
+    cache = get_synced_event_cache(service)
+    return sorted(cache.busy_intervals(time_min.astimezone(ZoneInfo("UTC")), time_max.astimezone(ZoneInfo("UTC"))))
+
+def _build_freebusy_engine(service, calendar_ids: List[str], time_min: datetime, time_max: datetime) -> FreeBusyEngine:
+    """Loads the primary calendar from the event cache and every other calendar with one FreeBusy request."""
+    engine = FreeBusyEngine()
+    engine.load(GOOGLE_CALENDAR_ID, _query_busy_intervals(service, time_min, time_max))
+    other_calendar_ids = [calendar_id for calendar_id in calendar_ids if calendar_id != GOOGLE_CALENDAR_ID]
+    if other_calendar_ids:
+        for calendar_id, intervals in _query_freebusy_intervals(service, other_calendar_ids, time_min, time_max).items():
+            engine.load(calendar_id, intervals)
+    return engine
+
+def _update_event_cache(update):
+    """
+    Writes a completed calendar change through to the local cache. The API call has already
+    succeeded, so a cache or snapshot error must not turn it into a tool error (the agent would
+    retry and duplicate it); the cache resyncs on the next lookup instead.
+    """
     try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
-    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
-        return {}
-
-def parse_natural_date(natural_str: str, reference_timezone: str = "UTC") -> str:
-    natural_str_lower = natural_str.strip().lower()
-    today = datetime.now(ZoneInfo(reference_timezone))
-
-    if natural_str_lower == "today":
-        return today.date().isoformat()
-    if natural_str_lower == "tomorrow":
-        return (today + timedelta(days=1)).date().isoformat()
-
-    weekday_match = re.search(r"(this|next)?\s*(monday|tuesday|wednesday|thursday|friday|saturday|sunday)", natural_str_lower)
-    if weekday_match:
-        when, weekday_str = weekday_match.groups()
-        target_weekday = WEEKDAYS[weekday_str]
-        current_weekday = today.weekday()
-        days_ahead = (target_weekday - current_weekday + 7) % 7
-        if when == "next":
-            days_ahead += 7
-        elif when is None and days_ahead == 0:
-            days_ahead = 7
-        target_date = today + timedelta(days=days_ahead)
-        return target_date.date().isoformat()
-
-    if "last day of this month" in natural_str_lower or "end of this month" in natural_str_lower:
-        _, num_days = calendar.monthrange(today.year, today.month)
-        target_date = today.replace(day=num_days)
-        return target_date.date().isoformat()
-
-    if "last weekday of this month" in natural_str_lower:
-        _, num_days = calendar.monthrange(today.year, today.month)
-        last_day = today.replace(day=num_days)
-        if last_day.weekday() == 5:
-            target_date = last_day - timedelta(days=1)
-        elif last_day.weekday() == 6:
-            target_date = last_day - timedelta(days=2)
-        else:
-            target_date = last_day
-        return target_date.date().isoformat()
-
-    if "first day of next month" in natural_str_lower or "next month start" in natural_str_lower:
-        first_of_this_month = today.replace(day=1)
-        first_of_next_month = (first_of_this_month + timedelta(days=32)).replace(day=1)
-        return first_of_next_month.date().isoformat()
-
-    parsed_dt = dateparser.parse(
-        natural_str,
-        languages=['en'],
-        settings={'TIMEZONE': reference_timezone, 'RETURN_AS_TIMEZONE_AWARE': True, 'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': today}
-    )
-    if not parsed_dt:
-        raise ValueError(f"Unable to parse a valid date from the input: '{natural_str}'.")
-    return parsed_dt.date().isoformat()
+        update(get_event_cache())
+    except Exception as e:
+        print(f"⚠️ Could not update the local event cache, resyncing on next lookup: {e}")
+        get_event_cache().mark_stale()
+
+def _past_start_error(start: datetime) -> Optional[str]:
+    """The parser resolves explicit dates as written, so a past start has to be refused before it is booked."""
+    if start < datetime.now(start.tzinfo):
+        return f"Error: {start.strftime('%A, %B %d at %I:%M %p %Z')} is in the past. Ask the user for a future date and time."
+    return None
 
 def _find_unique_event(service, event_name: str, event_date: Optional[str] = None):
     try:
@@ -92,14 +85,7 @@ def _find_unique_event(service, event_name: str, event_date: Optional[str] = Non
             time_min = now_utc
             time_max = now_utc + timedelta(days=365)
 
-        events_result = service.events().list(
-            calendarId=GOOGLE_CALENDAR_ID,
-            timeMin=time_min.isoformat(),
-            timeMax=time_max.isoformat(),
-            q=event_name,
-            singleEvents=True
-        ).execute()
-        events = events_result.get('items', [])
+        events = get_synced_event_cache(service).search(event_name, time_min, time_max)
 
         if not events:
             date_info = f"on {event_date}" if event_date else "in the future"
@@ -108,7 +94,7 @@ def _find_unique_event(service, event_name: str, event_date: Optional[str] = Non
         if len(events) > 1:
             event_options = []
             for event in events:
-                start_dt = datetime.fromisoformat(event['start'].get('dateTime')).astimezone(now_utc.tzinfo)
+                start_dt = event_bounds(event, get_event_cache().time_zone)[0]
                 event_options.append(f"'{event['summary']}' on {start_dt.strftime('%A, %B %d at %I:%M %p %Z')}")
             return None, f"Ambiguity Error: Found multiple events named '{event_name}'. Please be more specific by providing the date. Options found: {'; '.join(event_options)}."
 
@@ -124,18 +110,16 @@ def get_todays_date() -> str:
     return datetime.now().strftime('%Y-%m-%d')
 
 @tool
-def set_user_home_timezone(user_id: str, timezone: str) -> str:
+def set_user_home_timezone(user_id: str, timezone: str, calendar_id: Optional[str] = None) -> str:
     """
     Sets the user's home timezone. 
-    Arguments: user_id (unique user identifier), timezone (IANA timezone string, e.g., 'Asia/Kolkata').
+    Arguments: user_id (unique user identifier), timezone (IANA timezone string, e.g., 'Asia/Kolkata'), calendar_id (Optional. The user's calendar ID/email, so group scheduling can find their timezone).
     """
 
-    user_timezones = retrieve_timezones()
     try:
         ZoneInfo(timezone)
-        user_timezones[user_id] = timezone
-        with open(os.getenv("USERS_TIMEZONES_PATH"),"wb") as f: 
-            pickle.dump(user_timezones,f)
+        fields = {"timezone": timezone, "calendar_id": calendar_id} if calendar_id else {"timezone": timezone}
+        get_user_profile_store().update(user_id, **fields)
         return f"Success. User's home timezone has been set to {timezone}."
     except Exception as e:
         return f"An error occurred: {str(e)}"
@@ -146,20 +130,18 @@ def retrieve_user_timezone(user_id:str):
     Return the user's home timezone. 
     Arguments: user_id (unique user identifier).
     """
-    user_timezones = retrieve_timezones()
-    if user_id in user_timezones.keys():
-        return f"Timezone of user's ID {user_id} is {user_timezones[user_id]}"
+    user_timezone = get_user_profile_store().get_timezone(user_id)
+    if user_timezone:
+        return f"Timezone of user's ID {user_id} is {user_timezone}"
     else: 
         return f"Timezone of user's ID {user_id} not found."
 
 @tool
-def check_availability(search_date: str, start_time: str, end_time: str, duration_minutes: int, timezone: str) -> str:
+def check_availability(search_date: str, start_time: str, end_time: str, duration_minutes: int, timezone: str, attendee_calendar_ids: Optional[List[str]] = None) -> str:
     """
-    Checks for available time slots. If the requested window is busy, it AUTOMATICALLY searches for the next available slot within the next 7 days and suggests it.
-    Arguments: search_date (e.g., 'next Monday', 'tomorrow'), start_time (e.g., '9:00AM' not like '9AM' or '9 AM' or '9 am' same for PM), end_time (e.g., '5:00PM' not like 5PM or 5 PM or 5pm same for AM), duration_minutes, timezone.
+    Checks for available time slots. If the requested window is busy, it AUTOMATICALLY searches for the next available slot within the next few days (7 by default) and suggests it.
+    Arguments: search_date (e.g., 'next Monday', 'tomorrow'), start_time (e.g., '9:00AM', '9 am' or '14:00'), end_time (e.g., '5:00PM', '5pm' or '17:00'), duration_minutes, timezone, attendee_calendar_ids (Optional. Calendar IDs/emails of other attendees who must also be free).
     """
-    start_time=start_time.replace(" ","")
-    end_time=end_time.replace(" ","")
     try:
         search_date_iso = parse_natural_date(search_date, timezone)
         search_start_date = datetime.fromisoformat(search_date_iso)
@@ -170,30 +152,29 @@ def check_availability(search_date: str, start_time: str, end_time: str, duratio
     try:
         search_tz = ZoneInfo(timezone)
         home_tz = ZoneInfo(user_home_zone_str)
-        start_dt_naive = datetime.fromisoformat(f"{search_date_iso}T{datetime.strptime(start_time, '%I:%M%p').strftime('%H:%M:%S')}")
-        end_dt_naive = datetime.fromisoformat(f"{search_date_iso}T{datetime.strptime(end_time, '%I:%M%p').strftime('%H:%M:%S')}")
-        start_dt_aware = start_dt_naive.replace(tzinfo=search_tz)
-        end_dt_aware = end_dt_naive.replace(tzinfo=search_tz)
+        search_day = datetime.fromisoformat(search_date_iso).date()
+        start_dt_aware = datetime.combine(search_day, parse_time_of_day(start_time), tzinfo=search_tz)
+        end_dt_aware = datetime.combine(search_day, parse_time_of_day(end_time), tzinfo=search_tz)
     except Exception as e:
         return f"Error parsing date/time. Details: {e}"
+    if end_dt_aware <= start_dt_aware:
+        return f"Error: the end time {end_dt_aware.strftime('%I:%M %p')} is not after the start time {start_dt_aware.strftime('%I:%M %p')}. Ask the user for a valid time window."
 
     start_utc = start_dt_aware.astimezone(ZoneInfo("UTC"))
     end_utc = end_dt_aware.astimezone(ZoneInfo("UTC"))
-    service = get_calendar_service()
-    events_result = service.events().list(calendarId=GOOGLE_CALENDAR_ID, timeMin=start_utc.isoformat(), timeMax=end_utc.isoformat(), singleEvents=True, orderBy='startTime').execute()
-    busy_slots = events_result.get('items', [])
-    available_slots = []
-    current_time_utc = start_utc
     meeting_duration = timedelta(minutes=duration_minutes)
+    calendar_ids = [GOOGLE_CALENDAR_ID] + [calendar_id for calendar_id in (attendee_calendar_ids or []) if calendar_id != GOOGLE_CALENDAR_ID]
 
-    for event in busy_slots:
-        event_start_utc = datetime.fromisoformat(event['start'].get('dateTime'))
-        if current_time_utc + meeting_duration <= event_start_utc:
-            available_slots.append(current_time_utc)
-        current_time_utc = max(current_time_utc, datetime.fromisoformat(event['end'].get('dateTime')))
-    if current_time_utc + meeting_duration <= end_utc:
-        available_slots.append(current_time_utc)
+    first_day = search_start_date + timedelta(days=1)
+    horizon_end = (first_day + timedelta(days=AVAILABILITY_SEARCH_DAYS - 1)).replace(hour=WORKDAY_END_HOUR, minute=0, second=0, microsecond=0, tzinfo=search_tz)
+    service = get_calendar_service()
+    try:
+        busy_slots = [event for event in get_synced_event_cache(service).events_between(start_utc, end_utc) if is_busy_event(event)]
+        engine = _build_freebusy_engine(service, calendar_ids, start_utc, max(end_utc, horizon_end.astimezone(ZoneInfo("UTC"))))
+    except Exception as e:
+        return f"An error occurred while reading the calendar: {e}"
 
+    available_slots = [slot_start for slot_start, _ in engine.find_free_slots(calendar_ids, start_utc, end_utc, meeting_duration)]
     if available_slots:
         formatted_results = []
         for slot_utc in available_slots:
@@ -210,37 +191,69 @@ def check_availability(search_date: str, start_time: str, end_time: str, duratio
     if busy_slots:
         conflicting_names = [event.get('summary', 'Untitled') for event in busy_slots]
         conflict_reason += f" by: {', '.join(conflicting_names)}."
+    elif len(calendar_ids) > 1:
+        conflict_reason += " for at least one of the attendees."
     else:
         conflict_reason += "."
-        
-    for i in range(1, 8):
-        next_day_to_check = search_start_date + timedelta(days=i)
-        window_start = next_day_to_check.replace(hour=8, minute=0, second=0, microsecond=0, tzinfo=search_tz)
-        window_end = next_day_to_check.replace(hour=20, minute=0, second=0, microsecond=0, tzinfo=search_tz)
-        
-        start_utc_fb = window_start.astimezone(ZoneInfo("UTC"))
-        end_utc_fb = window_end.astimezone(ZoneInfo("UTC"))
-
-        fb_events_result = service.events().list(calendarId=GOOGLE_CALENDAR_ID, timeMin=start_utc_fb.isoformat(), timeMax=end_utc_fb.isoformat(), singleEvents=True, orderBy='startTime').execute()
-        fb_busy_slots = fb_events_result.get('items', [])
-        fb_current_time = start_utc_fb
-        
-        for event in fb_busy_slots:
-            event_start_utc = datetime.fromisoformat(event['start'].get('dateTime'))
-            if fb_current_time + meeting_duration <= event_start_utc:
-                slot_utc = fb_current_time
-                slot_in_home_tz = slot_utc.astimezone(home_tz)
-                suggestion = f"The next available slot is on {slot_in_home_tz.strftime('%A, %B %d at %I:%M %p %Z')}."
-                return f"{conflict_reason} {suggestion}"
-            fb_current_time = max(fb_current_time, datetime.fromisoformat(event['end'].get('dateTime')))
-
-        if fb_current_time + meeting_duration <= end_utc_fb:
-            slot_utc = fb_current_time
-            slot_in_home_tz = slot_utc.astimezone(home_tz)
+
+    for day_offset in range(AVAILABILITY_SEARCH_DAYS):
+        next_day_to_check = first_day + timedelta(days=day_offset)
+        window_start = next_day_to_check.replace(hour=WORKDAY_START_HOUR, minute=0, second=0, microsecond=0, tzinfo=search_tz)
+        window_end = next_day_to_check.replace(hour=WORKDAY_END_HOUR, minute=0, second=0, microsecond=0, tzinfo=search_tz)
+        next_slots = engine.find_free_slots(calendar_ids, window_start.astimezone(ZoneInfo("UTC")), window_end.astimezone(ZoneInfo("UTC")), meeting_duration, limit=1)
+        if next_slots:
+            slot_in_home_tz = next_slots[0][0].astimezone(home_tz)
             suggestion = f"The next available slot is on {slot_in_home_tz.strftime('%A, %B %d at %I:%M %p %Z')}."
             return f"{conflict_reason} {suggestion}"
 
-    return f"{conflict_reason} No other availability was found in the next 7 days."
+    return f"{conflict_reason} No other availability was found in the next {AVAILABILITY_SEARCH_DAYS} days."
+
+@tool
+def find_group_availability(participant_ids: List[str], search_date: str, duration_minutes: int, timezone: str, horizon_days: int = 14, max_results: int = 5) -> str:
+    """
+    Finds meeting slots where ALL participants are free, starting from search_date and looking ahead horizon_days. Slots inside more participants' working hours are ranked first.
+    Arguments: participant_ids (calendar IDs/emails of the attendees; your own calendar is always included), search_date (e.g., 'next Monday', 'tomorrow'), duration_minutes, timezone (IANA string used to display results), horizon_days (Optional, default 14), max_results (Optional, default 5).
+    """
+    try:
+        search_date_iso = parse_natural_date(search_date, timezone)
+        display_tz = ZoneInfo(timezone)
+    except Exception as e:
+        return f"Date parsing error: {e}"
+
+    granularity = timedelta(minutes=GROUP_SLOT_GRANULARITY_MINUTES)
+    horizon_start = datetime.fromisoformat(search_date_iso).replace(tzinfo=display_tz).astimezone(ZoneInfo("UTC"))
+    now_utc = datetime.now(ZoneInfo("UTC"))
+    if horizon_start < now_utc:
+        horizon_start = now_utc.replace(second=0, microsecond=0)
+        horizon_start += timedelta(minutes=-horizon_start.minute % GROUP_SLOT_GRANULARITY_MINUTES)
+    horizon_end = horizon_start + timedelta(days=horizon_days)
+    calendar_ids = [GOOGLE_CALENDAR_ID] + [participant_id for participant_id in participant_ids if participant_id != GOOGLE_CALENDAR_ID]
+
+    service = get_calendar_service()
+    try:
+        busy_by_participant = {GOOGLE_CALENDAR_ID: _query_busy_intervals(service, horizon_start, horizon_end)}
+        if len(calendar_ids) > 1:
+            busy_by_participant.update(_query_freebusy_intervals(service, calendar_ids[1:], horizon_start, horizon_end))
+    except Exception as e:
+        return f"An error occurred while reading the calendars: {e}"
+
+    profiles = get_user_profile_store()
+    # Participants are calendar ids, while profiles are keyed by user_id.
+    participant_timezones = {calendar_id: profiles.get_timezone_for_calendar(calendar_id) or timezone for calendar_id in calendar_ids}
+    slots = find_group_slots(
+        busy_by_participant, horizon_start, horizon_end, timedelta(minutes=duration_minutes),
+        granularity=granularity, participant_timezones=participant_timezones,
+        work_start_hour=PREFERRED_WORK_START_HOUR, work_end_hour=PREFERRED_WORK_END_HOUR, limit=max_results
+    )
+    if not slots:
+        return f"No common availability of {duration_minutes} minutes was found for all {len(calendar_ids)} participants in the next {horizon_days} days."
+
+    formatted_results = [{
+        "utc_iso_format": slot["start"].isoformat(),
+        "target_timezone_format": slot["start"].astimezone(display_tz).strftime('%A, %B %d at %I:%M %p (%Z)'),
+        "participants_in_working_hours": f"{slot['participants_in_working_hours']}/{len(calendar_ids)}"
+    } for slot in slots]
+    return f"Common slots found: {formatted_results}"
 
 @tool
 def delete_calendar_event(event_name: str, event_date: Optional[str] = None) -> str:
@@ -254,6 +267,7 @@ def delete_calendar_event(event_name: str, event_date: Optional[str] = None) ->
         return error
     try:
         service.events().delete(calendarId=GOOGLE_CALENDAR_ID, eventId=event_to_delete['id']).execute()
+        _update_event_cache(lambda cache: cache.remove(event_to_delete['id']))
         return f"Success. The event '{event_name}' has been deleted."
     except Exception as e:
         return f"An error occurred while deleting the event: {e}"
@@ -272,34 +286,12 @@ def reschedule_calendar_event(old_event_name: str, new_start_iso: str, new_timez
 
     try:
         try:
-            new_start_dt = datetime.fromisoformat(new_start_iso)
-            if new_start_dt.tzinfo is None:
-                new_start_aware = new_start_dt.replace(tzinfo=ZoneInfo(new_timezone))
-            else:
-                new_start_aware = new_start_dt.astimezone(ZoneInfo(new_timezone))
-        except ValueError:
-            date_part_iso = parse_natural_date(new_start_iso, new_timezone)
-            date_obj = datetime.fromisoformat(date_part_iso).date()
-
-            time_match = re.search(r'\b(\d{1,2}(?::\d{2})?\s*(?:am|pm))\b', new_start_iso, re.IGNORECASE)
-            if not time_match:
-                time_match = re.search(r'\b(\d{1,2}:\d{2})\b', new_start_iso)
-                if not time_match:
-                    return f"Error: Could not find a specific time in new_start_iso: '{new_start_iso}'."
-
-            time_str = time_match.group(1)
-            time_obj = None
-            for fmt in ('%I:%M%p', '%I%p', '%H:%M'):
-                try:
-                    time_obj = datetime.strptime(time_str.replace(" ", "").upper(), fmt).time()
-                    break
-                except ValueError:
-                    continue
-            if time_obj is None:
-                return f"Error: Unrecognized time format in '{time_str}'."
-
-            naive_dt = datetime.combine(date_obj, time_obj)
-            new_start_aware = naive_dt.replace(tzinfo=ZoneInfo(new_timezone))
+            new_start_aware = parse_datetime_expression(new_start_iso, new_timezone)
+        except ValueError as e:
+            return f"Error: {e}"
+        past_error = _past_start_error(new_start_aware)
+        if past_error:
+            return past_error
 
         original_start = datetime.fromisoformat(original_event['start']['dateTime'])
         original_end = datetime.fromisoformat(original_event['end']['dateTime'])
@@ -311,7 +303,8 @@ def reschedule_calendar_event(old_event_name: str, new_start_iso: str, new_timez
         original_event['end']['dateTime'] = new_end_aware.isoformat()
         original_event['end']['timeZone'] = new_timezone
 
-        service.events().update(calendarId=GOOGLE_CALENDAR_ID, eventId=original_event['id'], body=original_event).execute()
+        updated_event = service.events().update(calendarId=GOOGLE_CALENDAR_ID, eventId=original_event['id'], body=original_event).execute()
+        _update_event_cache(lambda cache: cache.upsert(updated_event))
         return f"Success. The event '{old_event_name}' has been rescheduled to {new_start_aware.strftime('%A, %B %d at %I:%M %p %Z')}."
     except Exception as e:
         return f"An error occurred while rescheduling: {e}"
@@ -326,37 +319,12 @@ def create_meeting(title: str, start_time_str: str, duration_minutes: int, event
     try:
         service = get_calendar_service()
         try:
-            if "T" in start_time_str:
-                dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=ZoneInfo(event_timezone))
-                else:
-                    dt = dt.astimezone(ZoneInfo(event_timezone))
-            else:
-                raise ValueError
-        except Exception:
-            date_part_iso = parse_natural_date(start_time_str, event_timezone)
-            date_obj = datetime.fromisoformat(date_part_iso).date()
-            time_str_match = re.search(r'\b(\d{1,2}(?::\d{2})?\s*(?:am|pm))\b', start_time_str, re.IGNORECASE)
-            if not time_str_match:
-                time_str_match = re.search(r'\b(\d{1,2}:\d{2})\b', start_time_str)
-                if not time_str_match:
-                    return f"Error: Could not find a specific time in your request: '{start_time_str}'."
-            time_str = time_str_match.group(1)
-            time_obj = None
-            for fmt in ('%I:%M%p', '%I%p', '%H:%M'):
-                try:
-                    time_obj = datetime.strptime(time_str.replace(" ", "").upper(), fmt).time()
-                    break
-                except ValueError:
-                    continue
-            if time_obj is None:
-                return f"Error: Could not understand the time format of '{time_str}'."
-            naive_datetime = datetime.combine(date_obj, time_obj)
-            dt = naive_datetime.replace(tzinfo=ZoneInfo(event_timezone))
-            if dt < datetime.now(ZoneInfo(event_timezone)):
-                if not any(day in start_time_str.lower() for day in ['today', 'tomorrow'] + list(WEEKDAYS.keys())):
-                    dt += timedelta(days=1)
+            dt = parse_datetime_expression(start_time_str, event_timezone)
+        except ValueError as e:
+            return f"Error: {e}"
+        past_error = _past_start_error(dt)
+        if past_error:
+            return past_error
         end_dt = dt + timedelta(minutes=duration_minutes)
         event = {
             'summary': title,
@@ -364,6 +332,7 @@ def create_meeting(title: str, start_time_str: str, duration_minutes: int, event
             'end': {'dateTime': end_dt.isoformat(), 'timeZone': event_timezone},
         }
         created_event = service.events().insert(calendarId=GOOGLE_CALENDAR_ID, body=event).execute()
+        _update_event_cache(lambda cache: cache.upsert(created_event))
         return f"Success. The meeting '{title}' has been scheduled. View it here: {created_event.get('htmlLink')}"
     except Exception as e:
         return f"An error occurred: {e}"
\ No newline at end of file
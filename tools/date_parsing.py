@@ -0,0 +1,312 @@
+import re
+import calendar
+import threading
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from typing import Callable, List, Optional, Tuple
+
+WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2,
+    "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6
+}
+WEEKDAY_ALIASES = {
+    "mon": "monday", "tue": "tuesday", "tues": "tuesday", "wed": "wednesday", "thu": "thursday",
+    "thur": "thursday", "thurs": "thursday", "fri": "friday", "sat": "saturday", "sun": "sunday"
+}
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12
+}
+
+_WEEKDAY_PATTERN = "|".join(sorted(list(WEEKDAYS) + list(WEEKDAY_ALIASES), key=len, reverse=True))
+_MONTH_PATTERN = "|".join(sorted(MONTHS, key=len, reverse=True))
+_COUNT_PATTERN = r"\d+|" + "|".join(NUMBER_WORDS)
+
+_TIME_OF_DAY = re.compile(
+    r"\b(?:at\s+)?(?:\d{1,2}(?::\d{2})?\s*(?:a\.?m\.?|p\.?m\.?)(?![a-z])|\d{1,2}:\d{2}(?::\d{2})?|noon|midnight)"
+    r"|\b(?:in the\s+|this\s+)?(?:morning|afternoon|evening|night)\b"
+)
+_FILLER = re.compile(r"\b(?:on|at|by|for)\b")
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def _count(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+def _upcoming(candidate: date, today: date, years_ahead: bool) -> date:
+    """Prefers dates from the future, like dateparser's PREFER_DATES_FROM='future'."""
+    if candidate >= today:
+        return candidate
+    if years_ahead:
+        return candidate.replace(year=candidate.year + 1)
+    return _add_months(candidate, 1)
+
+def _iso_date(match, today):
+    return date(int(match[1]), int(match[2]), int(match[3]))
+
+def _relative_offset(match, today):
+    amount, unit = _count(match["count"]), match["unit"]
+    if unit == "day":
+        return today + timedelta(days=amount)
+    if unit == "week":
+        return today + timedelta(weeks=amount)
+    return _add_months(today, amount)
+
+def _weekday(match, today):
+    when = match["when"]
+    target_weekday = WEEKDAYS[WEEKDAY_ALIASES.get(match["weekday"], match["weekday"])]
+    if match["week_before"] or match["week_after"]:
+        next_week_monday = today + timedelta(days=7 - today.weekday())
+        return next_week_monday + timedelta(days=target_weekday)
+    days_ahead = (target_weekday - today.weekday() + 7) % 7
+    if when == "last":
+        return today - timedelta(days=(today.weekday() - target_weekday + 7) % 7 or 7)
+    if when == "next":
+        days_ahead += 7
+    elif when is None and days_ahead == 0:
+        days_ahead = 7
+    return today + timedelta(days=days_ahead)
+
+def _end_of_month(match, today):
+    month_start = _add_months(today.replace(day=1), 1 if match[1] == "next" else 0)
+    return month_start.replace(day=calendar.monthrange(month_start.year, month_start.month)[1])
+
+def _last_weekday_of_month(match, today):
+    last_day = _end_of_month(match, today)
+    return last_day - timedelta(days=max(last_day.weekday() - 4, 0))
+
+def _first_of_next_month(match, today):
+    return _add_months(today.replace(day=1), 1)
+
+def _month_day(match, today):
+    month, day_of_month, year = MONTHS[match["month"]], int(match["day"]), match["year"]
+    if year:
+        return date(int(year), month, day_of_month)
+    return _upcoming(date(today.year, month, day_of_month), today, years_ahead=True)
+
+def _numeric_month_day(match, today):
+    month, day_of_month, year = int(match[1]), int(match[2]), match[3]
+    if year:
+        return date(int(year) + (2000 if len(year) == 2 else 0), month, day_of_month)
+    return _upcoming(date(today.year, month, day_of_month), today, years_ahead=True)
+
+def _ordinal_day(match, today):
+    return _upcoming(today.replace(day=int(match[1])), today, years_ahead=False)
+
+# Ordered from most to least specific; the first rule whose pattern is found wins.
+FAST_RULES: List[Tuple[re.Pattern, Callable[[re.Match, date], date]]] = [
+    (re.compile(r"\b(\d{4})[-/](\d{1,2})[-/](\d{1,2})"), _iso_date),
+    (re.compile(r"\b(?:the\s+)?day after tomorrow\b"), lambda m, today: today + timedelta(days=2)),
+    (re.compile(r"\b(?:tomorrow|tmrw|tmr)\b"), lambda m, today: today + timedelta(days=1)),
+    (re.compile(r"\byesterday\b"), lambda m, today: today - timedelta(days=1)),
+    (re.compile(rf"\bin\s+(?P<count>{_COUNT_PATTERN})\s+(?P<unit>day|week|month)s?\b"), _relative_offset),
+    (re.compile(rf"\b(?P<count>{_COUNT_PATTERN})\s+(?P<unit>day|week|month)s?\s+(?:from\s+(?:now|today)|later)\b"), _relative_offset),
+    (re.compile(r"\blast weekday of (this|next) month\b"), _last_weekday_of_month),
+    (re.compile(r"\b(?:last day|end) of (this|next) month\b"), _end_of_month),
+    (re.compile(r"\b(?:first day of next month|next month start|start of next month|beginning of next month)\b"), _first_of_next_month),
+    (re.compile(rf"\b(?P<week_before>next\s+week\s+)?(?:(?P<when>this|next|coming|last)\s+)?(?P<weekday>{_WEEKDAY_PATTERN})\b\.?(?P<week_after>\s+next\s+week)?"), _weekday),
+    (re.compile(r"\bnext week\b"), lambda m, today: today + timedelta(weeks=1)),
+    (re.compile(r"\bnext month\b"), lambda m, today: _add_months(today, 1)),
+    (re.compile(rf"\b(?P<month>{_MONTH_PATTERN})\.?\s+(?P<day>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{{4}}))?\b"), _month_day),
+    (re.compile(rf"\b(?P<day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month>{_MONTH_PATTERN})\.?(?:,?\s+(?P<year>\d{{4}}))?\b"), _month_day),
+    (re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?\b"), _numeric_month_day),
+    (re.compile(r"^(?:the\s+)?(\d{1,2})(?:st|nd|rd|th)$"), _ordinal_day),
+    (re.compile(r"\b(?:today|tonight|now)\b|^$"), lambda m, today: today),
+]
+
+_dateparser = None
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "fast_path": 0, "dateparser_fallbacks": 0}
+
+def _normalize(natural_str: str) -> str:
+    phrase = _TIME_OF_DAY.sub(" ", natural_str.strip().lower())
+    phrase = _FILLER.sub(" ", phrase)
+    return " ".join(phrase.replace(",", ", ").split()).strip(" ,")
+
+def _parse_with_dateparser(natural_str: str, reference_timezone: str, today: datetime) -> Optional[date]:
+    global _dateparser
+    if _dateparser is None:
+        import dateparser
+        _dateparser = dateparser
+    parsed_dt = _dateparser.parse(
+        natural_str,
+        languages=['en'],
+        settings={'TIMEZONE': reference_timezone, 'RETURN_AS_TIMEZONE_AWARE': True, 'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': today}
+    )
+    return parsed_dt.date() if parsed_dt else None
+
+def _match_fast_rules(phrase: str, today: date) -> Optional[date]:
+    for pattern, handler in FAST_RULES:
+        match = pattern.search(phrase)
+        if match:
+            try:
+                return handler(match, today)
+            except (ValueError, KeyError):
+                return None
+    return None
+
+@lru_cache(maxsize=2048)
+def _parse_cached(phrase: str, reference_timezone: str, reference_day: date) -> Optional[str]:
+    parsed = _match_fast_rules(phrase, reference_day)
+    if parsed is not None:
+        with _stats_lock:
+            _stats["fast_path"] += 1
+        return parsed.isoformat()
+
+    with _stats_lock:
+        _stats["dateparser_fallbacks"] += 1
+    relative_base = datetime.combine(reference_day, datetime.now(ZoneInfo(reference_timezone)).timetz())
+    parsed = _parse_with_dateparser(phrase, reference_timezone, relative_base)
+    return parsed.isoformat() if parsed else None
+
+def _reference_day(reference_timezone: str, reference: Optional[datetime]) -> date:
+    with _stats_lock:
+        _stats["calls"] += 1
+    if reference:
+        return reference.astimezone(ZoneInfo(reference_timezone)).date()
+    return datetime.now(ZoneInfo(reference_timezone)).date()
+
+def parse_natural_date(natural_str: str, reference_timezone: str = "UTC", reference: Optional[datetime] = None) -> str:
+    """
+    Resolves a natural-language date ('next Friday at 4pm', 'in two weeks', 'Aug 10') to 'YYYY-MM-DD'.
+    Common phrasings are answered by FAST_RULES; dateparser is imported and used only when none match.
+    Results are cached per (normalized phrase, timezone, reference date); entries for past days simply age out of the LRU,
+    so callers on either side of midnight in different timezones share the cache instead of wiping it.
+    `reference` overrides "now" and is mainly useful for reproducible tests.
+    """
+    reference_day = _reference_day(reference_timezone, reference)
+    result = _parse_cached(_normalize(natural_str), reference_timezone, reference_day)
+    if result is None:
+        raise ValueError(f"Unable to parse a valid date from the input: '{natural_str}'.")
+    return result
+
+_MERIDIEM = r"(?:a\.?m\.?|p\.?m\.?)(?![a-z])"
+_CLOCK = r"(?P<{0}hour>\d{{1,2}})(?::(?P<{0}minute>\d{{2}}))?(?::\d{{2}})?\s*(?P<{0}meridiem>" + _MERIDIEM + ")?"
+_TIME_RANGE = re.compile(
+    r"(?<![\w:/-])(?:from\s+|between\s+)?" + _CLOCK.format("start_") +
+    r"\s*(?:-|–|to|until|till|and)\s*" + _CLOCK.format("end_") + r"(?![\w:/])"
+)
+_TIME_POINT = re.compile(
+    r"(?<![\w:/-])(?:at\s+)?(?:"
+    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?(?::\d{2})?\s*(?P<meridiem>" + _MERIDIEM + r")"
+    r"|(?P<clock_hour>\d{1,2}):(?P<clock_minute>\d{2})(?::\d{2})?"
+    r"|(?P<named>noon|midday|midnight))"
+    r"|(?<![\w:/-])at\s+(?P<bare_hour>\d{1,2})(?![\w:/])"
+)
+_DAY_PERIOD = re.compile(r"\b(?:in the\s+|this\s+)?(?P<period>morning|afternoon|evening|tonight|night)\b")
+_ISO_DATETIME = re.compile(r"^\s*\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}", re.IGNORECASE)
+
+def _to_24_hour(hour: int, minute: int, meridiem: Optional[str], period: Optional[str], assume_pm_for_small_hours: bool = False) -> time:
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"'{hour}{meridiem}' is not a valid 12-hour time")
+        hour = hour % 12 + (12 if meridiem.startswith("p") else 0)
+    elif period in ("afternoon", "evening", "tonight", "night") and hour < 12:
+        hour += 12
+    elif assume_pm_for_small_hours and period is None and 1 <= hour <= 7:
+        # "at 4" or "4:30" in a scheduling request almost always means the afternoon.
+        hour += 12
+    return time(hour, minute)
+
+def _twelve_hour_style(hour_text: str) -> bool:
+    """'4' and '4:30' read like a 12-hour clock; '04:30' is written 24-hour style and kept as is."""
+    return not hour_text.startswith("0")
+
+@lru_cache(maxsize=2048)
+def _split_expression(text: str, infer_pm: bool = True) -> Tuple[Optional[time], Optional[time], str]:
+    """
+    Single pass over the text: pulls out the time (or time range) and returns what is left as the date phrase.
+    With `infer_pm`, a small hour without am/pm in free text ('at 4', 'tomorrow 2:30') is read as the
+    afternoon; a range only takes that reading if it keeps the start before the end.
+    """
+    period_match = _DAY_PERIOD.search(text)
+    period = period_match["period"] if period_match else None
+
+    range_match = _TIME_RANGE.search(text)
+    if range_match and (range_match["start_minute"] or range_match["start_meridiem"] or range_match["end_minute"] or range_match["end_meridiem"]):
+        start_hour, end_hour = int(range_match["start_hour"]), int(range_match["end_hour"])
+        end_meridiem = range_match["end_meridiem"]
+        start_meridiem = range_match["start_meridiem"]
+        if not start_meridiem and end_meridiem:
+            # "9-11am" shares the meridiem, "11-1pm" crosses noon.
+            start_meridiem = end_meridiem if start_hour % 12 <= end_hour % 12 else ("am" if end_meridiem.startswith("p") else "pm")
+        start_minute, end_minute = int(range_match["start_minute"] or 0), int(range_match["end_minute"] or 0)
+        start = _to_24_hour(start_hour, start_minute, start_meridiem, period)
+        end = _to_24_hour(end_hour, end_minute, end_meridiem, period)
+        if infer_pm:
+            # "2:00-3:30" and "11:00-1:00" are afternoon ranges, but "7:00-10:00" is a morning one.
+            start_pm = _to_24_hour(start_hour, start_minute, start_meridiem, period, _twelve_hour_style(range_match["start_hour"]))
+            end_pm = _to_24_hour(end_hour, end_minute, end_meridiem, period, _twelve_hour_style(range_match["end_hour"]))
+            if start_pm < end_pm:
+                start, end = start_pm, end_pm
+        return start, end, text[:range_match.start()] + " " + text[range_match.end():]
+
+    point_match = _TIME_POINT.search(text)
+    if point_match is None:
+        return None, None, text
+    if point_match["named"]:
+        parsed = time(0, 0) if point_match["named"] == "midnight" else time(12, 0)
+    elif point_match["hour"]:
+        parsed = _to_24_hour(int(point_match["hour"]), int(point_match["minute"] or 0), point_match["meridiem"], period)
+    elif point_match["clock_hour"]:
+        parsed = _to_24_hour(int(point_match["clock_hour"]), int(point_match["clock_minute"]), None, period, infer_pm and _twelve_hour_style(point_match["clock_hour"]))
+    else:
+        parsed = _to_24_hour(int(point_match["bare_hour"]), 0, None, period, infer_pm and _twelve_hour_style(point_match["bare_hour"]))
+    return parsed, None, text[:point_match.start()] + " " + text[point_match.end():]
+
+def parse_time_of_day(time_str: str) -> time:
+    """
+    Parses a bare clock time such as '9:00AM', '9 am', '14:30', 'noon' or '4pm'. A time without
+    am/pm is taken as written ('7:00' is 07:00): no afternoon is guessed for an explicit clock time.
+    """
+    start, _, _ = _split_expression(time_str.strip().lower(), infer_pm=False)
+    if start is None:
+        raise ValueError(f"Could not find a specific time in '{time_str}'.")
+    return start
+
+def parse_datetime_expression(text: str, timezone: str, reference: Optional[datetime] = None) -> datetime:
+    """
+    Parses a date+time expression ('next Friday at 4pm', 'tomorrow 10:30', '2025-06-30T14:00:00Z')
+    into a timezone-aware datetime in `timezone`, in one pass.
+    A time given without any date that has already passed today is moved to tomorrow.
+    """
+    tz = ZoneInfo(timezone)
+    if _ISO_DATETIME.match(text):
+        parsed = datetime.fromisoformat(text.strip().replace("Z", "+00:00").replace("z", "+00:00"))
+        return parsed.replace(tzinfo=tz) if parsed.tzinfo is None else parsed.astimezone(tz)
+
+    start, _, date_phrase = _split_expression(text.strip().lower())
+    if start is None:
+        raise ValueError(f"Could not find a specific time in '{text}'.")
+    now = (reference or datetime.now(tz)).astimezone(tz)
+    parsed = datetime.combine(date.fromisoformat(parse_natural_date(date_phrase, timezone, reference=now)), start, tzinfo=tz)
+    if not _normalize(date_phrase) and parsed < now:
+        parsed += timedelta(days=1)
+    return parsed
+
+def parse_datetime_range(text: str, timezone: str, reference: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Parses 'tomorrow 9am-5pm' or 'Friday from 2:00 to 3:30pm' into an aware (start, end) pair."""
+    tz = ZoneInfo(timezone)
+    start, end, date_phrase = _split_expression(text.strip().lower())
+    if start is None or end is None:
+        raise ValueError(f"Could not find a time range in '{text}'.")
+    now = (reference or datetime.now(tz)).astimezone(tz)
+    day = date.fromisoformat(parse_natural_date(date_phrase, timezone, reference=now))
+    start_dt, end_dt = datetime.combine(day, start, tzinfo=tz), datetime.combine(day, end, tzinfo=tz)
+    if end_dt <= start_dt:
+        end_dt += timedelta(days=1)
+    return start_dt, end_dt
+
+def get_date_parser_stats() -> dict:
+    cache_info = _parse_cached.cache_info()
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update({"cache_hits": cache_info.hits, "cache_misses": cache_info.misses, "cache_size": cache_info.currsize})
+    return stats
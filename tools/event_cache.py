@@ -0,0 +1,265 @@
+import os
+import copy
+import json
+import time
+import bisect
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from googleapiclient.errors import HttpError
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+load_dotenv()
+
+GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
+EVENT_CACHE_SNAPSHOT_PATH = os.getenv("EVENT_CACHE_SNAPSHOT_PATH", "auth/event_cache.json")
+EVENT_CACHE_SYNC_INTERVAL = float(os.getenv("EVENT_CACHE_SYNC_INTERVAL_SECONDS", "30"))
+EVENT_CACHE_LOOKBACK_DAYS = int(os.getenv("EVENT_CACHE_LOOKBACK_DAYS", "30"))
+
+def event_bounds(event: dict, default_timezone: str = "UTC") -> Optional[Tuple[datetime, datetime]]:
+    """
+    Returns the (start, end) of an event as UTC datetimes. All-day events span whole days in their
+    own timezone, which Google usually omits; pass the calendar's timezone as `default_timezone`.
+    """
+    start, end = event.get("start", {}), event.get("end", {})
+    if start.get("dateTime") and end.get("dateTime"):
+        return (
+            datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).astimezone(ZoneInfo("UTC")),
+            datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00")).astimezone(ZoneInfo("UTC")),
+        )
+    if start.get("date") and end.get("date"):
+        day_tz = ZoneInfo(start.get("timeZone") or default_timezone)
+        return (
+            datetime.fromisoformat(start["date"]).replace(tzinfo=day_tz).astimezone(ZoneInfo("UTC")),
+            datetime.fromisoformat(end["date"]).replace(tzinfo=day_tz).astimezone(ZoneInfo("UTC")),
+        )
+    return None
+
+def is_busy_event(event: dict) -> bool:
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return False
+    for attendee in event.get("attendees", []):
+        if attendee.get("self") and attendee.get("responseStatus") == "declined":
+            return False
+    return True
+
+class EventCache:
+    """
+    Local mirror of one calendar, kept current with Calendar incremental sync (syncToken).
+    Events are indexed by start time so window lookups are a bisect plus a short scan.
+    """
+
+    def __init__(self, calendar_id: str, snapshot_path: Optional[str] = EVENT_CACHE_SNAPSHOT_PATH, sync_interval: float = EVENT_CACHE_SYNC_INTERVAL):
+        self.calendar_id = calendar_id
+        self.snapshot_path = snapshot_path
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._events: Dict[str, dict] = {}
+        self._index: List[Tuple[datetime, str]] = []
+        self._bounds: Dict[str, Tuple[datetime, datetime]] = {}
+        self._max_span = timedelta(0)
+        self._sync_token: Optional[str] = None
+        # The calendar's own timezone, reported by every events.list page; all-day events are laid out in it.
+        self.time_zone = "UTC"
+        self._last_sync = 0.0
+        self._snapshot_mtime = None
+        self.stats = {"full_syncs": 0, "incremental_syncs": 0, "local_queries": 0, "write_throughs": 0, "peer_write_syncs": 0}
+        self._load_snapshot()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not load event cache snapshot: {e}. Starting with an empty cache.")
+            return
+        if snapshot.get("calendar_id") != self.calendar_id:
+            return
+        self._sync_token = snapshot.get("sync_token")
+        self.time_zone = snapshot.get("time_zone") or "UTC"
+        self._replace_all(snapshot.get("events", []))
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        snapshot = {"calendar_id": self.calendar_id, "sync_token": self._sync_token, "time_zone": self.time_zone, "events": list(self._events.values())}
+        folder = os.path.dirname(self.snapshot_path) or "."
+        os.makedirs(folder, exist_ok=True)
+        # Every server worker saves to the same path: each writes its own temp file, and the
+        # rename happens under a lock shared by all of them.
+        with open(f"{self.snapshot_path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=folder, prefix=".event_cache.", suffix=".tmp", delete=False) as f:
+                json.dump(snapshot, f)
+            try:
+                os.replace(f.name, self.snapshot_path)
+            except OSError:
+                os.remove(f.name)
+                raise
+            self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+
+    def _written_by_peer(self) -> bool:
+        """True when another process has saved the snapshot since we last loaded or saved it."""
+        if not self.snapshot_path:
+            return False
+        try:
+            return os.stat(self.snapshot_path).st_mtime_ns != self._snapshot_mtime
+        except FileNotFoundError:
+            return False
+
+    def _replace_all(self, events: List[dict]):
+        self._events, self._bounds, self._index = {}, {}, []
+        self._max_span = timedelta(0)
+        for event in events:
+            self._apply(event, keep_sorted=False)
+        self._index.sort()
+
+    def _apply(self, event: dict, keep_sorted: bool = True):
+        event_id = event.get("id")
+        if not event_id:
+            return
+        self._discard(event_id)
+        if event.get("status") == "cancelled":
+            return
+        bounds = event_bounds(event, self.time_zone)
+        if bounds is None:
+            return
+        self._events[event_id] = event
+        self._bounds[event_id] = bounds
+        self._max_span = max(self._max_span, bounds[1] - bounds[0])
+        if keep_sorted:
+            bisect.insort(self._index, (bounds[0], event_id))
+        else:
+            self._index.append((bounds[0], event_id))
+
+    def _discard(self, event_id: str):
+        bounds = self._bounds.pop(event_id, None)
+        self._events.pop(event_id, None)
+        if bounds is None:
+            return
+        position = bisect.bisect_left(self._index, (bounds[0], event_id))
+        if position < len(self._index) and self._index[position] == (bounds[0], event_id):
+            del self._index[position]
+
+    def _list_all_pages(self, service, **params) -> Tuple[List[dict], Optional[str]]:
+        items, page_token = [], None
+        while True:
+            result = service.events().list(calendarId=self.calendar_id, singleEvents=True, maxResults=2500, pageToken=page_token, **params).execute()
+            items.extend(result.get("items", []))
+            if result.get("timeZone") and result["timeZone"] != self.time_zone:
+                self.time_zone = result["timeZone"]
+                # All-day events already indexed were laid out in the old timezone.
+                self._replace_all(list(self._events.values()))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return items, result.get("nextSyncToken")
+
+    def sync(self, service, force: bool = False):
+        """Pulls changes since the last sync. Falls back to a full sync when there is no token or Google expired it (410)."""
+        with self._lock:
+            if not force and self._sync_token and self._written_by_peer():
+                # Another server worker booked, moved or deleted something: catch up now rather
+                # than answering from a view that is up to `sync_interval` old.
+                force = True
+                self.stats["peer_write_syncs"] += 1
+            if not force and self._sync_token and time.monotonic() - self._last_sync < self.sync_interval:
+                return
+            changed = False
+            if self._sync_token:
+                try:
+                    changes, next_token = self._list_all_pages(service, syncToken=self._sync_token)
+                    for event in changes:
+                        self._apply(event)
+                    changed = bool(changes) or next_token != self._sync_token
+                    self.stats["incremental_syncs"] += 1
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    print("⚠️ Calendar sync token expired. Running a full sync.")
+                    self._sync_token = None
+            if not self._sync_token:
+                time_min = datetime.now(ZoneInfo("UTC")) - timedelta(days=EVENT_CACHE_LOOKBACK_DAYS)
+                events, next_token = self._list_all_pages(service, timeMin=time_min.isoformat())
+                self._replace_all(events)
+                changed = True
+                self.stats["full_syncs"] += 1
+            self._sync_token = next_token
+            self._last_sync = time.monotonic()
+            if changed:
+                self._save_snapshot()
+            elif self.snapshot_path and os.path.exists(self.snapshot_path):
+                # Caught up with whatever a peer saved; only a newer save should force another sync.
+                self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime_ns
+
+    def events_between(self, time_min: datetime, time_max: datetime) -> List[dict]:
+        """Returns events overlapping [time_min, time_max), ordered by start time."""
+        with self._lock:
+            self.stats["local_queries"] += 1
+            position = bisect.bisect_left(self._index, (time_min - self._max_span,))
+            overlapping = []
+            for index_position in range(position, len(self._index)):
+                start, event_id = self._index[index_position]
+                if start >= time_max:
+                    break
+                if self._bounds[event_id][1] > time_min:
+                    overlapping.append(self._events[event_id])
+            return overlapping
+
+    def busy_intervals(self, time_min: datetime, time_max: datetime) -> List[Tuple[datetime, datetime]]:
+        with self._lock:
+            return [self._bounds[event["id"]] for event in self.events_between(time_min, time_max) if is_busy_event(event)]
+
+    def search(self, query: str, time_min: datetime, time_max: datetime) -> List[dict]:
+        """
+        Local equivalent of events.list(q=...): every word must appear in the summary, description or location.
+        Returns copies, since callers edit the event body before sending it back to the API.
+        """
+        terms = query.lower().split()
+        matches = []
+        for event in self.events_between(time_min, time_max):
+            haystack = " ".join(event.get(field, "") for field in ("summary", "description", "location")).lower()
+            if all(term in haystack for term in terms):
+                matches.append(copy.deepcopy(event))
+        return matches
+
+    def mark_stale(self):
+        """Makes the next lookup sync first, e.g. after a write-through failed."""
+        with self._lock:
+            self._last_sync = 0.0
+
+    def upsert(self, event: dict):
+        with self._lock:
+            self._apply(event)
+            self.stats["write_throughs"] += 1
+            self._save_snapshot()
+
+    def remove(self, event_id: str):
+        with self._lock:
+            self._discard(event_id)
+            self.stats["write_throughs"] += 1
+            self._save_snapshot()
+
+_event_cache_instance = None
+_event_cache_lock = threading.Lock()
+
+def get_event_cache() -> EventCache:
+    global _event_cache_instance
+    with _event_cache_lock:
+        if _event_cache_instance is None:
+            _event_cache_instance = EventCache(GOOGLE_CALENDAR_ID)
+        return _event_cache_instance
+
+def get_synced_event_cache(service) -> EventCache:
+    cache = get_event_cache()
+    cache.sync(service)
+    return cache
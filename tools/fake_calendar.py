@@ -0,0 +1,160 @@
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+import httplib2
+from googleapiclient.errors import HttpError
+from tools.event_cache import event_bounds, is_busy_event
+
+class _FakeRequest:
+    def __init__(self, handler):
+        self._handler = handler
+
+    def execute(self):
+        return self._handler()
+
+def _parse_rfc3339(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def _http_error(status: int, message: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), message.encode("utf-8"))
+
+class FakeCalendarService:
+    """
+    In-memory stand-in for the Calendar v3 client used by the tools: events().list/insert/update/delete
+    (including syncToken paging semantics) and freebusy().query. Lets the agent run offline.
+    """
+
+    def __init__(self, seed_events: Optional[Dict[str, List[dict]]] = None):
+        self._lock = threading.Lock()
+        self._calendars: Dict[str, Dict[str, dict]] = {}
+        self._change_log: List[tuple] = []
+        for calendar_id, events in (seed_events or {}).items():
+            for event in events:
+                self._store(calendar_id, dict(event))
+
+    def _store(self, calendar_id: str, event: dict) -> dict:
+        event.setdefault("id", uuid.uuid4().hex)
+        event.setdefault("status", "confirmed")
+        event.setdefault("htmlLink", f"https://calendar.local/event?eid={event['id']}")
+        self._calendars.setdefault(calendar_id, {})[event["id"]] = event
+        self._change_log.append((calendar_id, event["id"]))
+        return event
+
+    def events(self):
+        return _FakeEventsResource(self)
+
+    def freebusy(self):
+        return _FakeFreeBusyResource(self)
+
+    def _list(self, calendarId, timeMin=None, timeMax=None, q=None, syncToken=None, singleEvents=True, orderBy=None, pageToken=None, maxResults=250, **_):
+        with self._lock:
+            if syncToken is not None:
+                if not syncToken.isdigit() or int(syncToken) > len(self._change_log):
+                    raise _http_error(410, "Sync token is no longer valid, a full sync is required.")
+                changed_ids = dict.fromkeys(event_id for cal_id, event_id in self._change_log[int(syncToken):] if cal_id == calendarId)
+                items = [self._calendars[calendarId][event_id] for event_id in changed_ids]
+            else:
+                items = [event for event in self._calendars.get(calendarId, {}).values() if event["status"] != "cancelled"]
+                range_min = _parse_rfc3339(timeMin) if timeMin else None
+                range_max = _parse_rfc3339(timeMax) if timeMax else None
+                filtered = []
+                for event in items:
+                    bounds = event_bounds(event)
+                    if bounds is None:
+                        continue
+                    if range_min and bounds[1] <= range_min:
+                        continue
+                    if range_max and bounds[0] >= range_max:
+                        continue
+                    if q and not all(term in event.get("summary", "").lower() for term in q.lower().split()):
+                        continue
+                    filtered.append(event)
+                items = filtered
+                if orderBy == "startTime":
+                    items.sort(key=lambda event: event_bounds(event)[0])
+
+            offset = int(pageToken) if pageToken else 0
+            page = [json.loads(json.dumps(event)) for event in items[offset:offset + maxResults]]
+            result = {"items": page, "timeZone": "UTC"}
+            if offset + maxResults < len(items):
+                result["nextPageToken"] = str(offset + maxResults)
+            else:
+                result["nextSyncToken"] = str(len(self._change_log))
+            return result
+
+    def _insert(self, calendarId, body):
+        with self._lock:
+            event = dict(body)
+            event.pop("id", None)
+            return json.loads(json.dumps(self._store(calendarId, event)))
+
+    def _update(self, calendarId, eventId, body):
+        with self._lock:
+            if eventId not in self._calendars.get(calendarId, {}):
+                raise _http_error(404, f"Event '{eventId}' not found.")
+            event = dict(body)
+            event["id"] = eventId
+            return json.loads(json.dumps(self._store(calendarId, event)))
+
+    def _delete(self, calendarId, eventId):
+        with self._lock:
+            event = self._calendars.get(calendarId, {}).get(eventId)
+            if event is None or event["status"] == "cancelled":
+                raise _http_error(410, f"Event '{eventId}' has already been deleted.")
+            self._store(calendarId, {"id": eventId, "status": "cancelled", "start": event["start"], "end": event["end"]})
+            return ""
+
+    def _freebusy(self, body):
+        range_min, range_max = _parse_rfc3339(body["timeMin"]), _parse_rfc3339(body["timeMax"])
+        calendars = {}
+        with self._lock:
+            for item in body.get("items", []):
+                busy = []
+                for event in self._calendars.get(item["id"], {}).values():
+                    bounds = event_bounds(event)
+                    if bounds and is_busy_event(event) and bounds[1] > range_min and bounds[0] < range_max:
+                        busy.append({"start": max(bounds[0], range_min).isoformat(), "end": min(bounds[1], range_max).isoformat()})
+                calendars[item["id"]] = {"busy": sorted(busy, key=lambda period: period["start"])}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"], "calendars": calendars}
+
+class _FakeEventsResource:
+    def __init__(self, service: FakeCalendarService):
+        self._service = service
+
+    def list(self, **kwargs):
+        return _FakeRequest(lambda: self._service._list(**kwargs))
+
+    def insert(self, calendarId, body, **_):
+        return _FakeRequest(lambda: self._service._insert(calendarId, body))
+
+    def update(self, calendarId, eventId, body, **_):
+        return _FakeRequest(lambda: self._service._update(calendarId, eventId, body))
+
+    def delete(self, calendarId, eventId, **_):
+        return _FakeRequest(lambda: self._service._delete(calendarId, eventId))
+
+class _FakeFreeBusyResource:
+    def __init__(self, service: FakeCalendarService):
+        self._service = service
+
+    def query(self, body):
+        return _FakeRequest(lambda: self._service._freebusy(body))
+
+_fake_service_instance = None
+_fake_service_lock = threading.Lock()
+
+def get_fake_calendar_service() -> FakeCalendarService:
+    """Process-wide fake calendar, optionally seeded from FAKE_CALENDAR_SEED_PATH ({calendar_id: [events]})."""
+    global _fake_service_instance
+    with _fake_service_lock:
+        if _fake_service_instance is None:
+            seed_path = os.getenv("FAKE_CALENDAR_SEED_PATH")
+            seed_events = None
+            if seed_path and os.path.exists(seed_path):
+                with open(seed_path, "r", encoding="utf-8") as f:
+                    seed_events = json.load(f)
+            _fake_service_instance = FakeCalendarService(seed_events)
+        return _fake_service_instance
@@ -0,0 +1,87 @@
+import bisect
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+class BusyIntervalSet:
+    """
+    Busy time of one calendar as sorted, non-overlapping intervals.
+    Overlapping or touching intervals are merged on insert, so point lookups are a single bisect.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        for start, end in sorted(intervals):
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start: datetime, end: datetime):
+        if end <= start:
+            return
+        first = bisect.bisect_left(self._ends, start)
+        last = bisect.bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+
+    def busy_until(self, moment: datetime) -> Optional[datetime]:
+        """If `moment` falls inside a busy interval, returns when that interval ends."""
+        position = bisect.bisect_right(self._starts, moment) - 1
+        if position >= 0 and self._ends[position] > moment:
+            return self._ends[position]
+        return None
+
+    def next_busy_start(self, moment: datetime) -> Optional[datetime]:
+        position = bisect.bisect_right(self._starts, moment)
+        if position < len(self._starts):
+            return self._starts[position]
+        return None
+
+    def intervals(self) -> List[Interval]:
+        return list(zip(self._starts, self._ends))
+
+class FreeBusyEngine:
+    """Answers 'first N free slots of length D across calendars A, B, C within window W'."""
+
+    def __init__(self):
+        self._calendars: Dict[str, BusyIntervalSet] = {}
+
+    def load(self, calendar_id: str, intervals: Iterable[Interval]):
+        self._calendars[calendar_id] = BusyIntervalSet(intervals)
+
+    def add_busy(self, calendar_id: str, start: datetime, end: datetime):
+        self._calendars.setdefault(calendar_id, BusyIntervalSet()).add(start, end)
+
+    def _first_common_free(self, calendars: List[BusyIntervalSet], moment: datetime, window_end: datetime, duration: timedelta) -> Optional[Interval]:
+        # Jump forward to the end of whichever calendar is busy at `moment` until all are free,
+        # then check that nobody becomes busy before `moment + duration`. Each step is O(k log n).
+        while moment + duration <= window_end:
+            blocked_until = max((end for end in (busy.busy_until(moment) for busy in calendars) if end), default=None)
+            if blocked_until:
+                moment = blocked_until
+                continue
+            next_starts = [start for start in (busy.next_busy_start(moment) for busy in calendars) if start]
+            gap_end = min(next_starts + [window_end])
+            if moment + duration <= gap_end:
+                return moment, gap_end
+            moment = gap_end
+        return None
+
+    def find_free_slots(self, calendar_ids: List[str], window_start: datetime, window_end: datetime, duration: timedelta, limit: Optional[int] = None) -> List[Interval]:
+        """Returns up to `limit` free gaps (start, end) of at least `duration` in which every calendar is free."""
+        calendars = [self._calendars[calendar_id] for calendar_id in calendar_ids if calendar_id in self._calendars]
+        slots = []
+        moment = window_start
+        while limit is None or len(slots) < limit:
+            gap = self._first_common_free(calendars, moment, window_end, duration)
+            if gap is None:
+                break
+            slots.append(gap)
+            moment = gap[1]
+        return slots
@@ -1,31 +1,138 @@
 import os.path
+import threading
+import time
+from datetime import datetime, timedelta
+import httplib2
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+TOKEN_REFRESH_MARGIN = timedelta(seconds=int(os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN_SECONDS", "300")))
+HTTP_TIMEOUT_SECONDS = int(os.getenv("CALENDAR_HTTP_TIMEOUT_SECONDS", "30"))
+CALENDAR_BACKEND = os.getenv("CALENDAR_BACKEND", "google")
+
+_pool_lock = threading.Lock()
+_thread_clients = threading.local()
+_pooled_credentials = None
+_discovery_document = None
+_pool_metrics = {
+    "clients_built": 0,
+    "clients_reused": 0,
+    "credential_loads": 0,
+    "credential_refreshes": 0,
+    "build_seconds_total": 0.0,
+}
+
+def _save_credentials(creds):
+    with open(os.getenv("TOKEN_PATH"), "w") as token:
+        token.write(creds.to_json())
 
 def get_credentials():
     creds = None
     if os.path.exists(os.getenv("TOKEN_PATH")):
         creds = Credentials.from_authorized_user_file(os.getenv("TOKEN_PATH"), SCOPES)
-    
+
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
             flow = InstalledAppFlow.from_client_secrets_file(os.getenv("CREDENTIALS_PATH"), SCOPES)
             creds = flow.run_local_server(port=0)
-        
-        with open(os.getenv("TOKEN_PATH"), "w") as token:
-            token.write(creds.to_json())
+
+        _save_credentials(creds)
     return creds
 
+def _expires_soon(creds) -> bool:
+    if creds.expiry is None:
+        return False
+    # google-auth keeps expiry as a naive UTC datetime.
+    return creds.expiry - datetime.utcnow() <= TOKEN_REFRESH_MARGIN
+
+def _get_pooled_credentials():
+    """Returns the process-wide credentials, refreshing them shortly before they expire."""
+    global _pooled_credentials
+    with _pool_lock:
+        if _pooled_credentials is None:
+            _pooled_credentials = get_credentials()
+            _pool_metrics["credential_loads"] += 1
+        elif _pooled_credentials.refresh_token and (not _pooled_credentials.valid or _expires_soon(_pooled_credentials)):
+            _pooled_credentials.refresh(Request())
+            _save_credentials(_pooled_credentials)
+            _pool_metrics["credential_refreshes"] += 1
+        return _pooled_credentials
+
+def _get_discovery_document():
+    global _discovery_document
+    with _pool_lock:
+        if _discovery_document is None:
+            _discovery_document = get_static_doc("calendar", "v3")
+        return _discovery_document
+
+def _build_calendar_service(creds):
+    authorized_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+    discovery_document = _get_discovery_document()
+    if discovery_document is None:
+        return build("calendar", "v3", http=authorized_http)
+    return build_from_document(discovery_document, http=authorized_http)
+
 def get_calendar_service():
-    creds = get_credentials()
-    service = build("calendar", "v3", credentials=creds)
-    return service
\ No newline at end of file
+    """
+    Returns a Calendar client for the calling thread.
+    httplib2 connections are not thread-safe, so each thread keeps its own client
+    (and its open connection) while credentials and the discovery document are shared.
+    Set CALENDAR_BACKEND=fake to get the offline in-memory calendar instead.
+    """
+    if CALENDAR_BACKEND == "fake":
+        from tools.fake_calendar import get_fake_calendar_service
+        return get_fake_calendar_service()
+
+    creds = _get_pooled_credentials()
+    service = getattr(_thread_clients, "service", None)
+    if service is not None and _thread_clients.credentials is creds:
+        with _pool_lock:
+            _pool_metrics["clients_reused"] += 1
+        return service
+
+    started = time.perf_counter()
+    service = _build_calendar_service(creds)
+    elapsed = time.perf_counter() - started
+    _thread_clients.service = service
+    _thread_clients.credentials = creds
+    with _pool_lock:
+        _pool_metrics["clients_built"] += 1
+        _pool_metrics["build_seconds_total"] += elapsed
+    return service
+
+def warm_calendar_credentials() -> bool:
+    """
+    Loads or refreshes the pooled credentials and the discovery document ahead of a tool call,
+    so the call itself does not pay for a token refresh. Never starts the interactive OAuth flow.
+    """
+    if CALENDAR_BACKEND == "fake":
+        return False
+    token_path = os.getenv("TOKEN_PATH")
+    if _pooled_credentials is None and not (token_path and os.path.exists(token_path)):
+        return False
+    _get_pooled_credentials()
+    _get_discovery_document()
+    return True
+
+def get_calendar_pool_metrics() -> dict:
+    with _pool_lock:
+        metrics = dict(_pool_metrics)
+    requests_served = metrics["clients_built"] + metrics["clients_reused"]
+    metrics["reuse_ratio"] = metrics["clients_reused"] / requests_served if requests_served else 0.0
+    return metrics
+
+def reset_calendar_service_pool():
+    """Drops pooled credentials so the next call reloads them, e.g. after the token file was replaced."""
+    global _pooled_credentials
+    with _pool_lock:
+        _pooled_credentials = None
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+Interval = Tuple[datetime, datetime]
+
+def _cell_index(moment: datetime, horizon_start: datetime, granularity: timedelta) -> int:
+    return int((moment - horizon_start) // granularity)
+
+def busy_bitmap(intervals: List[Interval], horizon_start: datetime, cell_count: int, granularity: timedelta) -> np.ndarray:
+    """Marks every cell touched by a busy interval. A cell is busy if any part of it is."""
+    if not intervals:
+        return np.zeros(cell_count, dtype=bool)
+    cell_seconds = granularity.total_seconds()
+    offsets = np.array([((start - horizon_start).total_seconds(), (end - horizon_start).total_seconds()) for start, end in intervals])
+    firsts = np.clip(np.floor(offsets[:, 0] / cell_seconds), 0, cell_count).astype(np.int64)
+    lasts = np.clip(np.ceil(offsets[:, 1] / cell_seconds), 0, cell_count).astype(np.int64)
+    coverage = np.zeros(cell_count + 1, dtype=np.int32)
+    np.add.at(coverage, firsts, 1)
+    np.add.at(coverage, lasts, -1)
+    return np.cumsum(coverage[:-1]) > 0
+
+def working_hours_bitmap(timezone: str, horizon_start: datetime, cell_count: int, granularity: timedelta, work_start_hour: int, work_end_hour: int) -> np.ndarray:
+    tz = ZoneInfo(timezone)
+    bitmap = np.zeros(cell_count, dtype=bool)
+    horizon_end = horizon_start + granularity * cell_count
+    local_day = horizon_start.astimezone(tz).date()
+    while True:
+        day_start = datetime(local_day.year, local_day.month, local_day.day, work_start_hour, tzinfo=tz)
+        if day_start >= horizon_end:
+            return bitmap
+        day_end = datetime(local_day.year, local_day.month, local_day.day, tzinfo=tz) + timedelta(hours=work_end_hour)
+        first = max(-(-(day_start - horizon_start) // granularity), 0)
+        last = min(_cell_index(day_end, horizon_start, granularity), cell_count)
+        if first < last:
+            bitmap[first:last] = True
+        local_day += timedelta(days=1)
+
+def window_fits(mask: np.ndarray, width: int) -> np.ndarray:
+    """
+    Vectorized run-length test: for each row and start cell, whether the `width` cells starting
+    there are all True. Uses a prefix sum so the cost does not depend on `width`.
+    """
+    mask = np.atleast_2d(mask)
+    counts = np.zeros((mask.shape[0], mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(mask, axis=1, out=counts[:, 1:])
+    return (counts[:, width:] - counts[:, :-width]) == width
+
+def find_group_slots(
+    busy_by_participant: Dict[str, List[Interval]],
+    horizon_start: datetime,
+    horizon_end: datetime,
+    duration: timedelta,
+    granularity: timedelta = timedelta(minutes=5),
+    participant_timezones: Optional[Dict[str, str]] = None,
+    work_start_hour: int = 9,
+    work_end_hour: int = 17,
+    limit: int = 5,
+) -> List[dict]:
+    """
+    Finds slots where every participant is free, ranked by how many participants it falls
+    inside working hours for (in their own timezone), then by how early it is.
+    Returned slots do not overlap each other.
+    """
+    cell_count = _cell_index(horizon_end, horizon_start, granularity)
+    width = -(-duration // granularity)
+    if cell_count < width or width <= 0:
+        return []
+
+    all_free = np.ones(cell_count, dtype=bool)
+    for intervals in busy_by_participant.values():
+        all_free &= ~busy_bitmap(intervals, horizon_start, cell_count, granularity)
+
+    candidates = np.flatnonzero(window_fits(all_free, width)[0])
+    if candidates.size == 0:
+        return []
+
+    participant_timezones = participant_timezones or {}
+    timezones = sorted(set(participant_timezones.values()))
+    scores = np.zeros(candidates.size, dtype=np.int32)
+    if timezones:
+        working = np.stack([working_hours_bitmap(tz, horizon_start, cell_count, granularity, work_start_hour, work_end_hour) for tz in timezones])
+        in_hours = window_fits(working, width)[:, candidates]
+        weights = np.array([list(participant_timezones.values()).count(tz) for tz in timezones], dtype=np.int32)
+        scores = weights @ in_hours.astype(np.int32)
+
+    order = np.lexsort((candidates, -scores))
+    taken = np.zeros(cell_count, dtype=bool)
+    slots = []
+    for position in order:
+        start_cell = int(candidates[position])
+        if taken[start_cell:start_cell + width].any():
+            continue
+        taken[start_cell:start_cell + width] = True
+        slot_start = horizon_start + granularity * start_cell
+        slots.append({
+            "start": slot_start,
+            "end": slot_start + duration,
+            "participants_in_working_hours": int(scores[position]),
+        })
+        if len(slots) >= limit:
+            break
+    return slots
@@ -0,0 +1,129 @@
+import os
+import io
+import time
+import pickle
+import sqlite3
+import threading
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+USER_PROFILES_DB_PATH = os.getenv("USER_PROFILES_DB_PATH", "auth/user_profiles.db")
+PROFILE_FIELDS = ("timezone", "calendar_id", "work_start_hour", "work_end_hour", "default_duration_minutes")
+
+class _PlainDataUnpickler(pickle.Unpickler):
+    """Reads the legacy timezone pickle without letting it import or call anything."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Refusing to load '{module}.{name}' from the legacy timezone file.")
+
+class UserProfileStore:
+    """
+    Per-user preferences (home timezone, calendar id, working hours, default meeting length) in SQLite.
+    WAL mode lets readers run while a write commits, each write is a single UPSERT, and rows are
+    served from an in-memory cache that is dropped whenever another connection commits.
+    """
+
+    def __init__(self, db_path: str = USER_PROFILES_DB_PATH, legacy_pickle_path: Optional[str] = os.getenv("USERS_TIMEZONES_PATH")):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Optional[dict]] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_profiles ("
+            "user_id TEXT PRIMARY KEY, timezone TEXT, calendar_id TEXT, work_start_hour INTEGER, work_end_hour INTEGER, "
+            "default_duration_minutes INTEGER, updated_at REAL NOT NULL)"
+        )
+        # Stores created before calendar ids were recorded get the column on first open.
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(user_profiles)")}
+        if "calendar_id" not in columns:
+            self._conn.execute("ALTER TABLE user_profiles ADD COLUMN calendar_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS user_profiles_calendar_id ON user_profiles (calendar_id)")
+        self._data_version = self._current_data_version()
+        if legacy_pickle_path:
+            self._import_legacy_pickle(legacy_pickle_path)
+
+    def _current_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _import_legacy_pickle(self, path: str):
+        if not os.path.exists(path) or self._conn.execute("SELECT 1 FROM user_profiles LIMIT 1").fetchone():
+            return
+        try:
+            with open(path, "rb") as f:
+                legacy = _PlainDataUnpickler(io.BytesIO(f.read())).load()
+        except (EOFError, pickle.UnpicklingError) as e:
+            print(f"⚠️ Skipping legacy timezone file '{path}': {e}")
+            return
+        if not isinstance(legacy, dict):
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO user_profiles (user_id, timezone, updated_at) VALUES (?, ?, ?)",
+                [(str(user_id), str(timezone), now) for user_id, timezone in legacy.items()]
+            )
+            self._conn.execute("COMMIT")
+        print(f"✅ Imported {len(legacy)} user timezones from '{path}' into '{self.db_path}'")
+
+    def _invalidate_if_changed(self):
+        data_version = self._current_data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._cache.clear()
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            self._invalidate_if_changed()
+            if user_id not in self._cache:
+                row = self._conn.execute("SELECT * FROM user_profiles WHERE user_id = ?", (user_id,)).fetchone()
+                self._cache[user_id] = dict(row) if row else None
+            return self._cache[user_id]
+
+    def get_timezone(self, user_id: str) -> Optional[str]:
+        profile = self.get(user_id)
+        return profile["timezone"] if profile else None
+
+    def get_timezone_for_calendar(self, calendar_id: str) -> Optional[str]:
+        """
+        Timezone of the user who owns `calendar_id`. Users saved without a calendar id are matched
+        when their user_id is the calendar address itself.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT timezone FROM user_profiles WHERE calendar_id = ? AND timezone IS NOT NULL ORDER BY updated_at DESC LIMIT 1",
+                (calendar_id,)
+            ).fetchone()
+        return row["timezone"] if row else self.get_timezone(calendar_id)
+
+    def update(self, user_id: str, **fields) -> dict:
+        """Atomically creates or updates the given fields of a user's profile and returns the stored row."""
+        unknown = set(fields) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        columns = ["user_id", *fields, "updated_at"]
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in [*fields, "updated_at"])
+        with self._lock:
+            row = self._conn.execute(
+                f"INSERT INTO user_profiles ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT(user_id) DO UPDATE SET {assignments} RETURNING *",
+                (user_id, *fields.values(), time.time())
+            ).fetchone()
+            self._cache[user_id] = dict(row)
+            return self._cache[user_id]
+
+_profile_store_instance = None
+_profile_store_lock = threading.Lock()
+
+def get_user_profile_store() -> UserProfileStore:
+    global _profile_store_instance
+    with _profile_store_lock:
+        if _profile_store_instance is None:
+            _profile_store_instance = UserProfileStore()
+        return _profile_store_instance